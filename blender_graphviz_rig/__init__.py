@@ -15,17 +15,55 @@ Operator classes’ names follow the `standard class-registration conventions`_.
 .. _standard class-registration conventions: https://wiki.blender.org/wiki/Reference/Release_Notes/2.80/Python_API/Addons#Class_Registration
 """ # noqa
 
-from .analyzerigs import analyze_rig_graph, create_legend_data
-from .analyzebones import (
-    are_bone_and_opposite_invisible,
-    normalize_symmetric_bones_to_left_side,
+from .layoutpresets import (
+    layout_preset_dict,
+    get_layout_preset_enum_items,
+    is_layout_preset_supported,
+    is_graph_large,
+    choose_layout_preset_name,
+)
+from .graphvizprobe import (
+    start_graphviz_probe,
+    get_cached_graphviz_capabilities,
+    get_graphviz_capabilities,
+    find_unsupported_output_formats,
+)
+from .graphvizerrors import (
+    GraphvizNotFoundError,
+    GraphvizOutputError,
+    GraphvizTimeoutError,
+    GraphvizCancelledError,
+)
+from .imageretention import (
+    get_png_pixel_bytes,
+    select_evicted_images,
+    describe_pixel_bytes,
+)
+from .rendertimings import (
+    create_timing_record,
+    record_timing_span,
+    get_file_size,
+    summarize_timing_record,
+    write_chrome_trace_file,
+    append_timing_json_line,
 )
-from .renderdot import create_dot_digraph
-from .savefiles import save_files, GraphvizNotFoundError, GraphvizOutputError
+
+# The modules that analyze rigs and render graphs (analyzerigs, analyzebones,
+# renderjobs, savefiles, storedlayouts, rnaaccesses, and renderprofiles) are
+# not imported here. Together with the modules that they import (such as
+# renderdot, graphvizlibrary, and Python’s asyncio), they take much longer to
+# import than the rest of the add-on, and Blender imports every enabled
+# add-on whenever it starts. Registering the add-on’s menus, operators, and
+# preferences needs only the modules above, so each of the other modules is
+# imported by the functions that use it, when the first operator runs.
 
 from datetime import datetime
 import os
+import shutil
 import sys
+import tempfile
+import threading
+import time
 
 import bpy
 
@@ -56,6 +94,58 @@ bl_info = {
 
 active_object_filename_marker = '{{active_object_name}}'
 
+# Each Image data-block that a render loads has a custom property with this
+# name, which marks it as a rendered image (see the imageretention module).
+# The property is a dictionary with the image’s render_time and pixel_bytes;
+# the output_file_path of the full PNG image that the data-block belongs to;
+# and whether the data-block is_thumbnail, i.e., whether it shows the PNG
+# thumbnail of that image (see the savefiles module) instead of the image
+# itself. It is saved with the Blender file.
+rendered_image_property_name = 'rig_graphviz'
+
+# This set contains a threading.Event for each render that is waiting in the
+# render queue or whose Graphviz process is running. The cancel-render operator
+# sets them all.
+in_flight_render_cancel_events = set()
+
+# This render queue runs every render’s Graphviz processes in background
+# threads, a few at a time (see the renderjobs module’s create_render_queue
+# function). It is None until it is created by the first render (see
+# get_render_queue).
+render_queue = None
+
+# This dictionary is shared by the live-graph operator and its
+# depsgraph_update_post handler (see OBJECT_OT_rig_graphviz_live_graph):
+#
+# is_running: Whether a live graph is running.
+#
+# stop_is_requested: Whether the live graph should stop at its next timer
+# event.
+#
+# watched_id_names: A set of (ID type name, ID name) tuples for the scene
+# objects (and their armature and mesh data-blocks) that the live graph
+# watches.
+#
+# last_update_time: The time.monotonic() time of the latest update to a
+# watched data-block that has not yet been analyzed, or None.
+#
+# is_loading_edit_mode_data: Whether the live graph is loading its objects’
+# edit-mode data, which Blender reports as updates that are not edits (see
+# the live graph’s start_live_render method).
+live_graph_state = {
+    'is_running': False,
+    'stop_is_requested': False,
+    'watched_id_names': set(),
+    'last_update_time': None,
+    'is_loading_edit_mode_data': False,
+}
+
+# Blender does not keep its own references to the items that a dynamic
+# EnumProperty’s items function returns, and it may crash if they are garbage
+# collected while it uses them. So the items functions keep their latest items
+# in this dictionary.
+dynamic_enum_items_dict = {}
+
 
 def get_default_dot_command():
     """
@@ -86,6 +176,127 @@ def get_default_fontname():
         return ''
 
 
+def get_known_graphviz_capabilities(dot_command):
+    """
+    This function returns the cached capabilities of the given dot_command
+    (see the graphvizprobe module), or None if they are not yet known or if
+    the dot_command could not be probed. Option menus offer every choice when
+    the capabilities are unknown.
+    """
+    capabilities = get_cached_graphviz_capabilities(dot_command)
+
+    if capabilities is None or capabilities['error'] is not None:
+        return None
+
+    return capabilities
+
+
+def get_supported_layout_preset_enum_items(dot_command, includes_auto):
+    """
+    This function returns the enum items of the layout presets (see the
+    layoutpresets module’s get_layout_preset_enum_items function) whose
+    layout engines the given dot_command supports.
+    """
+    capabilities = get_known_graphviz_capabilities(dot_command)
+
+    enum_items = get_layout_preset_enum_items(
+        includes_auto=includes_auto,
+        supported_layout_engines=(
+            capabilities['layout_engines'] if capabilities else None
+        ),
+    )
+
+    dynamic_enum_items_dict[('layout_preset', includes_auto)] = enum_items
+
+    return enum_items
+
+
+def get_preferences_layout_preset_enum_items(self, context):
+    """
+    Blender calls this function to get the items of the add-on preferences’
+    layout-preset properties.
+    """
+    return get_supported_layout_preset_enum_items(
+        self.dot_command,
+        includes_auto=False,
+    )
+
+
+def get_operator_layout_preset_enum_items(self, context):
+    """
+    Blender calls this function to get the items of the rendering operators’
+    layout_preset property. (Its context may be None.)
+    """
+    addon_preferences = (
+        (context or bpy.context).preferences.addons[__package__].preferences
+    )
+
+    return get_supported_layout_preset_enum_items(
+        addon_preferences.dot_command,
+        includes_auto=True,
+    )
+
+
+# These are the items of the output_formats preference, before any formats
+# that the DOT command does not support are left out.
+output_format_enum_items = (
+    ('png', 'PNG', 'A raster image, loaded into Blender'),
+    ('svg', 'SVG', 'A vector image'),
+    ('svgz', 'SVGZ', 'A compressed vector image'),
+    ('pdf', 'PDF', 'A vector document'),
+    ('json', 'JSON', 'The graph’s layout in Graphviz’s JSON format'),
+    (
+        'png_tiles',
+        'PNG Tiles',
+        'A directory of full-resolution PNG tiles, with a JSON '
+        'manifest of their positions',
+    ),
+    (
+        'ps_pages',
+        'Paged PostScript',
+        'A PostScript document split into letter-sized pages',
+    ),
+)
+
+
+def get_output_format_enum_items(self, context):
+    """
+    Blender calls this function to get the items of the add-on preferences’
+    output_formats property: the output formats that the DOT command
+    supports. Each item’s number is its flag bit among all of the output
+    formats, so that the values that Blender stores for the property stay the
+    same.
+    """
+    capabilities = get_known_graphviz_capabilities(self.dot_command)
+
+    enum_items = tuple(
+        (*enum_item, 1 << item_index)
+        for item_index, enum_item
+        in enumerate(output_format_enum_items)
+        if (
+            capabilities is None
+            or not find_unsupported_output_formats(
+                capabilities,
+                [enum_item[0]],
+            )
+        )
+    )
+
+    dynamic_enum_items_dict['output_formats'] = enum_items
+
+    return enum_items
+
+
+def start_preferences_graphviz_probe(self, context):
+    """
+    Blender calls this function when the add-on preferences’ dot_command is
+    changed. It starts probing the new DOT command in the background (see the
+    graphvizprobe module), so that its capabilities are known by the time
+    they are needed.
+    """
+    start_graphviz_probe(self.dot_command)
+
+
 class ArmatureGraphvizAddonPreferences(bpy.types.AddonPreferences):
     """
     This class defines the add-on’s preferences.
@@ -98,6 +309,14 @@ class ArmatureGraphvizAddonPreferences(bpy.types.AddonPreferences):
         name='Graphviz DOT Command',
         subtype='FILE_PATH',
         default=get_default_dot_command(),
+        update=start_preferences_graphviz_probe,
+    )
+
+    # Graphviz’s shared libraries may render graphs within Blender’s process,
+    # which is faster than running the DOT command for small graphs.
+    uses_graphviz_library: bpy.props.BoolProperty(
+        name='Render In-Process with Graphviz Libraries',
+        default=False,
     )
 
     output_fontname: bpy.props.StringProperty(
@@ -118,6 +337,278 @@ class ArmatureGraphvizAddonPreferences(bpy.types.AddonPreferences):
         default=f'Rig Graphviz {active_object_filename_marker}',
     )
 
+    # Graphviz renders every selected format from the same layout run. Only
+    # the formats that the DOT command supports are offered. (The default is
+    # the flag bit of PNG; dynamic enum defaults cannot be identifiers.)
+    output_formats: bpy.props.EnumProperty(
+        name='Output Formats',
+        items=get_output_format_enum_items,
+        options={'ENUM_FLAG'},
+        default=1,
+    )
+
+    # Overwritten output files are kept as numbered backups, within these
+    # limits. The value 0 means that there is no limit.
+    backup_max_count: bpy.props.IntProperty(
+        name='Maximum Backups per File',
+        min=0,
+        default=100,
+    )
+
+    backup_max_megabytes: bpy.props.FloatProperty(
+        name='Maximum Backup Megabytes per File',
+        min=0,
+        default=0,
+    )
+
+    backup_max_age_days: bpy.props.FloatProperty(
+        name='Maximum Backup Age (Days)',
+        min=0,
+        default=0,
+    )
+
+    # Rendered images that are loaded into the Blender file keep their fake
+    # users within these limits (see the imageretention module). The value 0
+    # means that there is no limit.
+    image_max_count: bpy.props.IntProperty(
+        name='Maximum Kept Images',
+        min=0,
+        default=20,
+    )
+
+    image_max_megabytes: bpy.props.FloatProperty(
+        name='Maximum Kept Image Megabytes',
+        min=0,
+        default=0,
+    )
+
+    # Whether the pixels of rendered images are freed after every render, so
+    # that the images are only referenced from their files, and Blender reads
+    # them again only when they are shown.
+    references_images_externally: bpy.props.BoolProperty(
+        name='Reference Images Externally',
+        default=False,
+    )
+
+    # When a render’s layout preset is automatic, graphs with more nodes or
+    # edges than these thresholds use the large-graph layout preset.
+    large_graph_node_threshold: bpy.props.IntProperty(
+        name='Large-Graph Node Threshold',
+        min=0,
+        default=1000,
+    )
+
+    large_graph_edge_threshold: bpy.props.IntProperty(
+        name='Large-Graph Edge Threshold',
+        min=0,
+        default=2000,
+    )
+
+    # Only the layout presets whose layout engines the DOT command supports
+    # are offered. (The default is the number of the Fast preset; dynamic enum
+    # defaults cannot be identifiers.)
+    large_graph_layout_preset: bpy.props.EnumProperty(
+        name='Large-Graph Layout Preset',
+        items=get_preferences_layout_preset_enum_items,
+        default=list(layout_preset_dict).index('fast'),
+    )
+
+    # Renders that are started while this many renders are already running
+    # wait in a queue. (The default is the renderjobs module’s
+    # default_max_num_of_running_render_tasks, which is not imported until the
+    # first render.)
+    max_num_of_concurrent_renders: bpy.props.IntProperty(
+        name='Maximum Concurrent Renders',
+        min=1,
+        max=16,
+        default=2,
+    )
+
+    # Graphviz is killed if it runs for longer than this many seconds. The
+    # value 0 means that there is no time budget.
+    render_time_budget: bpy.props.FloatProperty(
+        name='Render Time Budget (Seconds)',
+        min=0,
+        default=60,
+    )
+
+    retries_with_cheaper_presets: bpy.props.BoolProperty(
+        name='Retry with Cheaper Layout Presets',
+        default=True,
+    )
+
+    # PNG images are rendered at up to 300 DPI, but their DPI is lowered so
+    # that they have at most this many megapixels. The value 0 means that
+    # there is no pixel budget.
+    max_megapixels: bpy.props.FloatProperty(
+        name='Maximum Megapixels',
+        min=0,
+        default=100,
+    )
+
+    # Layouts are stored next to output images, so that restyling a graph
+    # (e.g., with a new font or title) does not lay it out again.
+    reuses_stored_layouts: bpy.props.BoolProperty(
+        name='Reuse Stored Layouts',
+        default=True,
+    )
+
+    # When a graph’s structure has changed, its unchanged nodes may be pinned
+    # at their positions in its previous stored layout.
+    incremental_layout_engine: bpy.props.EnumProperty(
+        name='Incremental Layout',
+        items=(
+            ('NONE', 'Off', 'Lay out changed graphs from scratch'),
+            (
+                'neato',
+                'Neato',
+                'Pin unchanged nodes exactly and place only new or changed '
+                'nodes',
+            ),
+            (
+                'fdp',
+                'FDP',
+                'Pin unchanged nodes within their clusters, which may move',
+            ),
+        ),
+        default='NONE',
+    )
+
+    measures_layout_size: bpy.props.BoolProperty(
+        name='Measure Layout Size Before Rendering',
+        default=False,
+    )
+
+    # If the pixel budget lowers a PNG image’s DPI below this minimum, then the
+    # graph is also rendered in the oversize output format.
+    min_legible_dpi: bpy.props.IntProperty(
+        name='Minimum Legible DPI',
+        min=0,
+        max=300,
+        default=36,
+    )
+
+    oversize_output_format: bpy.props.EnumProperty(
+        name='Oversize Output Format',
+        items=(
+            ('NONE', 'None', 'Only render the low-resolution PNG image'),
+            ('svg', 'SVG', 'Also render a vector image'),
+            ('pdf', 'PDF', 'Also render a vector document'),
+            (
+                'png_tiles',
+                'PNG Tiles',
+                'Also render full-resolution PNG tiles',
+            ),
+        ),
+        default='svg',
+    )
+
+    # A preview is a quick, low-resolution PNG image that is loaded into
+    # Blender while the full render runs in the background.
+    preview_mode: bpy.props.EnumProperty(
+        name='Preview',
+        items=(
+            ('NONE', 'Never', 'Always wait for the full render'),
+            (
+                'LARGE_GRAPHS',
+                'Large Graphs',
+                'Show a preview first for graphs with more nodes or edges '
+                'than the large-graph thresholds',
+            ),
+            ('ALWAYS', 'Always', 'Always show a preview first'),
+        ),
+        default='LARGE_GRAPHS',
+    )
+
+    preview_dpi: bpy.props.IntProperty(
+        name='Preview DPI',
+        min=1,
+        max=300,
+        default=72,
+    )
+
+    preview_layout_preset: bpy.props.EnumProperty(
+        name='Preview Layout Preset',
+        items=get_preferences_layout_preset_enum_items,
+        default=list(layout_preset_dict).index('draft'),
+    )
+
+    # Renders whose PNG images may have more megapixels than this also
+    # render small PNG thumbnails from the same layout, which are loaded into
+    # Blender instead of the full PNG images (see the savefiles module).
+    loads_thumbnails: bpy.props.BoolProperty(
+        name='Load Thumbnails of Large Images',
+        default=True,
+    )
+
+    thumbnail_min_megapixels: bpy.props.FloatProperty(
+        name='Thumbnail Threshold (Megapixels)',
+        min=0,
+        default=25,
+    )
+
+    # Each render’s timings (see the rendertimings module) may be exported, so
+    # that render performance can be aggregated across renders and users.
+    timing_export_format: bpy.props.EnumProperty(
+        name='Export Render Timings',
+        items=(
+            ('NONE', 'Off', 'Only report a summary of each render’s timings'),
+            (
+                'CHROME_TRACE',
+                'Chrome Trace',
+                'Write each render’s timings to a .trace.json file, which '
+                'can be opened in Chrome’s about:tracing page or in Perfetto',
+            ),
+            (
+                'JSON_LINES',
+                'JSON Lines',
+                'Append each render’s timings as one line to a '
+                'rig-graphviz-timings.jsonl file',
+            ),
+        ),
+        default='NONE',
+    )
+
+    timing_export_directory_path: bpy.props.StringProperty(
+        name='Render Timings Directory',
+        subtype='DIR_PATH',
+        # If blank, then timings are exported into each render’s output
+        # directory.
+        default='',
+    )
+
+    # A single render may be profiled function by function (see the
+    # renderprofiles module). Profiling slows renders down, so it is off by
+    # default.
+    profiles_renders: bpy.props.BoolProperty(
+        name='Profile Renders',
+        description=(
+            'Profile each render’s Python functions, writing a .prof file '
+            'and a .prof.txt summary next to its output image'
+        ),
+        default=False,
+    )
+
+    # The analysis of a rig may count its accesses of Blender’s data (see the
+    # rnaaccesses module). Counting slows the analysis down, so it is off by
+    # default.
+    counts_rna_accesses: bpy.props.BoolProperty(
+        name='Count RNA Accesses',
+        description=(
+            'Count how many times each function of the rig analysis reads '
+            'Blender’s data, and report the counts after each analysis'
+        ),
+        default=False,
+    )
+
+    # A live graph re-renders only after its rig has stopped changing for
+    # this many seconds, so that a burst of edits causes only one render.
+    live_graph_debounce_time: bpy.props.FloatProperty(
+        name='Live Graph Delay (Seconds)',
+        min=0,
+        default=1,
+    )
+
     def draw(self, context):
         """
         Blender calls this method when drawing the preference pane.
@@ -130,6 +621,15 @@ class ArmatureGraphvizAddonPreferences(bpy.types.AddonPreferences):
                 'See https://www.graphviz.org/download/.'
             ),
         )
+        layout.label(text=describe_graphviz_capabilities(self.dot_command))
+        layout.prop(self, 'uses_graphviz_library')
+        layout.label(
+            text=(
+                'If Graphviz’s libgvc and libcgraph libraries are found, '
+                'graphs are rendered without starting the DOT command. '
+                'Otherwise, the DOT command is used.'
+            ),
+        )
         layout.prop(self, 'output_fontname')
         layout.label(
             text=(
@@ -152,10 +652,124 @@ class ArmatureGraphvizAddonPreferences(bpy.types.AddonPreferences):
               'will be replaced by the active object’s name.'
             ),
         )
+        layout.prop(self, 'output_formats')
+        layout.label(
+            text=(
+              'One file is created for each output format, with that '
+              'format’s file extension appended to the filename. '
+              'Only PNG images are loaded into Blender.'
+            ),
+        )
+        layout.prop(self, 'backup_max_count')
+        layout.prop(self, 'backup_max_megabytes')
+        layout.prop(self, 'backup_max_age_days')
+        layout.label(
+            text=(
+              'Overwritten files are kept as numbered backups. The oldest '
+              'backups beyond these limits are deleted. 0 means no limit.'
+            ),
+        )
+        layout.prop(self, 'image_max_count')
+        layout.prop(self, 'image_max_megabytes')
+        layout.prop(self, 'references_images_externally')
+        layout.label(
+            text=(
+              'The least recently rendered images beyond these limits '
+              '(in megabytes of pixels in memory) stop being kept in this '
+              'file. 0 means no limit.'
+            ),
+        )
+        layout.prop(self, 'large_graph_layout_preset')
+        layout.prop(self, 'large_graph_node_threshold')
+        layout.prop(self, 'large_graph_edge_threshold')
+        layout.label(
+            text=(
+              'Renders with the Automatic layout preset use the large-graph '
+              'layout preset when a graph has more nodes or edges than '
+              'these thresholds.'
+            ),
+        )
+        layout.prop(self, 'render_time_budget')
+        layout.prop(self, 'retries_with_cheaper_presets')
         layout.label(
             text=(
-              'A .png file extension will also be automatically appended '
-              'to the filename.'
+              'Graphviz is stopped if it runs longer than the time budget '
+              '(0 for no limit). The render may then be retried with '
+              'cheaper layout presets.'
+            ),
+        )
+        layout.prop(self, 'max_num_of_concurrent_renders')
+        layout.label(
+            text=(
+              'Further renders wait for a running render to finish. A new '
+              'render of the same output files replaces any older one.'
+            ),
+        )
+        layout.prop(self, 'reuses_stored_layouts')
+        layout.label(
+            text=(
+              'Each layout is stored in a .layout.json file next to the '
+              'output files. A graph whose structure has not changed is only '
+              'restyled, which is much faster than laying it out again.'
+            ),
+        )
+        layout.prop(self, 'incremental_layout_engine')
+        layout.label(
+            text=(
+              'Incremental layout keeps the nodes of an edited rig where they '
+              'were in its previous layout, placing only new or changed nodes.'
+            ),
+        )
+        layout.prop(self, 'max_megapixels')
+        layout.prop(self, 'measures_layout_size')
+        layout.prop(self, 'min_legible_dpi')
+        layout.prop(self, 'oversize_output_format')
+        layout.label(
+            text=(
+              'PNG images’ DPI is lowered to fit the maximum megapixels '
+              '(0 for no limit), estimated from the graph’s size or measured '
+              'by an extra layout. Illegibly low DPI adds the oversize format.'
+            ),
+        )
+        layout.prop(self, 'preview_mode')
+        layout.prop(self, 'preview_layout_preset')
+        layout.prop(self, 'preview_dpi')
+        layout.label(
+            text=(
+              'A preview PNG image is loaded right away; the full render '
+              'then runs in the background and replaces it when finished.'
+            ),
+        )
+        layout.prop(self, 'loads_thumbnails')
+        layout.prop(self, 'thumbnail_min_megapixels')
+        layout.label(
+            text=(
+              'PNG images with more megapixels also get a small thumbnail, '
+              'which is loaded instead. The full image can be opened from '
+              'the Image Editor’s Image menu.'
+            ),
+        )
+        layout.prop(self, 'timing_export_format')
+        layout.prop(self, 'timing_export_directory_path')
+        layout.label(
+            text=(
+              'Each render reports how long its stages took. The timings may '
+              'also be exported, into the output directory if blank.'
+            ),
+        )
+        layout.prop(self, 'profiles_renders')
+        layout.label(
+            text=(
+              'A profiled render is slower. Its profile can be opened with '
+              'pstats or SnakeViz.'
+            ),
+        )
+        layout.prop(self, 'counts_rna_accesses')
+        layout.prop(self, 'live_graph_debounce_time')
+        layout.label(
+            text=(
+              'A live graph is re-rendered once its rig has not changed for '
+              'this long, and only if its graph has changed.'
             ),
         )
 
@@ -195,6 +809,64 @@ dot_category_attrs_dict = {
 }
 
 
+def count_armature_bones(scene_objects):
+    """
+    Returns the total number of bones in the armatures of the given scene
+    objects, for render timings (see the rendertimings module).
+    """
+    return sum(
+        len(so.data.bones)
+        for so
+        in scene_objects
+        if so.type == 'ARMATURE'
+    )
+
+
+def analyze_operator_rig_graph(
+    self,
+    context,
+    blender_structs,
+    is_bone_excluded,
+):
+    """
+    With the given Blender operator (self), this function analyzes the given
+    blender_structs in the given Blender context with the analyzerigs
+    module’s analyze_rig_graph function, and it returns the graph data.
+
+    If counting RNA accesses is chosen in the add-on’s preferences, then the
+    blender_structs are wrapped in counting proxies (see the rnaaccesses
+    module), and a summary of the analysis’s RNA accesses is reported.
+    """
+    from .analyzerigs import analyze_rig_graph
+    from .rnaaccesses import (
+        create_rna_access_counter,
+        wrap_rna_value,
+        summarize_rna_access_counts,
+    )
+
+    addon_preferences = context.preferences.addons[__package__].preferences
+
+    if not addon_preferences.counts_rna_accesses:
+        return analyze_rig_graph(blender_structs, is_bone_excluded)
+
+    rna_access_counter = create_rna_access_counter()
+    graph_data = analyze_rig_graph(
+        [
+            wrap_rna_value(rna_access_counter, bs, 'objects[]')
+            for bs
+            in blender_structs
+        ],
+        is_bone_excluded,
+    )
+
+    self.report({'INFO'}, (
+        'RNA accesses (attribute reads + collection lookups): '
+        f'{summarize_rna_access_counts(rna_access_counter)}.'
+    ))
+
+    return graph_data
+
+
 def get_rig_output_filename(context):
     """
     When rendering a rig Graphviz image, this function gets the output
@@ -214,7 +886,342 @@ def get_rig_output_filename(context):
     )
 
 
-def run_rig_graphviz_operator(
+def describe_graphviz_capabilities(dot_command):
+    """
+    This function returns a message string to the user about the probed
+    capabilities of the given dot_command (see the graphvizprobe module). If
+    they are not yet known, then it starts probing the dot_command.
+    """
+    capabilities = get_graphviz_capabilities(dot_command)
+
+    if capabilities is None:
+        return 'Checking the Graphviz installation…'
+
+    elif isinstance(capabilities['error'], GraphvizNotFoundError):
+        return (
+            'Graphviz was not found '
+            f'with the “{dot_command}” command.'
+        )
+
+    elif capabilities['error'] is not None:
+        return f'Graphviz could not be checked: {capabilities["error"]}'
+
+    else:
+        return (
+            f'Graphviz {capabilities["version"] or "(unknown version)"} '
+            f'with layout engines: '
+            f'{", ".join(sorted(capabilities["layout_engines"]))}.'
+        )
+
+
+def describe_render_error(err, dot_command, output_file_path):
+    """
+    This function returns a message string to the user about the given error,
+    which was raised while rendering to the given output_file_path with the
+    given dot_command.
+    """
+    from .renderjobs import RenderSupersededError
+
+    if isinstance(err, RenderSupersededError):
+        return (
+            f'Rendering of “{output_file_path}” was replaced '
+            'by a newer render of the same file.'
+        )
+
+    elif isinstance(err, GraphvizCancelledError):
+        return f'Rendering of “{output_file_path}” was cancelled.'
+
+    elif isinstance(err, GraphvizTimeoutError):
+        # In this case, every render attempt exceeded the time budget. The
+        # error’s message describes each attempt.
+        return (
+            f'Failed to create image at “{output_file_path}”. '
+            f'Graphviz did not finish within the time budget ({err}). '
+            'Choose a faster layout preset, or increase the time budget '
+            'in the Rig Graphviz add-on’s preferences.'
+        )
+
+    elif isinstance(err, GraphvizNotFoundError):
+        # In this case, Graphviz has not been installed on the OS, so its
+        # executable applications are not available in the system shell.
+        return (
+            'Failed to create image. '
+            'Graphviz has not been installed '
+            'or is not available from the system shell '
+            f'with the “{dot_command}” command. '
+            'See the Rig Graphviz add-on’s DOT-command preference.'
+        )
+
+    elif isinstance(err, GraphvizOutputError):
+        # In this case, Graphviz itself reported an unexpected error, such as
+        # a syntax error in the generated DOT file.
+        return (
+            f'Failed to create image at “{output_file_path}”. '
+            f'Graphviz reported the following error – {err}'
+        )
+
+    else:
+        # In this case, a strange and unexpected error from the OS occurred.
+        return (
+            f'Failed to create image at “{output_file_path}”. '
+            f'The OS reported the following error – {err}'
+        )
+
+
+def describe_other_output_files(output_file_path_dict):
+    """
+    This function returns a string mentioning the file extensions of the
+    output files in the given output_file_path_dict other than the first one
+    (whose path is already in the success message), or a blank string if there
+    are no others.
+    """
+    from .savefiles import output_format_file_extension_dict
+
+    other_output_file_extensions = [
+        output_format_file_extension_dict[output_format]
+        for output_format
+        in list(output_file_path_dict)[1:]
+    ]
+
+    if not other_output_file_extensions:
+        return ''
+
+    return ' (also as ' + ', '.join(other_output_file_extensions) + ')'
+
+
+def get_image_retention(addon_preferences):
+    """
+    This function returns the image retention policy (see the imageretention
+    module) that is configured by the given addon_preferences, in which 0
+    means that there is no limit.
+    """
+    bytes_per_megabyte = 1_000_000
+
+    return {
+        'max_count': addon_preferences.image_max_count or None,
+        'max_pixel_bytes': (
+            addon_preferences.image_max_megabytes * bytes_per_megabyte
+            or None
+        ),
+    }
+
+
+def find_rendered_image_data_blocks():
+    """
+    This function returns a list of the Image data-blocks in the Blender file
+    that renders have loaded (see rendered_image_property_name).
+    """
+    return [
+        image_data_block
+        for image_data_block
+        in bpy.data.images
+        if rendered_image_property_name in image_data_block
+    ]
+
+
+def get_loaded_pixel_bytes(image_data_blocks):
+    """
+    This function returns the total number of bytes that the pixels of those
+    of the given rendered image_data_blocks whose pixels are loaded take in
+    memory.
+    """
+    return sum(
+        image_data_block[rendered_image_property_name]['pixel_bytes']
+        for image_data_block
+        in image_data_blocks
+        if image_data_block.has_data
+    )
+
+
+def retain_rendered_image_data_blocks(addon_preferences, kept_image_names=()):
+    """
+    This function evicts the least recently rendered images that exceed the
+    image retention policy of the given addon_preferences (see the
+    imageretention module), except for the images whose names are in
+    kept_image_names, by clearing their fake users and freeing their pixels.
+    If the addon_preferences reference images externally, then it also frees
+    the pixels of every other rendered image. It returns None.
+    """
+    image_data_block_dict = {
+        image_data_block.name: image_data_block
+        for image_data_block
+        in find_rendered_image_data_blocks()
+        if image_data_block.use_fake_user
+    }
+    image_records = [
+        {
+            'name': image_name,
+            'render_time': (
+                image_data_block[rendered_image_property_name]['render_time']
+            ),
+            'pixel_bytes': (
+                image_data_block[rendered_image_property_name]['pixel_bytes']
+            ),
+        }
+        for image_name, image_data_block
+        in image_data_block_dict.items()
+    ]
+
+    for image_record in select_evicted_images(
+        image_records,
+        get_image_retention(addon_preferences),
+        kept_image_names,
+    ):
+        image_data_block = image_data_block_dict[image_record['name']]
+        image_data_block.use_fake_user = False
+        image_data_block.buffers_free()
+
+    if addon_preferences.references_images_externally:
+        for image_name, image_data_block in image_data_block_dict.items():
+            if image_name not in kept_image_names:
+                image_data_block.buffers_free()
+
+
+def find_rendered_image_data_block(png_output_file_path):
+    """
+    This function returns the rendered Image data-block that belongs to the
+    PNG image at the given png_output_file_path (whether it shows the image or
+    its thumbnail), or None if there is none.
+    """
+    for image_data_block in find_rendered_image_data_blocks():
+        rendered_image_dict = image_data_block[rendered_image_property_name]
+        if rendered_image_dict.get('output_file_path') == png_output_file_path:
+            return image_data_block
+
+    return None
+
+
+def load_image_data_block(png_output_file_path, thumbnail_file_path=None):
+    """
+    This function loads the given PNG image file into the Blender file as an
+    external Image data-block, replacing any existing Image data-block whose
+    name is the same as the filename, and returns the data-block. It then
+    keeps the rendered images within the add-on preferences’ image retention
+    policy (see retain_rendered_image_data_blocks).
+
+    If the thumbnail_file_path is not None, then the data-block shows the PNG
+    thumbnail at that path instead, until the full image is loaded again
+    (e.g., by IMAGE_OT_rig_graphviz_open_full_image). Either way, the image
+    and its thumbnail share the same data-block, which is named after the
+    image’s file.
+    """
+    addon_preferences = bpy.context.preferences.addons[__package__].preferences
+
+    displayed_file_path = (
+        thumbnail_file_path
+        if thumbnail_file_path is not None
+        else png_output_file_path
+    )
+
+    image_data_block = find_rendered_image_data_block(png_output_file_path)
+    if image_data_block is None:
+        image_data_block = bpy.data.images.load(
+            png_output_file_path,
+            check_existing=True,
+        )
+
+    # The data-block is switched to the file that it should show, whose
+    # pixels are then read by the reload below.
+    if image_data_block.filepath != displayed_file_path:
+        image_data_block.filepath = displayed_file_path
+
+    # Reload the image data-block so that, if it is being already displayed
+    # somewhere in the UI, the UI will refresh the image’s view. (Reloading
+    # also frees the image’s old pixels; its new pixels are read from the file
+    # only when the image is shown.)
+    image_data_block.reload()
+
+    # Save the image data-block even though it has no users, protecting it from
+    # data-block purging from the Blender file.
+    image_data_block.use_fake_user = True
+
+    # The image’s pixel bytes are read from the PNG file’s header, because
+    # reading the image data-block’s size would load its pixels.
+    image_data_block[rendered_image_property_name] = {
+        'render_time': time.time(),
+        'pixel_bytes': float(get_png_pixel_bytes(displayed_file_path)),
+        'output_file_path': png_output_file_path,
+        'is_thumbnail': thumbnail_file_path is not None,
+    }
+
+    retain_rendered_image_data_blocks(
+        addon_preferences,
+        kept_image_names={image_data_block.name},
+    )
+
+    return image_data_block
+
+
+def redraw_image_editors():
+    """
+    This function makes every image editor redraw. It is needed when an image
+    data-block is reloaded outside of an operator (e.g., by a timer), because
+    Blender then does not necessarily redraw its UI.
+    """
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'IMAGE_EDITOR':
+                area.tag_redraw()
+
+
+# While a render is running, its modal operator checks it this often (in
+# seconds), updating the status bar.
+render_progress_interval = 0.25
+
+
+def create_render_status_text(render_job):
+    """
+    This function returns the status-bar text that shows the progress of the
+    given running render_job (see prepare_render_job).
+    """
+    if render_job['cancel_event'].is_set():
+        return 'Rig Graphviz: Cancelling render…'
+
+    now = time.monotonic()
+    job_duration = now - render_job['start_time']
+
+    if not render_job['future'].running():
+        # In this case, the render is waiting in the render queue.
+        return (
+            'Rig Graphviz: Render waiting '
+            f'for {job_duration:.0f} s for other renders to finish. '
+            'Press Esc to cancel.'
+        )
+
+    render_progress = render_job['render_progress']
+    stage_duration = now - render_progress['stage_start_time']
+
+    return (
+        f'Rig Graphviz: {render_progress["stage_label"] or "Render"} '
+        f'running for {stage_duration:.0f} s '
+        f'({job_duration:.0f} s in total). '
+        'Press Esc to cancel.'
+    )
+
+
+def get_backup_retention(addon_preferences):
+    """
+    This function returns the backup retention policy (see the backupfiles
+    module) that is configured by the given addon_preferences, in which 0 means
+    that there is no limit.
+    """
+    seconds_per_day = 24 * 60 * 60
+    bytes_per_megabyte = 1_000_000
+
+    return {
+        'max_count': addon_preferences.backup_max_count or None,
+        'max_bytes': (
+            addon_preferences.backup_max_megabytes * bytes_per_megabyte
+            or None
+        ),
+        'max_age': (
+            addon_preferences.backup_max_age_days * seconds_per_day
+            or None
+        ),
+    }
+
+
+def prepare_render_job(
     self,
     context,
     graph_data,
@@ -222,16 +1229,81 @@ def run_rig_graphviz_operator(
     create_success_message,
     title='',
     rankdir='',
+    preview_is_allowed=True,
 ):
     """
-    With the given Blender operator (self), this function renders a Graphviz
-    image from the given operands in the given Blender context. When
-    successfully finished, either the singular_operand_word or
-    plural_operand_word is used to create a message to the user.
+    With the given Blender operator (self), this function prepares a render
+    job for a Graphviz image from the given operands in the given Blender
+    context. If the add-on’s preferences are invalid, then it reports an
+    error and returns None. When the render job is successfully finished,
+    create_success_message is called with the first output file’s path to
+    create a message to the user.
+
+    The render job is a dictionary with these items:
+
+    render_stages: The render stages for the renderjobs module’s
+    render_graph_stages function.
+
+    render_progress: The render progress that render_graph_stages updates
+    (see the renderjobs module’s create_render_progress function).
+
+    cancel_event: A threading.Event that cancels the render when set (e.g., by
+    the cancel-render operator or the Esc key).
+
+    task_key: The render queue’s key for the render job (see the renderjobs
+    module’s submit_render_task function), which is the path of its output
+    files without a file extension. A newer render job with the same task_key
+    replaces this one.
+
+    temp_directory_path: The path of the render job’s own temporary directory.
+
+    dot_command, output_file_path, success_message: These are used in the
+    messages to the user.
+
+    start_time: The time.monotonic() time at which the render job was
+    prepared.
+
+    num_of_reported_stage_results, num_of_reported_attempt_descriptions: The
+    numbers of finished stages and timed-out attempts that have already been
+    reported to the user.
+
+    timing_record: The operator’s timing_record attribute (see the
+    rendertimings module), in which the operator has already timed its
+    analysis, and in which the render’s stages are timed.
+
+    render_profile: The operator’s render_profile attribute (see the
+    renderprofiles module), in which the operator is already profiling its
+    analysis and in which the render’s stages are profiled, or None if the
+    render is not profiled.
+
+    future: A concurrent.futures.Future for the render job’s task in the
+    render queue, if it has been submitted, or else None.
+
+    One file is rendered for each output format that is selected in the
+    add-on’s preferences. If a PNG image is rendered, then it is also loaded
+    into the Blender file.
 
     The rankdir argument is passed to create_dot_digraph in the renderdot
     module; see its docstring for more information.
+
+    The operator’s layout_preset property chooses the Graphviz layout engine
+    and its settings (see the layoutpresets module). The chosen preset’s label
+    is added to the title. If Graphviz exceeds the time budget from the
+    add-on’s preferences, then its process is killed and (if enabled) the
+    render is retried with the preset’s cheaper fallback preset. Each attempt’s
+    outcome and duration is reported.
+
+    If preview_is_allowed is true, and if the add-on’s preferences call for a
+    preview (e.g., because the graph is large), then the render job has an
+    extra first stage, which renders a low-resolution PNG image with the
+    preview layout preset. The PNG image of the full render then replaces the
+    preview in the same image data-block (see report_render_progress).
     """
+    from .analyzerigs import count_graph_nodes_and_edges
+    from .renderjobs import create_render_progress
+    from .savefiles import output_format_file_extension_dict
+    from .storedlayouts import layout_file_extension
+
     addon_preferences = context.preferences.addons[__package__].preferences
 
     preferences_output_directory_path = addon_preferences.output_directory_path
@@ -259,7 +1331,7 @@ def run_rig_graphviz_operator(
             'Save this Blender file, or specify an output directory '
             'in the Rig Graphviz add-on’s preferences.'
         ))
-        return {'CANCELLED'}
+        return None
 
     # If the resolved_output_directory_path is not an absolute path (e.g.,
     # because the preferences_output_directory_path was blank '' or some other
@@ -273,89 +1345,645 @@ def run_rig_graphviz_operator(
             f'“{preferences_output_directory_path}” is invalid. '
             'Change the output directory in the add-on’s preferences.'
         ))
-        return {'CANCELLED'}
+        return None
 
     dot_command = addon_preferences.dot_command
 
-    output_fontname = addon_preferences.output_fontname
+    # Choices that the installed Graphviz does not support are skipped, if its
+    # capabilities are known (see the graphvizprobe module).
+    capabilities = get_known_graphviz_capabilities(dot_command)
+    supported_layout_engines = (
+        capabilities['layout_engines'] if capabilities else None
+    )
+
+    # The formats are sorted by their order in the savefiles module, so that
+    # PNG (the only format that Blender can load) comes first.
+    output_formats = [
+        output_format
+        for output_format
+        in output_format_file_extension_dict
+        if output_format in addon_preferences.output_formats
+    ]
+
+    if not output_formats:
+        self.report({'ERROR'}, (
+            'No output format is selected. '
+            'Select at least one output format '
+            'in the Rig Graphviz add-on’s preferences.'
+        ))
+        return None
 
+    # This is the path of the first output file, which is used in messages.
     output_file_path = (
         os.path.join(resolved_output_directory_path, output_filename)
-        + '.png'
+        + output_format_file_extension_dict[output_formats[0]]
     )
 
-    dot_source_file_path = (
-        os.path.join(bpy.app.tempdir, output_filename)
+    num_of_nodes, num_of_edges = count_graph_nodes_and_edges(graph_data)
+
+    layout_preset_name = choose_layout_preset_name(
+        self.layout_preset,
+        num_of_nodes=num_of_nodes,
+        num_of_edges=num_of_edges,
+        large_graph_node_threshold=(
+            addon_preferences.large_graph_node_threshold
+        ),
+        large_graph_edge_threshold=(
+            addon_preferences.large_graph_edge_threshold
+        ),
+        large_graph_layout_preset_name=(
+            addon_preferences.large_graph_layout_preset
+        ),
     )
 
-    dot_text = create_dot_digraph(
-        **graph_data,
-        category_attrs_dict=dot_category_attrs_dict,
-        title=title,
-        fontname=output_fontname,
-        rankdir=rankdir,
+    # A preset that is not offered because its layout engine is not installed
+    # reads as a blank string.
+    layout_preset_is_supported = (
+        layout_preset_name in layout_preset_dict
+        and is_layout_preset_supported(
+            layout_preset_name,
+            supported_layout_engines,
+        )
+    )
+    if not layout_preset_is_supported:
+        self.report({'ERROR'}, (
+            'The chosen layout preset’s Graphviz layout engine '
+            'is not installed. Choose another layout preset '
+            '(or large-graph layout preset, '
+            'in the Rig Graphviz add-on’s preferences).'
+        ))
+        return None
+
+    # Each render job has its own temporary directory for its DOT source file
+    # and the other files that Graphviz creates next to it, so that renders of
+    # the same output filename that run at once do not overwrite each other’s
+    # files. It is removed when the render job finishes.
+    temp_directory_path = tempfile.mkdtemp(
+        prefix='rig-graphviz-',
+        dir=bpy.app.tempdir or None,
     )
 
-    # Try to render and save the image file. Report and return an error status
-    # to Blender if rendering/saving fails.
-    try:
-        save_files(
-            dot_text=dot_text,
-            dot_command=dot_command,
-            dot_source_file_path=dot_source_file_path,
-            output_directory_path=resolved_output_directory_path,
-            output_filename=output_filename,
+    # These arguments are shared by the preview render and the full render.
+    render_kwargs = {
+        'graph_data': graph_data,
+        'category_attrs_dict': dot_category_attrs_dict,
+        'dot_command': dot_command,
+        'dot_source_file_path': os.path.join(
+            temp_directory_path,
+            output_filename,
+        ),
+        'output_directory_path': resolved_output_directory_path,
+        'output_filename': output_filename,
+        'fontname': addon_preferences.output_fontname,
+        'rankdir': rankdir,
+        # A pixel budget of 0 means that raster images are always rendered
+        # at their full DPI.
+        'max_megapixels': addon_preferences.max_megapixels or None,
+        'layout_size_is_measured': addon_preferences.measures_layout_size,
+        'layout_file_path': (
+            os.path.join(resolved_output_directory_path, output_filename)
+            + layout_file_extension
+            if addon_preferences.reuses_stored_layouts
+            else None
+        ),
+        'incremental_layout_engine': (
+            addon_preferences.incremental_layout_engine
+            if (
+                addon_preferences.incremental_layout_engine != 'NONE'
+                and (
+                    supported_layout_engines is None
+                    or addon_preferences.incremental_layout_engine
+                    in supported_layout_engines
+                )
+            )
+            else None
+        ),
+        # A time budget of 0 means that Graphviz may run for as long as it
+        # needs.
+        'time_budget': addon_preferences.render_time_budget or None,
+        'backup_retention': get_backup_retention(addon_preferences),
+        'uses_graphviz_library': addon_preferences.uses_graphviz_library,
+        'timing_record': self.timing_record,
+    }
+
+    # Oversize graphs may also be rendered in another output format (see the
+    # renderjobs module’s render_graph function).
+    oversize_output_format = (
+        None
+        if (
+            addon_preferences.oversize_output_format == 'NONE'
+            or (
+                capabilities is not None
+                and find_unsupported_output_formats(
+                    capabilities,
+                    [addon_preferences.oversize_output_format],
+                )
+            )
         )
+        else addon_preferences.oversize_output_format
+    )
 
-    except GraphvizNotFoundError:
-        # In this case, Graphviz has not been installed on the OS, so its
-        # executable applications are not available in the system shell.
-        self.report({'ERROR'}, (
-            'Failed to create image. '
-            'Graphviz has not been installed '
-            'or is not available from the system shell '
-            f'with the “{dot_command}” command. '
-            'See the Rig Graphviz add-on’s DOT-command preference.'
+    # A preview is only useful when there is a PNG image to load into Blender.
+    graph_is_large = is_graph_large(
+        num_of_nodes,
+        num_of_edges,
+        addon_preferences.large_graph_node_threshold,
+        addon_preferences.large_graph_edge_threshold,
+    )
+    preview_mode = addon_preferences.preview_mode
+    preview_layout_preset_name = addon_preferences.preview_layout_preset
+    preview_is_rendered = (
+        preview_is_allowed
+        and 'png' in output_formats
+        and preview_layout_preset_name in layout_preset_dict
+        and is_layout_preset_supported(
+            preview_layout_preset_name,
+            supported_layout_engines,
+        )
+        and (
+            preview_mode == 'ALWAYS'
+            or (preview_mode == 'LARGE_GRAPHS' and graph_is_large)
+        )
+    )
+
+    # This event is set by the cancel-render operator or the Esc key.
+    cancel_event = threading.Event()
+
+    full_render_graph_kwargs = {
+        **render_kwargs,
+        'output_formats': output_formats,
+        'layout_preset_name': layout_preset_name,
+        'title': title,
+        'min_legible_dpi': addon_preferences.min_legible_dpi,
+        'oversize_output_format': oversize_output_format,
+        'thumbnail_min_megapixels': (
+            addon_preferences.thumbnail_min_megapixels
+            if addon_preferences.loads_thumbnails
+            else None
+        ),
+        'retries_with_cheaper_presets': (
+            addon_preferences.retries_with_cheaper_presets
+        ),
+        'supported_layout_engines': supported_layout_engines,
+        'cancel_event': cancel_event,
+    }
+    full_render_label = (
+        f'{layout_preset_dict[layout_preset_name]["label"]} layout'
+    )
+
+    if preview_is_rendered:
+        preview_layout_preset = layout_preset_dict[preview_layout_preset_name]
+        render_stages = [
+            {
+                'label': (
+                    f'Preview with {preview_layout_preset["label"]} layout'
+                ),
+                # The preview is rendered to the final PNG file, whose
+                # existing image is backed up first.
+                'render_graph_kwargs': {
+                    **render_kwargs,
+                    'output_formats': ['png'],
+                    'layout_preset_name': preview_layout_preset_name,
+                    'title': ' • '.join([
+                        *([title] if title else []),
+                        'Preview',
+                    ]),
+                    'max_dpi': addon_preferences.preview_dpi,
+                    'retries_with_cheaper_presets': False,
+                    'cancel_event': cancel_event,
+                },
+            },
+            {
+                'label': f'Full render with {full_render_label}',
+                'render_graph_kwargs': {
+                    **full_render_graph_kwargs,
+                    # The preview already backed up the existing PNG image,
+                    # and its own PNG image is not worth backing up.
+                    'backed_up_output_formats': [
+                        output_format
+                        for output_format
+                        in output_format_file_extension_dict
+                        if output_format != 'png'
+                    ],
+                },
+            },
+        ]
+
+    else:
+        render_stages = [
+            {
+                'label': f'Render with {full_render_label}',
+                'render_graph_kwargs': full_render_graph_kwargs,
+            },
+        ]
+
+    return {
+        'render_stages': render_stages,
+        'render_progress': create_render_progress(),
+        'cancel_event': cancel_event,
+        'task_key': os.path.join(
+            resolved_output_directory_path,
+            output_filename,
+        ),
+        'temp_directory_path': temp_directory_path,
+        'dot_command': dot_command,
+        'output_file_path': output_file_path,
+        'success_message': create_success_message(output_file_path),
+        'start_time': time.monotonic(),
+        'num_of_reported_stage_results': 0,
+        'num_of_reported_attempt_descriptions': 0,
+        'timing_record': self.timing_record,
+        'render_profile': self.render_profile,
+        'future': None,
+    }
+
+
+def report_render_progress(self, render_job):
+    """
+    With the given Blender operator (self), this function reports any render
+    attempts of the given render_job that have timed out, and it loads the PNG
+    image of any preview stage that has finished, since they were last
+    reported. It returns None.
+    """
+    render_progress = render_job['render_progress']
+
+    attempt_descriptions = render_progress['attempt_descriptions']
+    for attempt_description in attempt_descriptions[
+        render_job['num_of_reported_attempt_descriptions']:
+    ]:
+        self.report({'WARNING'}, attempt_description + '.')
+    render_job['num_of_reported_attempt_descriptions'] = len(
+        attempt_descriptions,
+    )
+
+    # Only the last stage is the full render; any earlier stage is a preview.
+    stage_results = render_progress['stage_results']
+    num_of_preview_stages = len(render_job['render_stages']) - 1
+    for output_file_path_dict, stage_attempt_descriptions in stage_results[
+        render_job['num_of_reported_stage_results']:num_of_preview_stages
+    ]:
+        with record_timing_span(
+            render_job['timing_record'],
+            'load_preview_image',
+        ):
+            load_image_data_block(output_file_path_dict['png'])
+        redraw_image_editors()
+        self.report({'INFO'}, (
+            'A preview has been added to this file as an image data-block ('
+            + '; '.join(stage_attempt_descriptions)
+            + '). The full render is running in the background '
+            'and will replace the preview when it finishes.'
         ))
-        return {'CANCELLED'}
+    render_job['num_of_reported_stage_results'] = min(
+        len(stage_results),
+        num_of_preview_stages,
+    )
 
-    except GraphvizOutputError as err:
-        # In this case, Graphviz itself reported an unexpected error, such as
-        # a syntax error in the generated DOT file.
-        self.report({'ERROR'}, (
-            f'Failed to create image at “{output_file_path}”. '
-            f'Graphviz reported the following error – {err}'
+
+def report_render_timings(self, render_job, render_is_successful):
+    """
+    With the given Blender operator (self), this function reports a one-line
+    summary of the given render_job’s timings (see the rendertimings module),
+    and it exports them if the add-on’s preferences call for it. It returns
+    None. (A render whose Graphviz process failed is still worth timing, so
+    this is also called for unsuccessful renders.)
+    """
+    timing_record = render_job['timing_record']
+    timing_summary = summarize_timing_record(timing_record)
+
+    if timing_summary is None:
+        return
+
+    self.report({'INFO'}, f'Render timings: {timing_summary}.')
+
+    addon_preferences = bpy.context.preferences.addons[__package__].preferences
+    timing_export_format = addon_preferences.timing_export_format
+
+    if timing_export_format == 'NONE':
+        return
+
+    # If the add-on preferences’ timings directory starts with '//', then the
+    # '//' is replaced by a path to the current Blender file’s directory.
+    timing_export_directory_path = (
+        bpy.path.abspath(addon_preferences.timing_export_directory_path)
+        or os.path.dirname(render_job['task_key'])
+    )
+    timing_metadata = {
+        'time': datetime.now().astimezone().isoformat(),
+        'operator': self.bl_idname,
+        'output_file_path': render_job['output_file_path'],
+        'is_successful': render_is_successful,
+        'addon_version': '.'.join(map(str, bl_info['version'])),
+        'blender_version': bpy.app.version_string,
+        'platform': sys.platform,
+    }
+
+    try:
+        if timing_export_format == 'CHROME_TRACE':
+            write_chrome_trace_file(
+                timing_record,
+                os.path.join(
+                    timing_export_directory_path,
+                    os.path.basename(render_job['task_key']) + '.trace.json',
+                ),
+                timing_metadata,
+            )
+        elif timing_export_format == 'JSON_LINES':
+            append_timing_json_line(
+                timing_record,
+                os.path.join(
+                    timing_export_directory_path,
+                    'rig-graphviz-timings.jsonl',
+                ),
+                timing_metadata,
+            )
+
+    except OSError as err:
+        self.report({'WARNING'}, (
+            'The render timings could not be exported to '
+            f'“{timing_export_directory_path}”: {err}'
         ))
-        return {'CANCELLED'}
+
+
+def report_render_profile(self, render_job):
+    """
+    With the given Blender operator (self), this function writes the given
+    render_job’s profile (see the renderprofiles module), if it has one, next
+    to its output image. It returns None. It must be called after the render
+    job has finished (successfully or not) and after the operator’s own
+    profiled work has stopped, so that the profile is complete.
+    """
+    from .renderprofiles import write_render_profile
+
+    render_profile = render_job['render_profile']
+
+    if render_profile is None:
+        return
+
+    profile_file_path = render_job['task_key'] + '.prof'
+    summary_file_path = profile_file_path + '.txt'
+
+    try:
+        if write_render_profile(
+            render_profile,
+            profile_file_path,
+            summary_file_path,
+        ):
+            self.report({'INFO'}, (
+                f'Render profile saved to “{profile_file_path}”, with a '
+                f'summary in “{summary_file_path}”.'
+            ))
 
     except OSError as err:
-        # In this case, a strange and unexpected error from the OS occurred.
-        self.report({'ERROR'}, (
-            f'Failed to create image at “{output_file_path}”. '
-            f'The OS reported the following error – {err}'
+        self.report({'WARNING'}, (
+            f'The render profile could not be saved to “{profile_file_path}”: '
+            f'{err}'
         ))
+
+
+def finish_render_job(self, render_job, get_stage_results):
+    """
+    With the given Blender operator (self), this function finishes the given
+    render_job by calling get_stage_results (which returns the results of the
+    renderjobs module’s render_graph_stages function, or raises its error),
+    loading the PNG image into the Blender file, and reporting the outcome to
+    the user. It returns the operator’s result, {'FINISHED'} or
+    {'CANCELLED'}.
+    """
+    cancel_event = render_job['cancel_event']
+    dot_command = render_job['dot_command']
+    output_file_path = render_job['output_file_path']
+
+    try:
+        stage_results = get_stage_results()
+
+    except GraphvizCancelledError as err:
+        in_flight_render_cancel_events.discard(cancel_event)
+        report_render_progress(self, render_job)
+        self.report(
+            {'WARNING'},
+            describe_render_error(err, dot_command, output_file_path),
+        )
+        report_render_timings(self, render_job, render_is_successful=False)
+        return {'CANCELLED'}
+
+    except (
+        GraphvizTimeoutError,
+        GraphvizNotFoundError,
+        GraphvizOutputError,
+        OSError,
+    ) as err:
+        in_flight_render_cancel_events.discard(cancel_event)
+        report_render_progress(self, render_job)
+        self.report(
+            {'ERROR'},
+            describe_render_error(err, dot_command, output_file_path),
+        )
+        report_render_timings(self, render_job, render_is_successful=False)
         return {'CANCELLED'}
 
-    # Load the image file into the Blender file as an external Image
-    # data-block, replacing any existing Image data-block whose name is the
-    # same as the filename.
-    image_data_block = bpy.data.images.load(
-        output_file_path,
-        check_existing=True,
+    in_flight_render_cancel_events.discard(cancel_event)
+    report_render_progress(self, render_job)
+
+    output_file_path_dict, attempt_descriptions = stage_results[-1]
+
+    success_message = (
+        render_job['success_message']
+        + describe_other_output_files(output_file_path_dict)
     )
 
-    # Reload the image data-block so that, if it is being already displayed
-    # somewhere in the UI, the UI will refresh the image’s view.
-    image_data_block.reload()
+    if 'png_thumbnail' in output_file_path_dict:
+        # In this case, the PNG image is so large that only its thumbnail is
+        # loaded, until the full image is opened on demand.
+        with record_timing_span(
+            render_job['timing_record'],
+            'load_image',
+            png_bytes=get_file_size(output_file_path_dict['png_thumbnail']),
+        ):
+            load_image_data_block(
+                output_file_path_dict['png'],
+                thumbnail_file_path=output_file_path_dict['png_thumbnail'],
+            )
+        redraw_image_editors()
+        success_message += (
+            ' and added to this file as a thumbnail image data-block '
+            '(open the full image from the Image Editor’s Image menu)'
+        )
+
+    elif 'png' in output_file_path_dict:
+        with record_timing_span(
+            render_job['timing_record'],
+            'load_image',
+            png_bytes=get_file_size(output_file_path_dict['png']),
+        ):
+            load_image_data_block(output_file_path_dict['png'])
+        redraw_image_editors()
+        success_message += ' and added to this file as an image data-block'
+
+    # Show a message to the user when finished.
+    self.report({'INFO'}, (
+        success_message
+        + ' ('
+        + '; '.join(attempt_descriptions)
+        + ').'
+    ))
+    report_render_timings(self, render_job, render_is_successful=True)
+
+    return {'FINISHED'}
+
+
+def check_graphviz_capabilities(self, context):
+    """
+    With the given Blender operator (self), this function checks the cached
+    capabilities of the DOT command from the add-on’s preferences. If it is
+    known to be missing, or if no output format that it supports is selected,
+    then this function reports an error and returns False. Otherwise
+    (including when its capabilities are not yet known, in which case they
+    start being probed), it returns True.
+    """
+    addon_preferences = context.preferences.addons[__package__].preferences
+    dot_command = addon_preferences.dot_command
+    capabilities = get_graphviz_capabilities(dot_command)
+
+    if capabilities is None:
+        return True
+
+    if isinstance(capabilities['error'], GraphvizNotFoundError):
+        self.report({'ERROR'}, describe_render_error(
+            capabilities['error'],
+            dot_command,
+            output_file_path=None,
+        ))
+        return False
+
+    # Output formats that the DOT command does not support are never selected
+    # (see get_output_format_enum_items), so this is only empty when no
+    # supported format is selected.
+    if not addon_preferences.output_formats:
+        self.report({'ERROR'}, (
+            'No output format that the installed Graphviz supports is '
+            'selected. Select at least one output format '
+            'in the Rig Graphviz add-on’s preferences.'
+        ))
+        return False
+
+    return True
+
+
+def get_render_queue():
+    """
+    This function returns the add-on’s render queue (see render_queue),
+    creating it if no render has created it yet.
+    """
+    from .renderjobs import create_render_queue
+
+    global render_queue
+
+    if render_queue is None:
+        render_queue = create_render_queue()
+
+    return render_queue
+
+
+def submit_render_job(context, render_job):
+    """
+    This function submits the given render_job (see prepare_render_job) to the
+    render queue, which runs it in a background thread once fewer renders are
+    running than the add-on’s preferences allow, and it sets the render job’s
+    future. It returns None.
+    """
+    from .renderjobs import submit_render_stages
+
+    in_flight_render_cancel_events.add(render_job['cancel_event'])
+
+    render_queue = get_render_queue()
+    addon_preferences = context.preferences.addons[__package__].preferences
+    render_queue['max_num_of_running_tasks'] = (
+        addon_preferences.max_num_of_concurrent_renders
+    )
+
+    # Only the bpy-free render stages, with the already analyzed graph data,
+    # are handed off to the render queue’s background threads.
+    render_job['future'] = submit_render_stages(
+        render_queue,
+        render_job['task_key'],
+        render_job['cancel_event'],
+        render_job['render_stages'],
+        render_job['render_progress'],
+        render_job['render_profile'],
+    )
+
+    # The render job’s temporary files are removed once it finishes, even if
+    # its operator has already stopped.
+    render_job['future'].add_done_callback(
+        lambda future: shutil.rmtree(
+            render_job['temp_directory_path'],
+            ignore_errors=True,
+        ),
+    )
+
+
+def run_rig_graphviz_operator(
+    self,
+    context,
+    graph_data,
+    output_filename,
+    create_success_message,
+    title='',
+    rankdir='',
+):
+    """
+    With the given Blender operator (self), this function renders a Graphviz
+    image from the given operands in the given Blender context (see
+    prepare_render_job), and it returns the operator’s result.
+
+    The render is submitted to the render queue, which runs it in a background
+    thread once fewer renders are running than the add-on’s preferences allow.
+    If the render queue already has a render of the same output files, then
+    that older render is cancelled and replaced by this one.
+
+    If the operator’s render_is_modal attribute is true (see
+    RigGraphvizModalRender), then Blender’s UI stays responsive while the
+    operator keeps running as a modal operator. Its progress is shown in the
+    status bar, and it may be cancelled with the Esc key. Otherwise (e.g.,
+    when the operator is run by a script), the operator blocks until the
+    render finishes, and it has no preview.
+
+    While the render is waiting or while Graphviz is running, the render may
+    also be cancelled with the cancel-render operator.
+
+    The submitted render job (see prepare_render_job) is kept as the
+    operator’s render_job attribute.
+    """
+    render_job = prepare_render_job(
+        self,
+        context,
+        graph_data,
+        output_filename,
+        create_success_message,
+        title=title,
+        rankdir=rankdir,
+        preview_is_allowed=self.render_is_modal,
+    )
+
+    if render_job is None:
+        return {'CANCELLED'}
+
+    submit_render_job(context, render_job)
+    self.render_job = render_job
 
-    # Save the image data-block even though it has no users, protecting it from
-    # data-block purging from the Blender file.
-    image_data_block.use_fake_user = True
+    if not self.render_is_modal:
+        return finish_render_job(self, render_job, render_job['future'].result)
 
-    # Show a message to the user when finished.
-    self.report({'INFO'}, create_success_message(output_file_path))
+    window_manager = context.window_manager
+    self.render_timer = window_manager.event_timer_add(
+        render_progress_interval,
+        window=context.window,
+    )
+    window_manager.modal_handler_add(self)
+    context.workspace.status_text_set(create_render_status_text(render_job))
 
-    return {'FINISHED'}
+    return {'RUNNING_MODAL'}
 
 
 def create_time_description():
@@ -389,8 +2017,7 @@ def create_object_render_success_message(
     return (
         f'Graphviz diagram for {num_of_operands} {operands_word} '
         f'with {bone_determiner_word} bones '
-        f'has been rendered to “{output_file_path}” '
-        'and added to this file as an image data-block.'
+        f'has been rendered to “{output_file_path}”'
     )
 
 
@@ -399,20 +2026,173 @@ def create_bone_render_success_message(output_file_path, operands):
     operands_word = pluralize_bone(num_of_operands)
     return (
         f'Graphviz diagram for {num_of_operands} {operands_word} '
-        f'has been rendered to “{output_file_path}” '
-        'and added to this file as an image data-block.'
+        f'has been rendered to “{output_file_path}”'
     )
 
 
 def create_legend_render_success_message(output_file_path):
     return (
         f'Graphviz rig legend '
-        f'has been rendered to “{output_file_path}” '
-        'and added to this file as an image data-block.'
+        f'has been rendered to “{output_file_path}”'
+    )
+
+
+class RigGraphvizOperatorProperties:
+    """
+    This mixin class defines the properties that every rendering operator has.
+    Their values are chosen from the add-on’s menu (see RIG_MT_rig_graphviz)
+    or by scripts.
+
+    The operators are registered without the 'UNDO' option, so they have no
+    Adjust Last Operation panel: they write files to disk (and rotate their
+    backups), which Blender’s undo cannot reverse, so each change in that
+    panel would render again and overwrite the files that undo seemed to
+    restore.
+    """
+
+    bl_options = {'REGISTER'}
+
+    # Only the layout presets whose layout engines the DOT command supports
+    # are offered. (The default is the number of the automatic choice, which
+    # is the first item; dynamic enum defaults cannot be identifiers.)
+    layout_preset: bpy.props.EnumProperty(
+        name='Layout Preset',
+        items=get_operator_layout_preset_enum_items,
+        default=0,
     )
 
 
-class OBJECT_OT_rig_graphviz_with_all_bones(bpy.types.Operator):
+class RigGraphvizModalRender:
+    """
+    This mixin class makes a rendering operator modal whenever it is activated
+    by a UI event (e.g., by using one of its menu items), so that Blender’s UI
+    stays responsive while Graphviz runs in the background. The operator class
+    must define a render method, which calls run_rig_graphviz_operator.
+
+    When the operator is executed in any other way (e.g., by a script), it
+    renders synchronously instead.
+
+    Either way, the operator fails fast, before any rig is analyzed, if the
+    DOT command is already known to be missing (see the graphvizprobe module).
+
+    If profiling is chosen in the add-on’s preferences, then the operator’s
+    work in Blender’s main thread – analyzing the rig, and then loading the
+    rendered image – is profiled (see the renderprofiles module), as are the
+    render’s stages in the render queue’s background thread.
+    """
+
+    def invoke(self, context, event):
+        """
+        Blender calls this method when the operator is activated by a UI event.
+        """
+        from .renderprofiles import profile_render_part
+
+        if not check_graphviz_capabilities(self, context):
+            return {'CANCELLED'}
+        self.render_is_modal = True
+        self.start_render_records(context)
+        with profile_render_part(self.render_profile):
+            return self.render(context)
+
+    def execute(self, context):
+        """
+        Blender calls this method when the operator is activated in any other
+        way.
+        """
+        from .renderprofiles import profile_render_part
+
+        if not check_graphviz_capabilities(self, context):
+            return {'CANCELLED'}
+        self.render_is_modal = False
+        self.start_render_records(context)
+        with profile_render_part(self.render_profile):
+            operator_result = self.render(context)
+        if self.render_job is not None:
+            report_render_profile(self, self.render_job)
+        return operator_result
+
+    def start_render_records(self, context):
+        """
+        This method gives the operator a new timing record (see the
+        rendertimings module) and, if the add-on’s preferences call for it, a
+        new render profile (see the renderprofiles module), or else None. It
+        also clears the operator’s render job (see run_rig_graphviz_operator).
+        """
+        from .renderprofiles import create_render_profile
+
+        addon_preferences = context.preferences.addons[__package__].preferences
+        self.render_job = None
+        self.timing_record = create_timing_record()
+        self.render_profile = (
+            create_render_profile()
+            if addon_preferences.profiles_renders
+            else None
+        )
+
+    def modal(self, context, event):
+        """
+        Blender calls this method with each event while the operator is
+        running as a modal. The Esc key cancels the render, and timer events
+        update the render’s progress. All other events pass through to the
+        rest of Blender’s UI.
+        """
+        from .renderprofiles import profile_render_part
+
+        render_job = self.render_job
+
+        if event.type == 'ESC' and event.value == 'PRESS':
+            render_job['cancel_event'].set()
+            context.workspace.status_text_set(
+                create_render_status_text(render_job),
+            )
+            return {'RUNNING_MODAL'}
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        report_render_progress(self, render_job)
+
+        if not render_job['future'].done():
+            context.workspace.status_text_set(
+                create_render_status_text(render_job),
+            )
+            return {'PASS_THROUGH'}
+
+        self.stop_modal(context)
+
+        with profile_render_part(render_job['render_profile']):
+            operator_result = finish_render_job(
+                self,
+                render_job,
+                render_job['future'].result,
+            )
+        report_render_profile(self, render_job)
+
+        return operator_result
+
+    def cancel(self, context):
+        """
+        Blender calls this method when it stops the running modal itself
+        (e.g., when another Blender file is opened). The render is cancelled.
+        """
+        self.render_job['cancel_event'].set()
+        in_flight_render_cancel_events.discard(self.render_job['cancel_event'])
+        self.stop_modal(context)
+
+    def stop_modal(self, context):
+        """
+        This method removes the running modal’s timer and clears its progress
+        from the status bar.
+        """
+        context.window_manager.event_timer_remove(self.render_timer)
+        context.workspace.status_text_set(None)
+
+
+class OBJECT_OT_rig_graphviz_with_all_bones(
+    RigGraphvizOperatorProperties,
+    RigGraphvizModalRender,
+    bpy.types.Operator,
+):
     # The docstring is used by Blender for its description, so we do not use
     # line breaks. A period is also automatically added by Blender.
     'Render an image of relationships between active/selected scene objects (and all of their bones)' # noqa
@@ -422,11 +2202,13 @@ class OBJECT_OT_rig_graphviz_with_all_bones(bpy.types.Operator):
     # This attribute is used by Blender as the operator’s menu label.
     bl_label = 'Render Graph with All Bones'
 
-    def execute(self, context):
+    def render(self, context):
         """
-        Blender calls this method when the operator is activated. It will
-        start the operator’s action and continue it as a running modal with
-        regular timer events (see the modal method).
+        RigGraphvizModalRender calls this method when the operator is
+        activated. It analyzes the rig, then starts rendering it (see
+        run_rig_graphviz_operator). When the operator was activated by a UI
+        event, the render continues as a running modal with regular timer
+        events (see the modal method).
         """
         # This is a LayerObjects structure. It is guaranteed to have one active
         # object, though it may have zero selected object.
@@ -441,17 +2223,25 @@ class OBJECT_OT_rig_graphviz_with_all_bones(bpy.types.Operator):
         # data. See <https://blender.stackexchange.com/q/139101>. (This must be
         # done before accessing any actual data-blocks. See
         # <https://developer.blender.org/T53135#467105>.)
-        for so in operands:
-            so.update_from_editmode()
-
-        graph_data = analyze_rig_graph(
-            operands,
-            # No bones are excluded by the command (although right-sided
-            # symmetric bones are still excluded, since they are redundant with
-            # left-sided bones).
-            is_bone_excluded=lambda bone, armature_object:
-                False,
-        )
+        with record_timing_span(self.timing_record, 'update_from_editmode'):
+            for so in operands:
+                so.update_from_editmode()
+
+        with record_timing_span(
+            self.timing_record,
+            'analyze_rig_graph',
+            bones=count_armature_bones(operands),
+        ):
+            graph_data = analyze_operator_rig_graph(
+                self,
+                context,
+                operands,
+                # No bones are excluded by the command (although right-sided
+                # symmetric bones are still excluded, since they are redundant
+                # with left-sided bones).
+                is_bone_excluded=lambda bone, armature_object:
+                    False,
+            )
 
         time_string = create_time_description()
         num_of_operands = len(operands)
@@ -476,7 +2266,11 @@ class OBJECT_OT_rig_graphviz_with_all_bones(bpy.types.Operator):
         )
 
 
-class OBJECT_OT_rig_graphviz_with_visible_bones(bpy.types.Operator):
+class OBJECT_OT_rig_graphviz_with_visible_bones(
+    RigGraphvizOperatorProperties,
+    RigGraphvizModalRender,
+    bpy.types.Operator,
+):
     # The docstring is used by Blender for its description, so we do not use
     # line breaks. A period is also automatically added by Blender.
     'Render an image of relationships between active/selected scene objects (and their visible bones)' # noqa
@@ -486,12 +2280,16 @@ class OBJECT_OT_rig_graphviz_with_visible_bones(bpy.types.Operator):
     # This attribute is used by Blender as the operator’s menu label.
     bl_label = 'Render Graph with Visible Bones'
 
-    def execute(self, context):
+    def render(self, context):
         """
-        Blender calls this method when the operator is activated. It will
-        start the operator’s action and continue it as a running modal with
-        regular timer events (see the modal method).
+        RigGraphvizModalRender calls this method when the operator is
+        activated. It analyzes the rig, then starts rendering it (see
+        run_rig_graphviz_operator). When the operator was activated by a UI
+        event, the render continues as a running modal with regular timer
+        events (see the modal method).
         """
+        from .analyzebones import are_bone_and_opposite_invisible
+
         # This is a LayerObjects structure. It is guaranteed to have one active
         # object, though it may have zero selected object.
         view_layer_object_collection = context.view_layer.objects
@@ -505,18 +2303,26 @@ class OBJECT_OT_rig_graphviz_with_visible_bones(bpy.types.Operator):
         # data. See <https://blender.stackexchange.com/q/139101>. (This must be
         # done before accessing any actual data-blocks. See
         # <https://developer.blender.org/T53135#467105>.)
-        for so in operands:
-            so.update_from_editmode()
-
-        graph_data = analyze_rig_graph(
-            operands,
-            is_bone_excluded=lambda bone, armature_object:
-                are_bone_and_opposite_invisible(
-                    bone=bone,
-                    armature_object=armature_object,
-                    context_mode=context.mode,
-                ),
-        )
+        with record_timing_span(self.timing_record, 'update_from_editmode'):
+            for so in operands:
+                so.update_from_editmode()
+
+        with record_timing_span(
+            self.timing_record,
+            'analyze_rig_graph',
+            bones=count_armature_bones(operands),
+        ):
+            graph_data = analyze_operator_rig_graph(
+                self,
+                context,
+                operands,
+                is_bone_excluded=lambda bone, armature_object:
+                    are_bone_and_opposite_invisible(
+                        bone=bone,
+                        armature_object=armature_object,
+                        context_mode=context.mode,
+                    ),
+            )
 
         time_string = create_time_description()
         num_of_operands = len(operands)
@@ -540,14 +2346,36 @@ class OBJECT_OT_rig_graphviz_with_visible_bones(bpy.types.Operator):
             title=title,
         )
 
-    def invoke(self, context, event):
-        """
-        Blender calls this method when the operator is activated by a UI event
-        (e.g., by using one of its menu items).
-        """
-        # There is no extra information needed from the event, so we need to
-        # do nothing extra before delegating to the execute method.
-        return self.execute(context)
+
+def is_any_bone_selected(context):
+    """
+    Returns whether any EditBone (if in armature Edit Mode) or any PoseBone
+    (if in Pose Mode) is selected. This is called by the selected-bones
+    operator’s poll method, on every redraw of the menus that contain the
+    operator, so it does not load edit-mode data or build any list of Bone
+    structs. When the active bone is selected (which is almost always the
+    case when any bone is selected), it takes constant time.
+
+    Otherwise, it falls back to Blender’s own list of selected bones, which
+    Blender builds from every bone of the armature, so the fallback still
+    takes time proportional to the armature’s size. (Stopping at the first
+    selected bone in Python would need an RNA access for each bone, and it
+    would not follow Blender’s rules about which bones count as selected,
+    e.g., hidden bones.)
+    """
+    if context.mode == 'EDIT_ARMATURE':
+        active_bone = context.active_bone
+        if active_bone is not None and active_bone.select:
+            return True
+        return bool(context.selected_bones)
+
+    elif context.mode == 'POSE':
+        active_pose_bone = context.active_pose_bone
+        if active_pose_bone is not None and active_pose_bone.bone.select:
+            return True
+        return bool(context.selected_pose_bones)
+
+    return False
 
 
 def get_selected_bones(context):
@@ -555,16 +2383,13 @@ def get_selected_bones(context):
     Returns a list of the selected Bone structs for the currently selected
     EditBones (if in armature Edit Mode) or for the currently selected
     PoseBones (if in Pose Mode).
+
+    The active armature scene object must already have been updated with any
+    pending edit-mode data (see the selected-bones operator’s render method).
     """
     # This is an armature scene object.
     active_object = context.view_layer.objects.active
 
-    # The armature scene object must be updated with any pending edit-mode
-    # data. See <https://blender.stackexchange.com/q/139101>. (This must be
-    # done before accessing any actual data-blocks. See
-    # <https://developer.blender.org/T53135#467105>.)
-    active_object.update_from_editmode()
-
     if context.mode == 'EDIT_ARMATURE':
         return [
             active_object.data.bones[eb.name]
@@ -580,7 +2405,11 @@ def get_selected_bones(context):
         ]
 
 
-class ARMATURE_OT_rig_graphviz_selected_bones_only(bpy.types.Operator):
+class ARMATURE_OT_rig_graphviz_selected_bones_only(
+    RigGraphvizOperatorProperties,
+    RigGraphvizModalRender,
+    bpy.types.Operator,
+):
     # The docstring is used by Blender for its description, so we do not use
     # line breaks. A period is also automatically added by Blender.
     'Render an image of relationships between selected bones only; available only when at least one bone is selected in armature Edit Mode or Pose Mode' # noqa
@@ -596,24 +2425,36 @@ class ARMATURE_OT_rig_graphviz_selected_bones_only(bpy.types.Operator):
         Blender calls this method to determine whether the operator may be
         activated. Armature Edit Mode or Pose Mode must be active, and at least
         one bone must be selected.
+
+        Blender calls this method whenever it redraws a menu that contains the
+        operator, so the selected bones are only resolved when the operator
+        renders (see is_any_bone_selected).
         """
         if context.mode != 'EDIT_ARMATURE' and context.mode != 'POSE':
             return False
 
-        if not len(get_selected_bones(context)):
-            return False
-
-        return True
+        return is_any_bone_selected(context)
 
-    def execute(self, context):
+    def render(self, context):
         """
-        Blender calls this method when the operator is activated. It will
-        start the operator’s action and continue it as a running modal with
-        regular timer events (see the modal method).
+        RigGraphvizModalRender calls this method when the operator is
+        activated. It analyzes the rig, then starts rendering it (see
+        run_rig_graphviz_operator). When the operator was activated by a UI
+        event, the render continues as a running modal with regular timer
+        events (see the modal method).
         """
+        from .analyzebones import normalize_symmetric_bones_to_left_side
+
         # This is an armature scene object.
         active_object = context.view_layer.objects.active
 
+        # The armature scene object must be updated with any pending edit-mode
+        # data. See <https://blender.stackexchange.com/q/139101>. (This must be
+        # done before accessing any actual data-blocks. See
+        # <https://developer.blender.org/T53135#467105>.)
+        with record_timing_span(self.timing_record, 'update_from_editmode'):
+            active_object.update_from_editmode()
+
         selected_bones = get_selected_bones(context)
 
         included_bone_set = set(
@@ -626,14 +2467,21 @@ class ARMATURE_OT_rig_graphviz_selected_bones_only(bpy.types.Operator):
         def is_bone_unselected(bone, armature_object):
             return bone not in included_bone_set
 
-        graph_data = analyze_rig_graph(
-            # The active armature scene object is the only scene object that
-            # will be scanned.
-            [active_object],
-            # This predicate will exclude any bone that is not selected from
-            # the graph.
-            is_bone_excluded=is_bone_unselected,
-        )
+        with record_timing_span(
+            self.timing_record,
+            'analyze_rig_graph',
+            bones=len(included_bone_set),
+        ):
+            graph_data = analyze_operator_rig_graph(
+                self,
+                context,
+                # The active armature scene object is the only scene object
+                # that will be scanned.
+                [active_object],
+                # This predicate will exclude any bone that is not selected
+                # from the graph.
+                is_bone_excluded=is_bone_unselected,
+            )
 
         time_string = create_time_description()
         title = f'{time_string} • {len(included_bone_set)} Selected Bones Only'
@@ -651,17 +2499,12 @@ class ARMATURE_OT_rig_graphviz_selected_bones_only(bpy.types.Operator):
             title=title,
         )
 
-    def invoke(self, context, event):
-        """
-        Blender calls this method when the operator is activated by a UI event
-        (e.g., by using one of its menu items).
-        """
-        # There is no extra information needed from the event, so we need to
-        # do nothing extra before delegating to the execute method.
-        return self.execute(context)
-
 
-class OBJECT_OT_rig_graphviz_legend(bpy.types.Operator):
+class OBJECT_OT_rig_graphviz_legend(
+    RigGraphvizOperatorProperties,
+    RigGraphvizModalRender,
+    bpy.types.Operator,
+):
     # The docstring is used by Blender for its description, so we do not use
     # line breaks. A period is also automatically added by Blender.
     'Render an image explaining the rig graphs’ graphics.'
@@ -671,12 +2514,16 @@ class OBJECT_OT_rig_graphviz_legend(bpy.types.Operator):
     # This attribute is used by Blender as the operator’s menu label.
     bl_label = 'Render Graph Legend'
 
-    def execute(self, context):
+    def render(self, context):
         """
-        Blender calls this method when the operator is activated. It will
-        start the operator’s action and continue it as a running modal with
-        regular timer events (see the modal method).
+        RigGraphvizModalRender calls this method when the operator is
+        activated. It analyzes the rig, then starts rendering it (see
+        run_rig_graphviz_operator). When the operator was activated by a UI
+        event, the render continues as a running modal with regular timer
+        events (see the modal method).
         """
+        from .analyzerigs import create_legend_data
+
         graph_data = create_legend_data()
 
         return run_rig_graphviz_operator(
@@ -691,14 +2538,486 @@ class OBJECT_OT_rig_graphviz_legend(bpy.types.Operator):
             create_success_message=create_legend_render_success_message
         )
 
+
+def get_id_name(data_block):
+    """
+    This function returns a (type name, name) tuple that identifies the given
+    ID data-block (e.g., ('Armature', 'Armature.001')), for comparing
+    data-blocks between depsgraph updates without keeping references to
+    them.
+    """
+    return (type(data_block).__name__, data_block.name)
+
+
+def handle_live_graph_depsgraph_update(scene, depsgraph):
+    """
+    Blender calls this function after each depsgraph update while a live
+    graph is running (see OBJECT_OT_rig_graphviz_live_graph). If any watched
+    data-block was updated, then it records the time of the update, from
+    which the live graph waits before analyzing its rig again. (Whether the
+    update changed the graph is only known once the rig is analyzed, and an
+    unchanged graph is not rendered again.) It does no other work, so that it
+    never slows down editing.
+
+    Updates that Blender reports while the live graph loads its objects’
+    edit-mode data are ignored, since they are not edits.
+    """
+    if live_graph_state['is_loading_edit_mode_data']:
+        return
+
+    watched_id_names = live_graph_state['watched_id_names']
+
+    for depsgraph_update in depsgraph.updates:
+        if get_id_name(depsgraph_update.id.original) in watched_id_names:
+            live_graph_state['last_update_time'] = time.monotonic()
+            return
+
+
+def remove_live_graph_depsgraph_handler():
+    """
+    This function removes handle_live_graph_depsgraph_update from Blender’s
+    depsgraph_update_post handlers, if it is there. It returns None.
+    """
+    depsgraph_update_handlers = bpy.app.handlers.depsgraph_update_post
+    if handle_live_graph_depsgraph_update in depsgraph_update_handlers:
+        depsgraph_update_handlers.remove(handle_live_graph_depsgraph_update)
+
+
+class OBJECT_OT_rig_graphviz_live_graph(
+    RigGraphvizOperatorProperties,
+    bpy.types.Operator,
+):
+    # The docstring is used by Blender for its description, so we do not use
+    # line breaks. A period is also automatically added by Blender.
+    'Keep re-rendering the graph of the active/selected scene objects in the background whenever they are edited; each re-render first analyzes the rig again, which briefly pauses Blender on large rigs; use again to stop' # noqa
+
+    # This attribute is used by Blender as the operator’s Python ID.
+    bl_idname = 'object.rig_graphviz_live_graph'
+    # This attribute is used by Blender as the operator’s menu label.
+    bl_label = 'Start or Stop Live Graph'
+
+    # A live graph keeps running until it is stopped, so it is neither undone
+    # nor adjusted like the other rendering operators.
+    bl_options = set()
+
+    includes_all_bones: bpy.props.BoolProperty(
+        name='Include All Bones',
+        description='Include hidden bones as well as visible bones',
+        default=False,
+    )
+
     def invoke(self, context, event):
         """
-        Blender calls this method when the operator is activated by a UI event
-        (e.g., by using one of its menu items).
+        Blender calls this method when the operator is activated by a UI event.
+        If a live graph is already running, then it is stopped. Otherwise, a
+        live graph of the active/selected scene objects starts running as a
+        modal operator: the objects are watched by a depsgraph_update_post
+        handler, and regular timer events re-render them in the background
+        whenever they have changed (see the modal method).
+        """
+        if live_graph_state['is_running']:
+            live_graph_state['stop_is_requested'] = True
+            return {'FINISHED'}
+
+        if not check_graphviz_capabilities(self, context):
+            return {'CANCELLED'}
+
+        # This is a LayerObjects structure. It is guaranteed to have one active
+        # object, though it may have zero selected object.
+        view_layer_object_collection = context.view_layer.objects
+        active_object = view_layer_object_collection.active
+        selected_object_list = list(view_layer_object_collection.selected)
+
+        # If no objects are selected, then use the active object.
+        operands = selected_object_list or [active_object]
+
+        # The objects are watched by name, because references to them may
+        # become invalid (e.g., after an undo).
+        self.watched_object_names = [so.name for so in operands]
+        self.output_filename = get_rig_output_filename(context)
+        self.graph_hash = None
+        self.render_job = None
+        self.render_job_graph_hash = None
+
+        live_graph_state.update({
+            'is_running': True,
+            'stop_is_requested': False,
+            'watched_id_names': {
+                get_id_name(data_block)
+                for so in operands
+                for data_block in [so, *([so.data] if so.data else [])]
+            },
+            # The first render starts at the first timer event.
+            'last_update_time': 0,
+            'is_loading_edit_mode_data': False,
+        })
+        bpy.app.handlers.depsgraph_update_post.append(
+            handle_live_graph_depsgraph_update,
+        )
+
+        window_manager = context.window_manager
+        self.live_graph_timer = window_manager.event_timer_add(
+            render_progress_interval,
+            window=context.window,
+        )
+        window_manager.modal_handler_add(self)
+
+        self.report({'INFO'}, (
+            f'Live graph started for {len(operands)} '
+            f'{pluralize_object(len(operands))}. '
+            'Use Start or Stop Live Graph again to stop it.'
+        ))
+
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        """
+        Blender calls this method with each event while the live graph is
+        running. Timer events finish any render that is done, and they start
+        a new render once the watched objects have not changed for the
+        add-on’s live-graph delay. All events pass through to the rest of
+        Blender’s UI.
+        """
+        if live_graph_state['stop_is_requested']:
+            self.stop_live_graph(context)
+            self.report({'INFO'}, 'Live graph stopped.')
+            return {'FINISHED'}
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        render_job = self.render_job
+
+        if render_job is not None:
+            if not render_job['future'].done():
+                report_render_progress(self, render_job)
+                context.workspace.status_text_set(
+                    create_render_status_text(render_job),
+                )
+                return {'PASS_THROUGH'}
+
+            context.workspace.status_text_set(None)
+            self.render_job = None
+
+            # A graph whose render failed (or was cancelled) is rendered again
+            # after its next change, even if its hash is the same.
+            render_result = finish_render_job(
+                self,
+                render_job,
+                render_job['future'].result,
+            )
+            if render_result == {'FINISHED'}:
+                self.graph_hash = self.render_job_graph_hash
+
+        addon_preferences = context.preferences.addons[__package__].preferences
+        last_update_time = live_graph_state['last_update_time']
+        update_is_settled = (
+            last_update_time is not None
+            and (
+                time.monotonic() - last_update_time
+                >= addon_preferences.live_graph_debounce_time
+            )
+        )
+
+        if update_is_settled:
+            live_graph_state['last_update_time'] = None
+            self.start_live_render(context)
+
+        return {'PASS_THROUGH'}
+
+    def start_live_render(self, context):
+        """
+        This method analyzes the watched objects’ rig again. If its graph’s
+        hash differs from that of the last rendered graph, then it submits a
+        render of the graph to the render queue. It returns None.
+
+        Only the render runs in the background. Loading edit-mode data and
+        analyzing the rig use Blender’s data, which may be accessed only from
+        its main thread, so they block Blender’s UI while they run.
+        """
+        from .analyzebones import are_bone_and_opposite_invisible
+        from .storedlayouts import create_structural_hash
+
+        operands = [
+            bpy.data.objects[object_name]
+            for object_name
+            in self.watched_object_names
+            if object_name in bpy.data.objects
+        ]
+
+        if not operands:
+            self.report({'WARNING'}, (
+                'The live graph’s objects no longer exist, '
+                'so the live graph has stopped.'
+            ))
+            live_graph_state['stop_is_requested'] = True
+            return
+
+        # All operand scene objects must be updated with any pending edit-mode
+        # data. See <https://blender.stackexchange.com/q/139101>. (This must be
+        # done before accessing any actual data-blocks. See
+        # <https://developer.blender.org/T53135#467105>.) Blender reports the
+        # loaded edit-mode data as an update, which must not start another
+        # analysis. So the depsgraph is evaluated right away, which runs the
+        # depsgraph handler with that update while it is being ignored. (Any
+        # edits that Blender has not yet evaluated are reported to the handler
+        # first, so that they are not ignored with it. This analysis includes
+        # them, so they do not need another one.)
+        context.evaluated_depsgraph_get()
+        live_graph_state['last_update_time'] = None
+
+        self.timing_record = create_timing_record()
+        # Live renders are not profiled, since each would overwrite the last
+        # one’s profile.
+        self.render_profile = None
+
+        live_graph_state['is_loading_edit_mode_data'] = True
+        try:
+            with record_timing_span(
+                self.timing_record,
+                'update_from_editmode',
+            ):
+                edit_mode_data_is_loaded = False
+                for so in operands:
+                    if so.update_from_editmode():
+                        edit_mode_data_is_loaded = True
+                if edit_mode_data_is_loaded:
+                    context.evaluated_depsgraph_get()
+        finally:
+            live_graph_state['is_loading_edit_mode_data'] = False
+
+        with record_timing_span(
+            self.timing_record,
+            'analyze_rig_graph',
+            bones=count_armature_bones(operands),
+        ):
+            graph_data = analyze_operator_rig_graph(
+                self,
+                context,
+                operands,
+                is_bone_excluded=(
+                    (lambda bone, armature_object: False)
+                    if self.includes_all_bones
+                    else (
+                        lambda bone, armature_object:
+                            are_bone_and_opposite_invisible(
+                                bone=bone,
+                                armature_object=armature_object,
+                                context_mode=context.mode,
+                            )
+                    )
+                ),
+            )
+
+        # Nothing is rendered if the graph has not changed (e.g., when bones
+        # were only posed).
+        graph_hash = create_structural_hash(
+            graph_data,
+            dot_category_attrs_dict,
+            self.layout_preset,
+        )
+        if graph_hash == self.graph_hash:
+            return
+
+        time_string = create_time_description()
+        num_of_operands = len(operands)
+        object_word = pluralize_object(num_of_operands).capitalize()
+        bone_determiner_word = 'all' if self.includes_all_bones else 'visible'
+        title = (
+            f'{time_string} • Live Graph of {num_of_operands} {object_word} '
+            f'with {bone_determiner_word.capitalize()} Bones'
+        )
+
+        render_job = prepare_render_job(
+            self,
+            context,
+            graph_data,
+            self.output_filename,
+            create_success_message=lambda output_file_path:
+                create_object_render_success_message(
+                    output_file_path,
+                    operands,
+                    bone_determiner_word=bone_determiner_word,
+                ),
+            title=title,
+            preview_is_allowed=False,
+        )
+
+        if render_job is None:
+            return
+
+        submit_render_job(context, render_job)
+        self.render_job = render_job
+        self.render_job_graph_hash = graph_hash
+
+    def cancel(self, context):
+        """
+        Blender calls this method when it stops the running modal itself
+        (e.g., when another Blender file is opened). The live graph stops.
+        """
+        self.stop_live_graph(context)
+
+    def stop_live_graph(self, context):
+        """
+        This method cancels any running render of the live graph, removes its
+        timer and depsgraph_update_post handler, and clears its state.
+        """
+        if self.render_job is not None:
+            self.render_job['cancel_event'].set()
+            in_flight_render_cancel_events.discard(
+                self.render_job['cancel_event'],
+            )
+            self.render_job = None
+
+        context.window_manager.event_timer_remove(self.live_graph_timer)
+        context.workspace.status_text_set(None)
+        remove_live_graph_depsgraph_handler()
+
+        live_graph_state.update({
+            'is_running': False,
+            'stop_is_requested': False,
+            'watched_id_names': set(),
+            'last_update_time': None,
+            'is_loading_edit_mode_data': False,
+        })
+
+
+class OBJECT_OT_rig_graphviz_cancel_render(bpy.types.Operator):
+    # The docstring is used by Blender for its description, so we do not use
+    # line breaks. A period is also automatically added by Blender.
+    'Stop any Rig Graphviz render that is waiting or whose Graphviz process is running' # noqa
+
+    # This attribute is used by Blender as the operator’s Python ID.
+    bl_idname = 'object.rig_graphviz_cancel_render'
+    # This attribute is used by Blender as the operator’s menu label.
+    bl_label = 'Cancel Graph Render'
+
+    @classmethod
+    def poll(self, context):
+        """
+        Blender calls this method to determine whether the operator may be
+        activated. At least one render must be in flight.
+        """
+        return bool(in_flight_render_cancel_events)
+
+    def execute(self, context):
+        """
+        Blender calls this method when the operator is activated. The renders’
+        Graphviz processes are killed the next time that they are checked.
+        """
+        for cancel_event in list(in_flight_render_cancel_events):
+            cancel_event.set()
+
+        return {'FINISHED'}
+
+
+class OBJECT_OT_rig_graphviz_clean_up_images(bpy.types.Operator):
+    # The docstring is used by Blender for its description, so we do not use
+    # line breaks. A period is also automatically added by Blender.
+    'Apply the image limits from the Rig Graphviz preferences now, and remove rendered images that nothing uses' # noqa
+
+    # This attribute is used by Blender as the operator’s Python ID.
+    bl_idname = 'object.rig_graphviz_clean_up_images'
+    # This attribute is used by Blender as the operator’s menu label.
+    bl_label = 'Clean Up Graph Images'
+
+    def execute(self, context):
+        """
+        Blender calls this method when the operator is activated. It evicts
+        the rendered images beyond the image limits (see
+        retain_rendered_image_data_blocks), removes the rendered images that
+        have no users (including those evicted by earlier renders), and
+        reports how much memory their pixels had taken.
+        """
+        addon_preferences = context.preferences.addons[__package__].preferences
+
+        loaded_pixel_bytes_before = get_loaded_pixel_bytes(
+            find_rendered_image_data_blocks(),
+        )
+
+        retain_rendered_image_data_blocks(addon_preferences)
+
+        num_of_removed_images = 0
+        for image_data_block in find_rendered_image_data_blocks():
+            if image_data_block.users == 0:
+                bpy.data.images.remove(image_data_block)
+                num_of_removed_images += 1
+
+        reclaimed_pixel_bytes = (
+            loaded_pixel_bytes_before
+            - get_loaded_pixel_bytes(find_rendered_image_data_blocks())
+        )
+
+        self.report({'INFO'}, (
+            f'Removed {num_of_removed_images} unused graph '
+            f'{"image" if num_of_removed_images == 1 else "images"} and '
+            f'freed {describe_pixel_bytes(reclaimed_pixel_bytes)} '
+            'of image memory.'
+        ))
+
+        return {'FINISHED'}
+
+
+class IMAGE_OT_rig_graphviz_open_full_image(bpy.types.Operator):
+    # The docstring is used by Blender for its description, so we do not use
+    # line breaks. A period is also automatically added by Blender.
+    'Replace this Rig Graphviz thumbnail with its full-resolution image, which may take a while to load' # noqa
+
+    # This attribute is used by Blender as the operator’s Python ID.
+    bl_idname = 'image.rig_graphviz_open_full_image'
+    # This attribute is used by Blender as the operator’s menu label.
+    bl_label = 'Open Full-Resolution Graph Image'
+
+    @classmethod
+    def poll(self, context):
+        """
+        Blender calls this method to determine whether the operator may be
+        activated. The Image Editor must show a rendered image’s thumbnail.
+        """
+        image_data_block = getattr(context.space_data, 'image', None)
+
+        return (
+            image_data_block is not None
+            and rendered_image_property_name in image_data_block
+            and image_data_block[rendered_image_property_name].get(
+                'is_thumbnail',
+                False,
+            )
+        )
+
+    def execute(self, context):
+        """
+        Blender calls this method when the operator is activated. The
+        thumbnail’s data-block is switched to its full image’s file.
         """
-        # There is no extra information needed from the event, so we need to
-        # do nothing extra before delegating to the execute method.
-        return self.execute(context)
+        image_data_block = context.space_data.image
+        output_file_path = (
+            image_data_block[rendered_image_property_name]['output_file_path']
+        )
+
+        if not os.path.isfile(output_file_path):
+            self.report(
+                {'ERROR'},
+                f'The full image “{output_file_path}” no longer exists.',
+            )
+            return {'CANCELLED'}
+
+        load_image_data_block(output_file_path)
+        redraw_image_editors()
+
+        return {'FINISHED'}
+
+
+def place_open_full_image_operator_in_menu(self, context):
+    """
+    This function is used by Blender to draw the open-full-image operator in
+    the Image Editor’s Image menu.
+    """
+    self.layout.separator()
+    self.layout.operator(
+        IMAGE_OT_rig_graphviz_open_full_image.bl_idname,
+        text=IMAGE_OT_rig_graphviz_open_full_image.bl_label,
+    )
 
 
 class RIG_MT_rig_graphviz(bpy.types.Menu):
@@ -729,11 +3048,48 @@ class RIG_MT_rig_graphviz(bpy.types.Menu):
             icon='RESTRICT_SELECT_OFF',
         )
         self.layout.separator()
+        # Each of these submenus renders with a chosen layout preset.
+        for operator_class, text in (
+            (OBJECT_OT_rig_graphviz_with_all_bones, 'All Bones with Preset'),
+            (
+                OBJECT_OT_rig_graphviz_with_visible_bones,
+                'Visible Bones with Preset',
+            ),
+            (
+                ARMATURE_OT_rig_graphviz_selected_bones_only,
+                'Selected Bones with Preset',
+            ),
+        ):
+            self.layout.operator_menu_enum(
+                operator_class.bl_idname,
+                'layout_preset',
+                text=text,
+            )
+        self.layout.separator()
         self.layout.operator(
             OBJECT_OT_rig_graphviz_legend.bl_idname,
             text=OBJECT_OT_rig_graphviz_legend.bl_label,
             icon='INFO',
         )
+        self.layout.operator(
+            OBJECT_OT_rig_graphviz_live_graph.bl_idname,
+            text=(
+                'Stop Live Graph'
+                if live_graph_state['is_running']
+                else 'Start Live Graph'
+            ),
+            icon='FILE_REFRESH',
+        )
+        self.layout.operator(
+            OBJECT_OT_rig_graphviz_cancel_render.bl_idname,
+            text=OBJECT_OT_rig_graphviz_cancel_render.bl_label,
+            icon='CANCEL',
+        )
+        self.layout.operator(
+            OBJECT_OT_rig_graphviz_clean_up_images.bl_idname,
+            text=OBJECT_OT_rig_graphviz_clean_up_images.bl_label,
+            icon='TRASH',
+        )
 
 
 def place_operators_in_menu(self, context):
@@ -753,6 +3109,10 @@ addon_classes = (
     OBJECT_OT_rig_graphviz_with_visible_bones,
     ARMATURE_OT_rig_graphviz_selected_bones_only,
     OBJECT_OT_rig_graphviz_legend,
+    OBJECT_OT_rig_graphviz_live_graph,
+    OBJECT_OT_rig_graphviz_cancel_render,
+    OBJECT_OT_rig_graphviz_clean_up_images,
+    IMAGE_OT_rig_graphviz_open_full_image,
 )
 
 
@@ -770,6 +3130,14 @@ def register():
     """
     register_addon_classes()
 
+    # The DOT command from the add-on’s preferences is probed in the
+    # background, so that its capabilities are usually known before the first
+    # render. (The add-on’s preferences are missing if the add-on is being
+    # registered without being enabled, e.g., from Blender’s Text editor.)
+    addon = bpy.context.preferences.addons.get(__package__)
+    if addon is not None:
+        start_graphviz_probe(addon.preferences.dot_command)
+
     # Append the operators to the Object Mode’s Object menu.
     bpy.types.VIEW3D_MT_object.append(place_operators_in_menu)
 
@@ -779,12 +3147,19 @@ def register():
     # Append the operators to the armature Pose Mode’s Pose menu.
     bpy.types.VIEW3D_MT_pose.append(place_operators_in_menu)
 
+    # Append the open-full-image operator to the Image Editor’s Image menu.
+    bpy.types.IMAGE_MT_image.append(place_open_full_image_operator_in_menu)
+
 
 def unregister():
     """
     This function is used by Blender when disabling the add-on – or when
     Blender quits with the add-on enabled.
     """
+    # Any running live graph stops watching its objects.
+    live_graph_state['stop_is_requested'] = True
+    remove_live_graph_depsgraph_handler()
+
     unregister_addon_classes()
 
     # Append the render operator to the Object Mode’s Object menu.
@@ -796,6 +3171,9 @@ def unregister():
     # Remove the operator from the armature Pose Mode’s Pose menu.
     bpy.types.VIEW3D_MT_pose.remove(place_operators_in_menu)
 
+    # Remove the open-full-image operator from the Image Editor’s Image menu.
+    bpy.types.IMAGE_MT_image.remove(place_open_full_image_operator_in_menu)
+
 
 # If the script is being run directly from Blender's Text editor, then register
 # the add-on without installing it.
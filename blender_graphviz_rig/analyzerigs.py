@@ -1098,6 +1098,20 @@ def analyze_rig_graph(blender_structs, is_bone_excluded):
     return graph_data
 
 
+def count_graph_nodes_and_edges(graph_data):
+    """
+    This function returns a tuple (num_of_nodes, num_of_edges) for the given
+    graph data. See initialize_graph_data for more information on graph data.
+    """
+    num_of_nodes = len(graph_data['free_nodes']) + sum(
+        len(cluster_nodes)
+        for cluster_nodes
+        in graph_data['cluster_nodes_dict'].values()
+    )
+    num_of_edges = len(graph_data['edge_tuple_dict'])
+    return (num_of_nodes, num_of_edges)
+
+
 def create_legend_data():
     """
     This function creates a graph representing an explanatory legend.
@@ -0,0 +1,305 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This module backs up output files before they are overwritten, and it keeps
+their backups within a retention policy.
+
+The backups of an output file with a filename and a file extension are named
+with the filename – then “.0”, “.1”, “.2”, and so on – then the file extension
+(e.g., “Rig.0.png”, “Rig.1.png”). Each new backup gets the index after the
+highest existing index, so that backups are always in order from oldest to
+newest, even after older backups have been evicted. The existing backups are
+found with a single scan of their directory, rather than by checking one
+filename after another, which would cost one filesystem call per backup.
+
+A backup is made without copying any data, no matter how large the output
+file is. An output file that must stay in place until a new file replaces it
+(see the savefiles module) is hard-linked to its backup with os.link. Other
+output files (and directories, e.g., of PNG tiles, and files on filesystems
+without hard links) are renamed to their backups with os.replace. (Only if
+both fail is the file copied instead.)
+
+A retention policy is a dictionary with these items, each of which may be None
+for no limit:
+
+max_count: The maximum number of backups of each output file.
+
+max_bytes: The maximum total size in bytes of the backups of each output file.
+
+max_age: The maximum age in seconds of each backup.
+
+Whenever a retention policy is exceeded, the oldest backups are evicted first.
+"""
+
+import errno
+import os
+import re
+import shutil
+import time
+
+# This retention policy keeps every backup.
+unlimited_backup_retention = {
+    'max_count': None,
+    'max_bytes': None,
+    'max_age': None,
+}
+
+
+def get_backup_file_path(directory_path, filename, file_extension, index):
+    """
+    This function returns the path of the backup with the given index of the
+    output file with the given filename and file_extension in the given
+    directory_path.
+    """
+    return (
+        os.path.join(directory_path, filename)
+        + f'.{index}{file_extension}'
+    )
+
+
+def get_backup_size(backup_path):
+    """
+    This function returns the size in bytes of the backup file at the given
+    backup_path – or, if it is a directory, the total size of its files.
+    """
+    if not os.path.isdir(backup_path):
+        return os.path.getsize(backup_path)
+
+    total_size = 0
+    for parent_directory_path, _, child_filenames in os.walk(backup_path):
+        for child_filename in child_filenames:
+            total_size += os.path.getsize(
+                os.path.join(parent_directory_path, child_filename),
+            )
+    return total_size
+
+
+def scan_backups(
+    directory_path,
+    filename,
+    file_extension,
+    sizes_are_measured=False,
+):
+    """
+    This function scans the given directory_path once and returns a list of
+    the backups of the output file with the given filename and file_extension,
+    in order from oldest to newest. Each backup is a dictionary with these
+    items:
+
+    index: The backup’s index.
+
+    path: The backup’s path.
+
+    mtime: The backup’s modification time, in seconds since the epoch.
+
+    size: The backup’s size in bytes, if sizes_are_measured is true
+    (measuring the sizes of directories of PNG tiles takes more filesystem
+    calls), or else None.
+
+    If there is no directory at directory_path, then the list is empty.
+    """
+    backup_name_pattern = re.compile(
+        re.escape(filename) + r'\.(\d+)' + re.escape(file_extension),
+    )
+
+    backups = []
+
+    try:
+        with os.scandir(directory_path or os.curdir) as dir_entries:
+            for dir_entry in dir_entries:
+                name_match = backup_name_pattern.fullmatch(dir_entry.name)
+                if name_match is None:
+                    continue
+
+                backups.append({
+                    'index': int(name_match.group(1)),
+                    'path': dir_entry.path,
+                    'mtime': dir_entry.stat(follow_symlinks=False).st_mtime,
+                    'size': (
+                        get_backup_size(dir_entry.path)
+                        if sizes_are_measured
+                        else None
+                    ),
+                })
+
+    except FileNotFoundError:
+        return []
+
+    backups.sort(key=lambda backup: backup['index'])
+
+    return backups
+
+
+def select_evicted_backups(backups, retention, now=None):
+    """
+    This function returns a list of those of the given backups (from
+    scan_backups, in order from oldest to newest) that exceed the given
+    retention policy (see this module’s docstring), oldest first. The backups
+    must have sizes if the retention policy has a max_bytes.
+    """
+    if now is None:
+        now = time.time()
+
+    max_count = retention.get('max_count')
+    max_bytes = retention.get('max_bytes')
+    max_age = retention.get('max_age')
+
+    num_of_evicted_backups = 0
+
+    if max_age is not None:
+        while (
+            num_of_evicted_backups < len(backups)
+            and now - backups[num_of_evicted_backups]['mtime'] > max_age
+        ):
+            num_of_evicted_backups += 1
+
+    if max_count is not None:
+        num_of_evicted_backups = max(
+            num_of_evicted_backups,
+            len(backups) - max_count,
+        )
+
+    if max_bytes is not None:
+        total_bytes = sum(
+            backup['size']
+            for backup
+            in backups[num_of_evicted_backups:]
+        )
+        while (
+            num_of_evicted_backups < len(backups)
+            and total_bytes > max_bytes
+        ):
+            total_bytes -= backups[num_of_evicted_backups]['size']
+            num_of_evicted_backups += 1
+
+    return backups[:num_of_evicted_backups]
+
+
+def remove_backup(backup_path):
+    """
+    This function removes the backup file (or directory) at the given
+    backup_path. It does nothing if there is no such backup.
+    """
+    try:
+        if os.path.isdir(backup_path) and not os.path.islink(backup_path):
+            shutil.rmtree(backup_path)
+        else:
+            os.remove(backup_path)
+
+    except FileNotFoundError:
+        # In this case, the backup was already removed (e.g., by another
+        # render).
+        pass
+
+
+def move_to_new_path(source_path, destination_path):
+    """
+    This function renames the file (or directory) at the given source_path to
+    the given destination_path. Unlike os.replace, it raises a
+    FileExistsError instead of replacing any existing file at the
+    destination_path. (The check and the rename are not one atomic step, but
+    they narrow the window in which concurrent renders could collide.)
+    """
+    if os.path.lexists(destination_path):
+        raise FileExistsError(
+            errno.EEXIST,
+            os.strerror(errno.EEXIST),
+            destination_path,
+        )
+
+    os.replace(source_path, destination_path)
+
+
+def back_up_file(
+    directory_path,
+    filename,
+    file_extension,
+    retention=unlimited_backup_retention,
+    file_is_kept=False,
+):
+    """
+    If a file (or directory) exists at the given directory_path with the given
+    filename and file_extension, then this function moves it to a new backup
+    (see this module’s docstring), then evicts the oldest backups that exceed
+    the given retention policy. It returns the path of the new backup, or None
+    if there was no file to back up.
+
+    If file_is_kept is true, then a file is hard-linked to its backup where
+    possible, so that it also stays where it is.
+    """
+    source_file_path = os.path.join(directory_path, filename) + file_extension
+
+    if not os.path.lexists(source_file_path):
+        # In this case, there is no file yet to back up.
+        return None
+
+    sizes_are_measured = retention.get('max_bytes') is not None
+
+    backups = scan_backups(
+        directory_path,
+        filename,
+        file_extension,
+        sizes_are_measured=sizes_are_measured,
+    )
+
+    next_index = backups[-1]['index'] + 1 if backups else 0
+    source_is_directory = os.path.isdir(source_file_path)
+
+    while True:
+        backup_file_path = get_backup_file_path(
+            directory_path,
+            filename,
+            file_extension,
+            next_index,
+        )
+
+        try:
+            if file_is_kept and not source_is_directory:
+                try:
+                    os.link(source_file_path, backup_file_path)
+                except FileExistsError:
+                    raise
+                except OSError:
+                    # In this case, the filesystem does not support hard
+                    # links, so the file is moved after all.
+                    move_to_new_path(source_file_path, backup_file_path)
+            else:
+                move_to_new_path(source_file_path, backup_file_path)
+
+        except FileExistsError:
+            # In this case, another render (e.g., of another rig with the same
+            # output filename) took the backup index at the same time.
+            next_index += 1
+            continue
+
+        except FileNotFoundError:
+            # In this case, the file was removed since it was checked.
+            return None
+
+        except OSError as err:
+            if source_is_directory:
+                raise err
+            # In this case, the file could not be renamed (e.g., because it is
+            # locked by another program on Windows), so it is copied instead.
+            shutil.copyfile(source_file_path, backup_file_path)
+
+        break
+
+    backups.append({
+        'index': next_index,
+        'path': backup_file_path,
+        'mtime': time.time(),
+        'size': (
+            get_backup_size(backup_file_path)
+            if sizes_are_measured
+            else None
+        ),
+    })
+
+    for evicted_backup in select_evicted_backups(backups, retention):
+        # The new backup itself is never evicted.
+        if evicted_backup['index'] != next_index:
+            remove_backup(evicted_backup['path'])
+
+    return backup_file_path
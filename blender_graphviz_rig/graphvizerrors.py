@@ -0,0 +1,44 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This module defines the errors that rendering with Graphviz can raise (see the
+savefiles module). They are kept apart from the savefiles module, which
+imports asyncio and the Graphviz library’s bindings, so that the add-on’s
+preferences and Graphviz probe can use them without loading the rendering
+modules when the add-on is registered.
+"""
+
+
+class GraphvizNotFoundError(Exception):
+    """
+    This error class is used to indicate that the system shell could not find
+    the Graphviz DOT application.
+    """
+    pass
+
+
+class GraphvizOutputError(Exception):
+    """
+    This error class is used to indicate a problem raised by the Graphviz
+    application itself, such as a DOT-language syntax error in an input or
+    inability to save an image file at a given output location.
+    """
+    pass
+
+
+class GraphvizTimeoutError(Exception):
+    """
+    This error class is used to indicate that the Graphviz application did not
+    finish within its time budget, so its process was killed.
+    """
+    pass
+
+
+class GraphvizCancelledError(Exception):
+    """
+    This error class is used to indicate that rendering was cancelled (e.g., by
+    the user) while the Graphviz application was running, so its process was
+    killed.
+    """
+    pass
@@ -0,0 +1,326 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This module lays out and renders DOT text within Blender’s own process, using
+Graphviz’s shared libraries (libgvc and libcgraph), which are loaded with
+ctypes when they are present on the system. Rendering in-process skips the
+fixed costs of running the dot command as a subprocess – starting a process,
+loading Graphviz’s plugins, and exchanging files – which are a large fraction
+of the render time of small and medium graphs.
+
+The libraries are looked for next to the dot command (e.g., in Graphviz’s
+“bin” directory on Windows, or in the “lib” directory beside its “bin”
+directory on macOS and Linux), then wherever the OS finds shared libraries.
+They are optional: if they cannot be found or loaded, then the savefiles
+module runs the dot command as usual.
+
+Graphviz’s libraries are not thread-safe, so only one graph is laid out and
+rendered with them at a time, guarded by a lock. A layout in the libraries
+cannot be killed like a process, so a render that is still running when its
+time budget is exceeded (or when it is cancelled) is abandoned rather than
+stopped; it keeps holding the lock until it finishes, and other renders run
+the dot command in the meantime (see the savefiles module).
+"""
+
+import ctypes
+import ctypes.util
+import glob
+import os
+import shutil
+import sys
+import threading
+
+# These are the names of Graphviz’s shared libraries, without their
+# OS-specific prefixes and suffixes (e.g., “libgvc.so.6” or “gvc.dll”).
+graphviz_library_names = ('gvc', 'cgraph')
+
+# In Graphviz’s libraries, this is the kind of object (as opposed to nodes and
+# edges) whose attributes are set by agattr.
+agraph_object_kind = 0
+
+# Graphviz reports its error and warning messages to a function of this type.
+graphviz_error_function_type = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_char_p)
+
+# This lock is held whenever Graphviz’s libraries are being used.
+graphviz_library_lock = threading.Lock()
+
+# This dictionary caches the result of load_graphviz_library for each dot
+# command, so that the libraries are looked for and loaded only once.
+loaded_graphviz_library_dict = {}
+
+
+class GraphvizLibraryError(Exception):
+    """
+    This error class is used to indicate that Graphviz’s libraries could not
+    lay out or render a graph (e.g., because they lack the plugin for its
+    layout engine or output format), so the dot command should be run instead.
+    """
+    pass
+
+
+class GraphvizLibraryInputError(GraphvizLibraryError):
+    """
+    This error class is used to indicate that Graphviz’s libraries could not
+    read a graph’s DOT text (e.g., because of a DOT-language syntax error).
+    """
+    pass
+
+
+def find_graphviz_library_path(library_name, dot_command):
+    """
+    This function returns the path of the Graphviz shared library with the
+    given library_name (see graphviz_library_names) that belongs to the given
+    dot_command, or else of any such library that the OS can find, or else
+    None.
+    """
+    dot_command_path = shutil.which(dot_command) or dot_command
+    dot_directory_path = os.path.dirname(os.path.realpath(dot_command_path))
+    lib_directory_path = os.path.join(
+        os.path.dirname(dot_directory_path),
+        'lib',
+    )
+
+    if sys.platform == 'win32':
+        candidate_path_patterns = [
+            os.path.join(dot_directory_path, f'{library_name}.dll'),
+        ]
+    elif sys.platform == 'darwin':
+        candidate_path_patterns = [
+            os.path.join(lib_directory_path, f'lib{library_name}.dylib'),
+            os.path.join(lib_directory_path, f'lib{library_name}.*.dylib'),
+        ]
+    else:
+        candidate_path_patterns = [
+            os.path.join(lib_directory_path, f'lib{library_name}.so'),
+            os.path.join(lib_directory_path, f'lib{library_name}.so.*'),
+        ]
+
+    for candidate_path_pattern in candidate_path_patterns:
+        candidate_paths = sorted(glob.glob(candidate_path_pattern))
+        if candidate_paths:
+            return candidate_paths[0]
+
+    return ctypes.util.find_library(library_name)
+
+
+def declare_graphviz_library_functions(gvc_library, cgraph_library):
+    """
+    This function declares the argument and result types of the functions
+    that this module calls in the given ctypes libraries, so that ctypes
+    converts pointers correctly. It returns None.
+    """
+    gvc_library.gvContext.argtypes = []
+    gvc_library.gvContext.restype = ctypes.c_void_p
+
+    gvc_library.gvLayout.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_void_p,
+        ctypes.c_char_p,
+    ]
+    gvc_library.gvLayout.restype = ctypes.c_int
+
+    # Older versions of Graphviz declare the length as an unsigned int rather
+    # than a size_t. A size_t that starts as zero still reads correctly after
+    # such a version writes only its lower bytes (on little-endian
+    # processors, which include every processor that Blender supports).
+    gvc_library.gvRenderData.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_void_p,
+        ctypes.c_char_p,
+        ctypes.POINTER(ctypes.c_void_p),
+        ctypes.POINTER(ctypes.c_size_t),
+    ]
+    gvc_library.gvRenderData.restype = ctypes.c_int
+
+    gvc_library.gvFreeRenderData.argtypes = [ctypes.c_void_p]
+    gvc_library.gvFreeRenderData.restype = None
+
+    gvc_library.gvFreeLayout.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+    gvc_library.gvFreeLayout.restype = ctypes.c_int
+
+    cgraph_library.agmemread.argtypes = [ctypes.c_char_p]
+    cgraph_library.agmemread.restype = ctypes.c_void_p
+
+    cgraph_library.agget.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+    cgraph_library.agget.restype = ctypes.c_char_p
+
+    cgraph_library.agattr.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_int,
+        ctypes.c_char_p,
+        ctypes.c_char_p,
+    ]
+    cgraph_library.agattr.restype = ctypes.c_void_p
+
+    cgraph_library.agclose.argtypes = [ctypes.c_void_p]
+    cgraph_library.agclose.restype = ctypes.c_int
+
+    cgraph_library.agseterrf.argtypes = [graphviz_error_function_type]
+    cgraph_library.agseterrf.restype = ctypes.c_void_p
+
+
+def load_graphviz_library(dot_command):
+    """
+    This function loads the Graphviz shared libraries that belong to the
+    given dot_command (see find_graphviz_library_path), if it has not already
+    done so, and it returns a dictionary with these items – or None if the
+    libraries cannot be found or loaded:
+
+    gvc, cgraph: The loaded ctypes libraries.
+
+    context: A pointer to a Graphviz context, which has loaded Graphviz’s
+    plugins.
+
+    messages: A list, into which Graphviz’s error and warning messages are
+    collected while the libraries are used.
+
+    error_function: The ctypes callback that collects the messages, which must
+    be kept alive for as long as the libraries may call it.
+    """
+    if dot_command in loaded_graphviz_library_dict:
+        return loaded_graphviz_library_dict[dot_command]
+
+    graphviz_library = None
+
+    library_paths = [
+        find_graphviz_library_path(library_name, dot_command)
+        for library_name
+        in graphviz_library_names
+    ]
+
+    if None not in library_paths:
+        try:
+            cgraph_library = ctypes.CDLL(library_paths[1])
+            gvc_library = ctypes.CDLL(library_paths[0])
+            declare_graphviz_library_functions(gvc_library, cgraph_library)
+
+            messages = []
+
+            def collect_message(message):
+                messages.append(message.decode(errors='replace'))
+                return 0
+
+            error_function = graphviz_error_function_type(collect_message)
+            cgraph_library.agseterrf(error_function)
+
+            context = gvc_library.gvContext()
+
+            if context:
+                graphviz_library = {
+                    'gvc': gvc_library,
+                    'cgraph': cgraph_library,
+                    'context': context,
+                    'messages': messages,
+                    'error_function': error_function,
+                }
+
+        except (OSError, AttributeError):
+            # In this case, a library could not be loaded, or it lacks one of
+            # the functions (e.g., because it is from a very old version of
+            # Graphviz).
+            graphviz_library = None
+
+    loaded_graphviz_library_dict[dot_command] = graphviz_library
+
+    return graphviz_library
+
+
+def render_with_graphviz_library(
+    graphviz_library,
+    dot_text,
+    output_formats,
+    layout_engine='dot',
+    graph_attrs={},
+):
+    """
+    This function lays out the given dot_text once with the given
+    layout_engine, using the given graphviz_library (from
+    load_graphviz_library), and it renders the layout into memory in each of
+    the given output_formats (Graphviz output formats). It returns a
+    dictionary from each output format to its rendered data (bytes) – or None
+    if Graphviz’s libraries are already being used by another render, which
+    this function does not wait for.
+
+    The graph_attrs are a dictionary of DOT graph attributes, like Graphviz’s
+    -G command-line arguments: each applies only if the dot_text does not
+    already give that attribute a value, and any attribute whose value is None
+    is left out. (For a layout that is reused, the layout_engine is 'nop2',
+    which is equivalent to the -n2 command-line argument.)
+
+    If the dot_text cannot be read, then a GraphvizLibraryInputError is
+    raised. If the graph cannot be laid out or rendered, then a
+    GraphvizLibraryError is raised. Either error’s message is Graphviz’s own
+    messages.
+    """
+    if not graphviz_library_lock.acquire(blocking=False):
+        return None
+
+    gvc_library = graphviz_library['gvc']
+    cgraph_library = graphviz_library['cgraph']
+    context = graphviz_library['context']
+    messages = graphviz_library['messages']
+
+    try:
+        messages.clear()
+
+        graph = cgraph_library.agmemread(dot_text.encode())
+        if not graph:
+            raise GraphvizLibraryInputError(''.join(messages).strip())
+
+        try:
+            for attr_name, attr_value in graph_attrs.items():
+                if attr_value is None:
+                    continue
+                if cgraph_library.agget(graph, attr_name.encode()):
+                    # In this case, the DOT text already gives the attribute a
+                    # value, which overrides the default.
+                    continue
+                cgraph_library.agattr(
+                    graph,
+                    agraph_object_kind,
+                    attr_name.encode(),
+                    str(attr_value).encode(),
+                )
+
+            if gvc_library.gvLayout(context, graph, layout_engine.encode()):
+                raise GraphvizLibraryError(''.join(messages).strip())
+
+            try:
+                output_data_dict = {}
+
+                for output_format in output_formats:
+                    data_pointer = ctypes.c_void_p()
+                    data_length = ctypes.c_size_t(0)
+
+                    render_is_failed = gvc_library.gvRenderData(
+                        context,
+                        graph,
+                        output_format.encode(),
+                        ctypes.byref(data_pointer),
+                        ctypes.byref(data_length),
+                    )
+
+                    try:
+                        if render_is_failed:
+                            raise GraphvizLibraryError(
+                                ''.join(messages).strip(),
+                            )
+                        output_data_dict[output_format] = ctypes.string_at(
+                            data_pointer,
+                            data_length.value,
+                        )
+                    finally:
+                        if data_pointer:
+                            gvc_library.gvFreeRenderData(data_pointer)
+
+                return output_data_dict
+
+            finally:
+                gvc_library.gvFreeLayout(context, graph)
+
+        finally:
+            cgraph_library.agclose(graph)
+
+    finally:
+        graphviz_library_lock.release()
@@ -0,0 +1,238 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This module probes the installed Graphviz application for its capabilities:
+its version, the output formats that it can render (from ``dot -T?``), and
+the layout engines that it has (from ``dot -K?``). Graphviz builds differ
+(e.g., many Linux packages lack the sfdp engine, and minimal builds lack the
+PNG and PDF renderers), so the add-on can only offer what the installed
+Graphviz actually supports.
+
+Each DOT command is probed only once, in a background thread, and its
+capabilities are cached. The cache is keyed by the DOT command’s resolved
+path and modification time, so that upgrading Graphviz (which replaces the
+dot executable) makes the next check probe it again.
+
+Capabilities are a dictionary with these items:
+
+version: The Graphviz version string (e.g., '9.0.0'), or None if it could not
+be read.
+
+output_formats: A frozenset of the names of the Graphviz output formats (see
+the savefiles module) that the DOT command can render, without any renderer
+suffixes (e.g., 'png' for 'png:cairo').
+
+layout_engines: A frozenset of the names of the Graphviz layout engines that
+the DOT command has.
+
+error: None if the DOT command could be run, or else a GraphvizNotFoundError
+(if it could not be found) or an OSError (for other problems), which should
+be reported before any rig is analyzed.
+"""
+
+from .graphvizerrors import GraphvizNotFoundError
+
+import errno
+import os
+import re
+import shutil
+import subprocess
+import threading
+
+# Each probing run of the DOT command is stopped if it takes longer than this
+# many seconds.
+graphviz_probe_timeout = 10
+
+# This dictionary maps each DOT command’s key (see get_dot_command_key) to its
+# capabilities.
+graphviz_capabilities_dict = {}
+
+# This set contains the keys of the DOT commands that are being probed.
+probing_dot_command_keys = set()
+
+# This lock is held whenever graphviz_capabilities_dict or
+# probing_dot_command_keys is changed.
+graphviz_probe_lock = threading.Lock()
+
+# These output formats of the savefiles module are rendered with these
+# Graphviz output formats. (The layout-only formats – dot, json, and json0 –
+# are always available, because they are built into Graphviz’s core.)
+required_graphviz_output_format_dict = {
+    'png': 'png',
+    'svg': 'svg',
+    'svgz': 'svgz',
+    'pdf': 'pdf',
+    'json': 'json',
+    'png_tiles': 'png',
+    'ps_pages': 'ps2',
+    'png_thumbnail': 'png',
+}
+
+
+def get_dot_command_key(dot_command):
+    """
+    This function returns a tuple (path, mtime) that identifies the
+    executable that the given dot_command runs: its resolved path, and its
+    modification time (or None if it does not exist).
+    """
+    dot_command_path = os.path.realpath(
+        shutil.which(dot_command) or dot_command,
+    )
+
+    try:
+        dot_command_mtime = os.stat(dot_command_path).st_mtime
+    except OSError:
+        dot_command_mtime = None
+
+    return (dot_command_path, dot_command_mtime)
+
+
+def parse_graphviz_choices(graphviz_message):
+    """
+    This function returns a frozenset of the choices listed in the given
+    graphviz_message, which Graphviz prints when given an unknown option value
+    (e.g., 'Format: "?" not recognized. Use one of: bmp canon ... svg'). Any
+    renderer suffixes (e.g., ':cairo') are removed.
+    """
+    _, _, choices_text = graphviz_message.partition('Use one of:')
+
+    return frozenset(
+        choice.split(':')[0]
+        for choice
+        in choices_text.split()
+    )
+
+
+def run_dot_command_for_message(dot_command, dot_args):
+    """
+    This function synchronously runs the given dot_command with the given
+    dot_args, and it returns its stderr text, whatever its exit code. (Graphviz
+    prints its version and its lists of choices to stderr.)
+    """
+    completed_process = subprocess.run(
+        [dot_command, *dot_args],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        timeout=graphviz_probe_timeout,
+    )
+
+    return completed_process.stderr.decode(errors='replace')
+
+
+def probe_graphviz(dot_command):
+    """
+    This function synchronously runs the given dot_command a few times, and
+    it returns its capabilities (see this module’s docstring). It does not
+    raise errors; they are put into the capabilities instead.
+    """
+    try:
+        version_message = run_dot_command_for_message(dot_command, ['-V'])
+        output_format_message = run_dot_command_for_message(
+            dot_command,
+            ['-T?'],
+        )
+        layout_engine_message = run_dot_command_for_message(
+            dot_command,
+            ['-K?'],
+        )
+
+    except (OSError, subprocess.SubprocessError) as err:
+        if isinstance(err, OSError) and err.errno in (errno.ENOENT, None):
+            # In this case, Graphviz has not been installed on the OS, so its
+            # executable applications are not available in the system shell.
+            # (Windows raises a FileNotFoundError with no errno.)
+            error = GraphvizNotFoundError()
+        elif isinstance(err, OSError):
+            error = err
+        else:
+            # In this case, the DOT command did not finish in time.
+            error = OSError(
+                f'The DOT command did not finish within '
+                f'{graphviz_probe_timeout} seconds.'
+            )
+
+        return {
+            'version': None,
+            'output_formats': frozenset(),
+            'layout_engines': frozenset(),
+            'error': error,
+        }
+
+    version_match = re.search(r'version\s+(\S+)', version_message)
+
+    return {
+        'version': version_match.group(1) if version_match else None,
+        'output_formats': parse_graphviz_choices(output_format_message),
+        'layout_engines': parse_graphviz_choices(layout_engine_message),
+        'error': None,
+    }
+
+
+def get_cached_graphviz_capabilities(dot_command):
+    """
+    This function returns the cached capabilities of the given dot_command,
+    or None if it has not been probed since its executable last changed.
+    """
+    return graphviz_capabilities_dict.get(get_dot_command_key(dot_command))
+
+
+def start_graphviz_probe(dot_command):
+    """
+    This function starts probing the given dot_command in a background thread
+    (see probe_graphviz), unless its capabilities are already cached or are
+    already being probed. It returns None immediately.
+    """
+    dot_command_key = get_dot_command_key(dot_command)
+
+    with graphviz_probe_lock:
+        if (
+            dot_command_key in graphviz_capabilities_dict
+            or dot_command_key in probing_dot_command_keys
+        ):
+            return
+        probing_dot_command_keys.add(dot_command_key)
+
+    def run_probe():
+        capabilities = probe_graphviz(dot_command)
+        with graphviz_probe_lock:
+            graphviz_capabilities_dict[dot_command_key] = capabilities
+            probing_dot_command_keys.discard(dot_command_key)
+
+    # The thread is a daemon thread, so that a hanging DOT command does not
+    # stop Blender from quitting.
+    threading.Thread(target=run_probe, daemon=True).start()
+
+
+def get_graphviz_capabilities(dot_command):
+    """
+    This function returns the cached capabilities of the given dot_command,
+    like get_cached_graphviz_capabilities. If they are not cached, then it
+    starts probing the dot_command in the background (see
+    start_graphviz_probe) and returns None, so that the caller may go on
+    without them rather than wait.
+    """
+    capabilities = get_cached_graphviz_capabilities(dot_command)
+
+    if capabilities is None:
+        start_graphviz_probe(dot_command)
+
+    return capabilities
+
+
+def find_unsupported_output_formats(capabilities, output_formats):
+    """
+    This function returns a list of those of the given output_formats (of the
+    savefiles module) that cannot be rendered by a DOT command with the given
+    capabilities.
+    """
+    return [
+        output_format
+        for output_format
+        in output_formats
+        if required_graphviz_output_format_dict.get(
+            output_format,
+            output_format,
+        ) not in capabilities['output_formats']
+    ]
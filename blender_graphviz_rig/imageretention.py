@@ -0,0 +1,138 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This module keeps the Image data-blocks that renders load into the Blender
+file within a retention policy. Each loaded image has a fake user, so that it
+is saved in the Blender file even when nothing uses it – but without a limit,
+every graph that was ever rendered would stay in the file, and every large
+image whose pixels have been loaded would stay in memory.
+
+An image record is a dictionary with these items:
+
+name: The name of the Image data-block.
+
+render_time: The time.time() time of the render that last loaded the image.
+
+pixel_bytes: The number of bytes that the image’s pixels take in memory when
+they are loaded (see get_png_pixel_bytes).
+
+A retention policy is a dictionary with these items, each of which may be None
+for no limit:
+
+max_count: The maximum number of rendered images that keep their fake users.
+
+max_pixel_bytes: The maximum total pixel bytes of the rendered images that
+keep their fake users.
+
+Whenever a retention policy is exceeded, the least recently rendered images
+are evicted first. (The add-on’s __init__ module evicts an image by clearing
+its fake user and freeing its pixels, so that Blender drops the image from
+the file when it is saved, unless something else uses the image.)
+"""
+
+import struct
+
+# Every PNG file starts with these bytes, followed by its IHDR chunk, whose
+# first eight bytes of data are the image’s width and height.
+png_signature = b'\x89PNG\r\n\x1a\n'
+png_ihdr_chunk_type = b'IHDR'
+
+# Blender keeps the pixels of a loaded PNG image in a byte buffer with four
+# channels (RGBA), no matter how many channels the PNG file has.
+bytes_per_pixel = 4
+
+# This retention policy keeps every rendered image.
+unlimited_image_retention = {
+    'max_count': None,
+    'max_pixel_bytes': None,
+}
+
+
+def read_png_dimensions(png_file_path):
+    """
+    This function returns a tuple (width, height) of the PNG image at the
+    given png_file_path, read from its header without decoding its pixels. It
+    returns None if the file cannot be read or is not a PNG image.
+    """
+    try:
+        with open(png_file_path, mode='rb') as file:
+            header = file.read(24)
+    except OSError:
+        return None
+
+    if (
+        len(header) < 24
+        or header[:8] != png_signature
+        or header[12:16] != png_ihdr_chunk_type
+    ):
+        return None
+
+    return struct.unpack('>II', header[16:24])
+
+
+def get_png_pixel_bytes(png_file_path):
+    """
+    This function returns the number of bytes that the pixels of the PNG image
+    at the given png_file_path take in Blender’s memory when they are loaded,
+    or 0 if the image’s dimensions cannot be read.
+    """
+    dimensions = read_png_dimensions(png_file_path)
+
+    if dimensions is None:
+        return 0
+
+    width, height = dimensions
+    return width * height * bytes_per_pixel
+
+
+def select_evicted_images(image_records, retention, kept_image_names=()):
+    """
+    This function returns a list of those of the given image_records (see
+    this module’s docstring) that exceed the given retention policy, least
+    recently rendered first. The images whose names are in kept_image_names
+    (e.g., the image that a render has just loaded) are never evicted,
+    although they still count toward the retention policy’s limits.
+    """
+    max_count = retention.get('max_count')
+    max_pixel_bytes = retention.get('max_pixel_bytes')
+
+    num_of_kept_images = len(image_records)
+    total_pixel_bytes = sum(
+        image_record['pixel_bytes']
+        for image_record
+        in image_records
+    )
+
+    evicted_image_records = []
+
+    for image_record in sorted(
+        image_records,
+        key=lambda image_record: image_record['render_time'],
+    ):
+        is_within_retention = (
+            (max_count is None or num_of_kept_images <= max_count)
+            and (
+                max_pixel_bytes is None
+                or total_pixel_bytes <= max_pixel_bytes
+            )
+        )
+        if is_within_retention:
+            break
+
+        if image_record['name'] in kept_image_names:
+            continue
+
+        evicted_image_records.append(image_record)
+        num_of_kept_images -= 1
+        total_pixel_bytes -= image_record['pixel_bytes']
+
+    return evicted_image_records
+
+
+def describe_pixel_bytes(pixel_bytes):
+    """
+    This function returns a short, human-readable string for the given number
+    of bytes (e.g., '12.5 MB'), in the megabytes of the add-on’s preferences.
+    """
+    return f'{pixel_bytes / 1_000_000:,.1f} MB'
@@ -0,0 +1,253 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This module defines layout presets. Each preset is a named combination of a
+Graphviz layout engine and graph attributes, trading layout quality for speed.
+
+Graphviz’s dot engine with its default settings produces the clearest rig
+graphs, but it may take minutes on a complete Rigify human rig with all of its
+bones and constraints. Its network-simplex and mincross passes can be limited
+with the nslimit, nslimit1, and mclimit graph attributes, and straight edges
+(splines=line) are much cheaper to route than curved ones. (The limits must be
+combined with straight edges: routing curved edges around the less optimized
+node placement can make a limited layout even slower than an unlimited one.)
+The sfdp and osage engines do not rank nodes at all, but they are much faster
+still on very large graphs. The neato engine is in between; its spring model
+scales poorly past a few thousand nodes.
+
+We define the following keys for each preset dictionary in layout_preset_dict –
+
+label: A short, human-readable name, which is also shown in graph titles.
+
+description: A sentence describing the preset.
+
+engine: The Graphviz layout engine, which is given to Graphviz with -K.
+
+graph_attrs: A dictionary of extra DOT graph attributes.
+
+edge_labels_are_dropped: Whether edge labels (i.e., constraint names) are left
+out of the graph, which saves Graphviz the work of placing them.
+
+fallback: The name of a cheaper preset to retry with if a render with this
+preset exceeds its time budget, or None if there is no cheaper preset.
+"""
+
+# This dictionary maps each layout preset name to its preset dictionary, from
+# the highest-quality preset to the fastest ones.
+layout_preset_dict = {
+    'quality': {
+        'label': 'Quality',
+        'description': 'Ranked layout with curved edges and no limits',
+        'engine': 'dot',
+        'graph_attrs': {},
+        'edge_labels_are_dropped': False,
+        'fallback': 'fast',
+    },
+    'balanced': {
+        'label': 'Balanced',
+        'description': (
+            'Ranked layout with limited optimization passes and straight '
+            'edges'
+        ),
+        'engine': 'dot',
+        'graph_attrs': {
+            'nslimit': '4',
+            'nslimit1': '4',
+            'mclimit': '0.5',
+            'splines': 'line',
+        },
+        'edge_labels_are_dropped': False,
+        'fallback': 'fast',
+    },
+    'fast': {
+        'label': 'Fast',
+        'description': (
+            'Ranked layout with minimal optimization passes and straight '
+            'edges'
+        ),
+        'engine': 'dot',
+        'graph_attrs': {
+            'nslimit': '1',
+            'nslimit1': '1',
+            'mclimit': '0.1',
+            'splines': 'line',
+        },
+        'edge_labels_are_dropped': False,
+        'fallback': 'draft',
+    },
+    'draft': {
+        'label': 'Draft',
+        'description': (
+            'Ranked layout with minimal optimization passes, straight edges, '
+            'and no constraint labels'
+        ),
+        'engine': 'dot',
+        'graph_attrs': {
+            'nslimit': '1',
+            'nslimit1': '1',
+            'mclimit': '0.1',
+            'splines': 'line',
+        },
+        'edge_labels_are_dropped': True,
+        'fallback': 'sfdp',
+    },
+    'sfdp': {
+        'label': 'Force-Directed',
+        'description': (
+            'Unranked multiscale layout (sfdp) with straight edges, for very '
+            'large graphs; clusters are not drawn'
+        ),
+        'engine': 'sfdp',
+        'graph_attrs': {
+            'overlap': 'scale',
+            'splines': 'line',
+            'maxiter': '200',
+        },
+        'edge_labels_are_dropped': False,
+        'fallback': None,
+    },
+    'neato': {
+        'label': 'Spring',
+        'description': (
+            'Unranked spring-model layout (neato) with straight edges, for '
+            'medium-sized graphs; clusters are not drawn'
+        ),
+        'engine': 'neato',
+        'graph_attrs': {
+            'overlap': 'scale',
+            'splines': 'line',
+            'maxiter': '500',
+        },
+        'edge_labels_are_dropped': False,
+        'fallback': 'sfdp',
+    },
+    'osage': {
+        'label': 'Packed Clusters',
+        'description': (
+            'Clusters packed into a grid (osage), ignoring most edge '
+            'structure'
+        ),
+        'engine': 'osage',
+        'graph_attrs': {},
+        'edge_labels_are_dropped': False,
+        'fallback': None,
+    },
+}
+
+# This preset is chosen automatically for small graphs.
+default_layout_preset_name = 'quality'
+
+# This name stands for choosing a preset automatically; see
+# choose_layout_preset_name.
+auto_layout_preset_name = 'auto'
+
+
+def get_layout_preset_enum_items(
+    includes_auto=False,
+    supported_layout_engines=None,
+):
+    """
+    This function returns a tuple of (identifier, name, description, number)
+    tuples for the layout presets, suitable for a Blender EnumProperty’s items.
+    If includes_auto is true, then the first item is the automatic choice.
+
+    If supported_layout_engines is not None, then it is a set of the Graphviz
+    layout engines that are installed (see the graphvizprobe module), and the
+    presets whose engines are not among them are left out. Each item’s number
+    is its position among all of the items, whether or not any are left out,
+    so that the values that Blender stores for the property stay the same.
+    """
+    enum_items = (
+        *(
+            [(
+                auto_layout_preset_name,
+                'Automatic',
+                'Quality for small graphs; the add-on’s large-graph preset '
+                'for large graphs',
+            )]
+            if includes_auto
+            else []
+        ),
+        *[
+            (preset_name, preset['label'], preset['description'])
+            for preset_name, preset
+            in layout_preset_dict.items()
+        ],
+    )
+
+    return tuple(
+        (*enum_item, item_number)
+        for item_number, enum_item
+        in enumerate(enum_items)
+        if (
+            enum_item[0] not in layout_preset_dict
+            or is_layout_preset_supported(
+                enum_item[0],
+                supported_layout_engines,
+            )
+        )
+    )
+
+
+def is_layout_preset_supported(layout_preset_name, supported_layout_engines):
+    """
+    This function returns whether the layout preset with the given
+    layout_preset_name can be used with the given supported_layout_engines (a
+    set of Graphviz layout engines, or None if they are unknown).
+    """
+    return (
+        supported_layout_engines is None
+        or layout_preset_dict[layout_preset_name]['engine']
+        in supported_layout_engines
+    )
+
+
+def is_graph_large(
+    num_of_nodes,
+    num_of_edges,
+    large_graph_node_threshold,
+    large_graph_edge_threshold,
+):
+    """
+    This function returns whether a graph with the given numbers of nodes and
+    edges is large, i.e., whether either count exceeds its threshold.
+    """
+    return (
+        num_of_nodes > large_graph_node_threshold
+        or num_of_edges > large_graph_edge_threshold
+    )
+
+
+def choose_layout_preset_name(
+    layout_preset_name,
+    num_of_nodes,
+    num_of_edges,
+    large_graph_node_threshold,
+    large_graph_edge_threshold,
+    large_graph_layout_preset_name,
+):
+    """
+    This function returns the name of the layout preset to use for a graph with
+    the given numbers of nodes and edges.
+
+    If layout_preset_name is not the automatic choice, then it is returned
+    unchanged. Otherwise, the large_graph_layout_preset_name is returned if
+    either count exceeds its threshold, and the default preset is returned if
+    neither does.
+    """
+    if layout_preset_name != auto_layout_preset_name:
+        return layout_preset_name
+
+    graph_is_large = is_graph_large(
+        num_of_nodes,
+        num_of_edges,
+        large_graph_node_threshold,
+        large_graph_edge_threshold,
+    )
+
+    return (
+        large_graph_layout_preset_name
+        if graph_is_large
+        else default_layout_preset_name
+    )
@@ -0,0 +1,153 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This module chooses the resolution of raster (PNG) images from a pixel budget.
+
+Graphviz draws graphs in inches (with 72 typographic points per inch), and it
+renders raster images at a resolution in dots (i.e., pixels) per inch. At a
+fixed 300 DPI, a graph with thousands of nodes may become an image of hundreds
+of megapixels, which takes seconds to encode, takes gigabytes of memory to load
+into Blender, and may exceed the largest bitmap that Graphviz’s Cairo renderer
+can create (32,767 pixels per side).
+
+We instead choose each image’s DPI so that its area fits a maximum number of
+megapixels. The graph’s size is either estimated from its numbers of nodes and
+edges (which costs nothing) or measured from a layout pre-pass (which costs an
+extra Graphviz layout). The estimate may be wrong, so the DPI is also backed by
+Graphviz’s size graph attribute, which scales down any drawing that is larger
+than a given size, so that the pixel budget holds either way.
+
+If even the budgeted DPI is too low for node labels to be legible, then the
+graph is “oversize”, and the renderjobs module may render another output
+instead.
+"""
+
+from .savefiles import graph_padding
+
+import json
+import math
+
+points_per_inch = 72
+
+# These are rough areas (in square inches) that one node or one edge adds to a
+# rig graph’s dot layout, including spacing between ranks and labels. They
+# were fitted to Rigify rigs, whose bone names make nodes wider than the
+# default 0.75 inches.
+estimated_node_area = 4.0
+estimated_edge_area = 0.5
+
+# This is the largest width or height (in pixels) of a Cairo image surface,
+# which Graphviz uses to render PNG images.
+max_raster_side = 32767
+
+
+def estimate_layout_size(num_of_nodes, num_of_edges):
+    """
+    This function returns a (width, height) tuple estimating the size (in
+    inches, without padding) of the layout of a graph with the given numbers of
+    nodes and edges. Because the aspect ratio cannot be estimated, the layout
+    is assumed to be square.
+    """
+    area = (
+        num_of_nodes * estimated_node_area
+        + num_of_edges * estimated_edge_area
+    )
+    side = math.sqrt(area)
+    return (side, side)
+
+
+def read_layout_size(layout_json_text):
+    """
+    This function returns a (width, height) tuple of the size (in inches,
+    without padding) of the layout in the given string, which must be in
+    Graphviz’s json output format (e.g., from the savefiles module’s
+    read_graph_layout function).
+    """
+    return get_layout_size(json.loads(layout_json_text))
+
+
+def get_layout_size(layout):
+    """
+    This function returns a (width, height) tuple of the size (in inches,
+    without padding) of the given layout, a dictionary from Graphviz’s json or
+    json0 output format.
+    """
+    # The bounding box is a string of points like '0,0,1234.5,678'.
+    left, bottom, right, top = (
+        float(coordinate)
+        for coordinate
+        in layout['bb'].split(',')
+    )
+
+    return (
+        (right - left) / points_per_inch,
+        (top - bottom) / points_per_inch,
+    )
+
+
+def choose_raster_resolution(
+    layout_size,
+    max_dpi,
+    max_megapixels=None,
+    min_legible_dpi=0,
+    layout_size_is_estimated=True,
+):
+    """
+    This function returns a dictionary describing how to render a raster image
+    of a layout with the given layout_size (a (width, height) tuple in inches,
+    without padding), with these keys –
+
+    dpi: The highest resolution, up to max_dpi, at which the padded image has
+    at most max_megapixels and fits within max_raster_side.
+
+    graph_attrs: A dictionary of DOT graph attributes. If
+    layout_size_is_estimated is true, then these make Graphviz scale down the
+    drawing if it turns out to be larger than the pixel budget. Because the
+    estimate assumes a square layout, a very wide or tall drawing is scaled
+    down to fit within a square of the budget’s area – at the cost of
+    resolution, but within the budget.
+
+    is_oversize: Whether the dpi is lower than min_legible_dpi.
+
+    megapixels: The image’s expected (or, if layout_size_is_estimated is true,
+    greatest) number of megapixels.
+
+    If max_megapixels is None, then there is no pixel budget and the max_dpi is
+    only lowered to fit within max_raster_side.
+    """
+    width, height = layout_size
+    padded_width = width + 2 * graph_padding
+    padded_height = height + 2 * graph_padding
+
+    dpi = min(
+        max_dpi,
+        max_raster_side / max(padded_width, padded_height),
+    )
+
+    graph_attrs = {}
+
+    if max_megapixels is not None:
+        max_pixels = max_megapixels * 1_000_000
+
+        dpi = min(
+            dpi,
+            math.sqrt(max_pixels / (padded_width * padded_height)),
+        )
+
+    if max_megapixels is not None and layout_size_is_estimated:
+        # The drawing’s size (without padding) is limited to a square whose
+        # area is the pixel budget at this DPI.
+        max_side = min(math.sqrt(max_pixels), max_raster_side) / dpi
+        max_drawing_side = max(max_side - 2 * graph_padding, 1)
+        graph_attrs['size'] = f'{max_drawing_side:.2f},{max_drawing_side:.2f}'
+
+    # The DPI is rounded down to a whole number, so the budget still holds.
+    dpi = max(math.floor(dpi), 1)
+
+    return {
+        'dpi': dpi,
+        'graph_attrs': graph_attrs,
+        'is_oversize': dpi < min_legible_dpi,
+        'megapixels': padded_width * padded_height * dpi ** 2 / 1_000_000,
+    }
@@ -29,6 +29,21 @@ category_attrs_dict: A dictionary from each category name to an attribute
 dictionary. The attribute dictionary in turn is from DOT attribute key strings
 to attribute value strings.
 
+entity_extra_attrs_dict: A dictionary from each entity ID to an attribute
+dictionary of extra attrs that only that entity has, such as its position from
+an earlier layout (see the storedlayouts module). Unlike category attrs, they
+are always put in the entity’s own statement.
+
+Entities whose categories give them the same attributes are grouped into
+anonymous DOT subgraphs, each of which declares those attributes only once as
+node or edge defaults. The entities inside each subgraph inherit the defaults
+instead of repeating the attributes in their own attribute lists. (Anonymous
+subgraphs add no structure of their own, and a subgraph inside a cluster keeps
+its nodes inside that cluster. But grouping changes the order in which
+Graphviz reads the nodes and edges, which is an input to its layout, so the
+layout may differ from that of the same graph without grouping.) This shrinks
+the DOT text of large rigs several-fold, and Graphviz parses it faster.
+
 For example, this:
 
 .. code-block: python
@@ -69,22 +84,28 @@ For example, this:
       edge [fontsize=10 fontname="Gill Sans"];
       subgraph "cluster_0" {
         label="A";
-        "2" [label="A0"; "shape": "box", "fillcolor"="gray40",
-          "style"="rounded, filled"];
-        "3" [label="A1", "fillcolor"="gray85",
-          "style"="rounded, filled, bold"];
+        subgraph {
+          node ["shape"="box", "fillcolor"="gray40",
+            "style"="rounded, filled"];
+          "2" [label="A0"];
+        }
+        subgraph {
+          node ["fillcolor"="gray85", "style"="rounded, filled, bold"];
+          "3" [label="A1"];
+        }
       }
       subgraph "cluster_1" {
         label="B";
-        "4" [label="B0", "shape": "box", "fillcolor"="gray40",
-          "style"="rounded, filled", "fillcolor"="gray85",
-          "style"="rounded, filled, bold"];
+        "4" [label="B0"];
         "5" [label="B1"];
       }
       "3" -> "2" [label="E0"];
       "5" -> "4" [label="E1"];
-      "5" -> "3" [label="E2", "color"="gray50", "fontcolor"="gray25",
-        "arrowsize"="0.5"]; }
+      subgraph {
+        edge ["color"="gray50", "fontcolor"="gray25", "arrowsize"="0.5"];
+        "5" -> "3" [label="E2"];
+      }
+    }
 """
 
 escape_translation_table = {
@@ -108,11 +129,12 @@ def create_dot_attr_list(
     entity_label_dict={},
     entity_categories_dict={},
     category_attrs_dict={},
+    entity_extra_attrs_dict={},
 ):
     """
     This function renders the DOT attribute list for the given entity_id,
-    including the entity’s label and the attrs given by its entity categories.
-    The string starts with one space character.
+    including the entity’s label, the attrs given by its entity categories, and
+    its extra attrs. The string starts with one space character.
 
     Named parameters are described in the module docstring.
     """
@@ -134,6 +156,12 @@ def create_dot_attr_list(
             for attr_key, attr_val
             in category_attrs_dict.get(category_name, {}).items()
         ],
+        # Then the entity’s own extra attrs (if any).
+        *[
+            f'"{escape_quotes(attr_key)}"="{escape_quotes(attr_val)}"'
+            for attr_key, attr_val
+            in entity_extra_attrs_dict.get(entity_id, {}).items()
+        ],
     ]
     return (
         ' ['
@@ -144,11 +172,82 @@ def create_dot_attr_list(
     )
 
 
+def create_dot_attr_pairs(entity_categories, category_attrs_dict={}):
+    """
+    This function merges the attrs given by the given entity_categories into a
+    tuple of (attr_key, attr_val) pairs. When several categories give the same
+    attr key, the last category’s value wins, just as it would in a single DOT
+    attribute list. The returned tuple may be used as a dictionary key.
+
+    Named parameters are described in the module docstring.
+    """
+    attr_dict = {}
+    for category_name in entity_categories:
+        attr_dict.update(category_attrs_dict.get(category_name, {}))
+    return tuple(attr_dict.items())
+
+
+def group_entities_by_category_attrs(
+    entity_ids,
+    entity_categories_dict={},
+    category_attrs_dict={},
+):
+    """
+    This function groups the given entity_ids by the attrs that their
+    categories give them. It returns a dictionary from each tuple of attr pairs
+    (see create_dot_attr_pairs) to a list of the entity IDs with those attrs.
+    Both the groups and the entity IDs within each group keep the order of the
+    given entity_ids.
+
+    Named parameters are described in the module docstring.
+    """
+    attr_pairs_entities_dict = {}
+    for entity_id in entity_ids:
+        attr_pairs = create_dot_attr_pairs(
+            entity_categories_dict.get(entity_id, []),
+            category_attrs_dict=category_attrs_dict,
+        )
+        attr_pairs_entities_dict.setdefault(attr_pairs, []).append(entity_id)
+    return attr_pairs_entities_dict
+
+
+def create_dot_defaults_subgraph(statement_keyword, attr_pairs, statements):
+    """
+    This function renders an anonymous DOT subgraph that declares the given
+    attr_pairs as the default attrs of its statement_keyword ('node' or
+    'edge'), followed by the given statements, which inherit those defaults.
+
+    If attr_pairs is empty, then there is nothing to inherit, and the
+    statements are rendered without any enclosing subgraph.
+    """
+    statements_string = ' '.join(statements)
+
+    if not attr_pairs:
+        return statements_string
+
+    attr_string = ', '.join([
+        f'"{escape_quotes(attr_key)}"="{escape_quotes(attr_val)}"'
+        for attr_key, attr_val
+        in attr_pairs
+    ])
+    return (
+        # Start the anonymous subgraph statement.
+        'subgraph { '
+        # Declare the default attrs once for the whole group.
+        f'{statement_keyword} [{attr_string}]; '
+        # Then the statements that inherit the default attrs.
+        + statements_string
+        # Close the subgraph statement.
+        + ' }'
+    )
+
+
 def create_dot_node(
     node_id,
     entity_label_dict={},
     entity_categories_dict={},
     category_attrs_dict={},
+    entity_extra_attrs_dict={},
 ):
     """
     This function renders a DOT node statement, with its label and other
@@ -165,23 +264,86 @@ def create_dot_node(
             entity_label_dict=entity_label_dict,
             entity_categories_dict=entity_categories_dict,
             category_attrs_dict=category_attrs_dict,
+            entity_extra_attrs_dict=entity_extra_attrs_dict,
         )
         # Close the node statement.
         + ';'
     )
 
 
+def create_dot_nodes(
+    node_ids,
+    entity_label_dict={},
+    entity_categories_dict={},
+    category_attrs_dict={},
+    entity_extra_attrs_dict={},
+    category_attrs_are_inlined=False,
+):
+    """
+    This function renders a series of DOT node statements for the given
+    node_ids.
+
+    Unless category_attrs_are_inlined is true, the nodes are grouped into
+    anonymous subgraphs by their category attrs (see
+    create_dot_defaults_subgraph), and each node statement itself includes only
+    the node’s label. If category_attrs_are_inlined is true, then each node
+    statement repeats all of its category attrs, as in earlier versions of this
+    module.
+
+    Named parameters are described in the module docstring.
+    """
+    if category_attrs_are_inlined:
+        return ' '.join([
+            create_dot_node(
+                node_id,
+                entity_label_dict=entity_label_dict,
+                entity_categories_dict=entity_categories_dict,
+                category_attrs_dict=category_attrs_dict,
+                entity_extra_attrs_dict=entity_extra_attrs_dict,
+            )
+            for node_id
+            in node_ids
+        ])
+
+    attr_pairs_node_ids_dict = group_entities_by_category_attrs(
+        node_ids,
+        entity_categories_dict=entity_categories_dict,
+        category_attrs_dict=category_attrs_dict,
+    )
+
+    return ' '.join([
+        create_dot_defaults_subgraph(
+            'node',
+            attr_pairs,
+            [
+                # The node statements themselves include only their labels
+                # and extra attrs.
+                create_dot_node(
+                    node_id,
+                    entity_label_dict=entity_label_dict,
+                    entity_extra_attrs_dict=entity_extra_attrs_dict,
+                )
+                for node_id
+                in group_node_ids
+            ],
+        )
+        for attr_pairs, group_node_ids
+        in attr_pairs_node_ids_dict.items()
+    ])
+
+
 def create_dot_cluster(
     cluster_id,
     cluster_nodes_dict={},
     entity_label_dict={},
     entity_categories_dict={},
     category_attrs_dict={},
+    entity_extra_attrs_dict={},
+    category_attrs_are_inlined=False,
 ):
     """
     This function renders a DOT cluster statement, with its label and a series
-    of statements for its contained nodes. (Node statements only declare their
-    existence; they do not include any attrs.)
+    of statements for its contained nodes (see create_dot_nodes).
 
     Named parameters are described in the module docstring.
     """
@@ -193,17 +355,21 @@ def create_dot_cluster(
         f'fontsize=24; '
         # Declare the cluster label.
         f'label="{entity_label_dict.get(cluster_id, "")}"; '
-        # Child node statements.
-        + ' '.join([
-            create_dot_node(
-                node_id,
-                entity_label_dict=entity_label_dict,
-                entity_categories_dict=entity_categories_dict,
-                category_attrs_dict=category_attrs_dict,
-            )
-            for node_id
-            in cluster_nodes_dict.get(cluster_id)
+        # Declare the cluster’s extra attrs, if any.
+        + ''.join([
+            f'"{escape_quotes(attr_key)}"="{escape_quotes(attr_val)}"; '
+            for attr_key, attr_val
+            in entity_extra_attrs_dict.get(cluster_id, {}).items()
         ])
+        # Child node statements.
+        + create_dot_nodes(
+            cluster_nodes_dict.get(cluster_id),
+            entity_label_dict=entity_label_dict,
+            entity_categories_dict=entity_categories_dict,
+            category_attrs_dict=category_attrs_dict,
+            entity_extra_attrs_dict=entity_extra_attrs_dict,
+            category_attrs_are_inlined=category_attrs_are_inlined,
+        )
         # Close the cluster statement.
         + ' }'
     )
@@ -216,6 +382,7 @@ def create_dot_edge(
     entity_label_dict={},
     entity_categories_dict={},
     category_attrs_dict={},
+    entity_extra_attrs_dict={},
 ):
     """
     This function renders a DOT edge statement, with its label and other
@@ -234,12 +401,72 @@ def create_dot_edge(
             entity_label_dict=entity_label_dict,
             entity_categories_dict=entity_categories_dict,
             category_attrs_dict=category_attrs_dict,
+            entity_extra_attrs_dict=entity_extra_attrs_dict,
         )
         # Close the edge statement.
         + ';'
     )
 
 
+def create_dot_edges(
+    edge_tuple_dict={},
+    entity_label_dict={},
+    entity_categories_dict={},
+    category_attrs_dict={},
+    entity_extra_attrs_dict={},
+    category_attrs_are_inlined=False,
+):
+    """
+    This function renders a series of DOT edge statements for the edges in the
+    given edge_tuple_dict. Like create_dot_nodes, it groups the edges into
+    anonymous subgraphs by their category attrs, unless
+    category_attrs_are_inlined is true.
+
+    Named parameters are described in the module docstring.
+    """
+    if category_attrs_are_inlined:
+        return ' '.join([
+            create_dot_edge(
+                edge_id,
+                source_id,
+                destination_id,
+                entity_label_dict=entity_label_dict,
+                entity_categories_dict=entity_categories_dict,
+                category_attrs_dict=category_attrs_dict,
+                entity_extra_attrs_dict=entity_extra_attrs_dict,
+            )
+            for edge_id, (source_id, destination_id)
+            in edge_tuple_dict.items()
+        ])
+
+    attr_pairs_edge_ids_dict = group_entities_by_category_attrs(
+        edge_tuple_dict,
+        entity_categories_dict=entity_categories_dict,
+        category_attrs_dict=category_attrs_dict,
+    )
+
+    return ' '.join([
+        create_dot_defaults_subgraph(
+            'edge',
+            attr_pairs,
+            [
+                # The edge statements themselves include only their labels
+                # and extra attrs.
+                create_dot_edge(
+                    edge_id,
+                    *edge_tuple_dict[edge_id],
+                    entity_label_dict=entity_label_dict,
+                    entity_extra_attrs_dict=entity_extra_attrs_dict,
+                )
+                for edge_id
+                in group_edge_ids
+            ],
+        )
+        for attr_pairs, group_edge_ids
+        in attr_pairs_edge_ids_dict.items()
+    ])
+
+
 def create_dot_digraph(
     free_nodes=set(),
     cluster_nodes_dict={},
@@ -247,9 +474,13 @@ def create_dot_digraph(
     entity_label_dict={},
     entity_categories_dict={},
     category_attrs_dict={},
+    entity_extra_attrs_dict={},
     title='',
     fontname='',
     rankdir='',
+    graph_attrs={},
+    edge_labels_are_dropped=False,
+    category_attrs_are_inlined=False,
 ):
     """
     This function takes information representing a directed graph, and it
@@ -265,6 +496,20 @@ def create_dot_digraph(
     bottom, which is Graphviz’s default) or 'LR' (left to right, which the
     legend uses).
 
+    The graph_attrs is a dictionary of any extra DOT graph attributes, such as
+    those of a layout preset (see the layoutpresets module). They override the
+    default graph attributes.
+
+    If edge_labels_are_dropped is true, then edges are rendered without their
+    labels, which Graphviz would otherwise need time to place.
+
+    If category_attrs_are_inlined is true, then every node and edge statement
+    repeats all of its category attrs instead of inheriting them from shared
+    defaults, and nodes and edges keep their given order. This produces the
+    same graph with much larger DOT text, although Graphviz may lay it out
+    differently, since the order of nodes and edges affects its layout; it is
+    mostly useful for comparing the two forms.
+
     Named parameters are described in the module docstring.
     """
     return (
@@ -278,7 +523,13 @@ def create_dot_digraph(
         f'fontname="{escape_quotes(fontname)}" '
         # This font size will be used for the small title of the graph.
         'fontsize=10'
-        ']; '
+        # Any extra graph attributes.
+        + ''.join([
+            f' "{escape_quotes(attr_key)}"="{escape_quotes(attr_val)}"'
+            for attr_key, attr_val
+            in graph_attrs.items()
+        ])
+        + ']; '
         # Default node attributes.
         f'node [shape=plaintext style=rounded fontname="{fontname}"]; '
         # Default edge attributes.
@@ -289,16 +540,14 @@ def create_dot_digraph(
         # The bulk of the graph data.
         + ' '.join([
             # Free-node statements, with their labels and other attrs.
-            *[
-                create_dot_node(
-                    node_id,
-                    entity_label_dict=entity_label_dict,
-                    entity_categories_dict=entity_categories_dict,
-                    category_attrs_dict=category_attrs_dict,
-                )
-                for node_id
-                in free_nodes
-            ],
+            create_dot_nodes(
+                free_nodes,
+                entity_label_dict=entity_label_dict,
+                entity_categories_dict=entity_categories_dict,
+                category_attrs_dict=category_attrs_dict,
+                entity_extra_attrs_dict=entity_extra_attrs_dict,
+                category_attrs_are_inlined=category_attrs_are_inlined,
+            ),
 
             # Cluster statements, with their labels and contained nodes.
             *[
@@ -308,24 +557,25 @@ def create_dot_digraph(
                     cluster_nodes_dict=cluster_nodes_dict,
                     entity_categories_dict=entity_categories_dict,
                     category_attrs_dict=category_attrs_dict,
+                    entity_extra_attrs_dict=entity_extra_attrs_dict,
+                    category_attrs_are_inlined=category_attrs_are_inlined,
                 )
                 for cluster_id
                 in cluster_nodes_dict
             ],
 
-            # Edge statements, with their labels and other attrs.
-            *[
-                create_dot_edge(
-                    edge_id,
-                    source_id,
-                    destination_id,
-                    entity_label_dict=entity_label_dict,
-                    entity_categories_dict=entity_categories_dict,
-                    category_attrs_dict=category_attrs_dict,
-                )
-                for edge_id, (source_id, destination_id)
-                in edge_tuple_dict.items()
-            ],
+            # Edge statements, with their labels (unless they are dropped)
+            # and other attrs.
+            create_dot_edges(
+                edge_tuple_dict,
+                entity_label_dict=(
+                    {} if edge_labels_are_dropped else entity_label_dict
+                ),
+                entity_categories_dict=entity_categories_dict,
+                category_attrs_dict=category_attrs_dict,
+                entity_extra_attrs_dict=entity_extra_attrs_dict,
+                category_attrs_are_inlined=category_attrs_are_inlined,
+            ),
         ])
         # Close the entire digraph.
         + ' }'
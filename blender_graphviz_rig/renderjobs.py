@@ -0,0 +1,1301 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This module renders analyzed graph data into files. It ties together the
+renderdot module (which creates DOT text), the layoutpresets module, the
+storedlayouts module, and the savefiles module (which runs Graphviz).
+
+It does not use Blender’s bpy module, so its functions may also run in
+background threads while Blender’s UI stays responsive. A render queue (see
+create_render_queue) runs them a few at a time, replacing older renders of the
+same output files with newer ones.
+"""
+
+from .analyzerigs import count_graph_nodes_and_edges
+from .backupfiles import unlimited_backup_retention
+from .layoutpresets import layout_preset_dict, is_layout_preset_supported
+from .rastersizes import (
+    estimate_layout_size,
+    get_layout_size,
+    choose_raster_resolution,
+)
+from .renderdot import create_dot_digraph
+from .renderprofiles import profile_render_part
+from .rendertimings import record_timing_span, add_timing_span
+from .savefiles import (
+    save_files,
+    save_batch_files,
+    read_graph_layout,
+    output_format_file_extension_dict,
+    separately_rendered_output_formats,
+    GraphvizTimeoutError,
+    GraphvizCancelledError,
+)
+from .storedlayouts import (
+    incremental_layout_graph_attrs,
+    create_structural_hash,
+    read_stored_layout,
+    read_previous_layout_entry,
+    store_layout,
+    create_edge_id_attrs_dict,
+    create_layout_attrs_dict,
+    create_incremental_layout_attrs_dict,
+)
+
+from concurrent.futures import Future
+import inspect
+import json
+import shutil
+import tempfile
+import threading
+import time
+
+# If a raster image is oversize, then it is not also rendered in its oversize
+# output format when any of these formats (which stay legible at any size) is
+# already being rendered.
+legible_output_formats = ('svg', 'svgz', 'pdf', 'png_tiles', 'ps_pages')
+
+# By default, a render queue runs at most this many render tasks (and thus
+# Graphviz processes) at once.
+default_max_num_of_running_render_tasks = 2
+
+# Graphs with at most this many nodes are small enough that Graphviz’s
+# start-up time dominates their render time, so they may be rendered together
+# in batches (see render_graph_batch).
+batch_graph_max_num_of_nodes = 200
+
+# By default, a render queue renders its waiting small graphs in a batch only
+# when more than this many of them are waiting.
+default_batch_render_threshold = 3
+
+
+class RenderSupersededError(GraphvizCancelledError):
+    """
+    This error class is used to indicate that a queued render task was
+    cancelled because a newer render task with the same key (i.e., rendering
+    the same output files) was submitted to its render queue.
+    """
+    pass
+
+
+def create_preset_title(title, layout_preset):
+    """
+    This function returns the given title with the given layout_preset’s label
+    appended, so that images stay interpretable.
+    """
+    return ' • '.join([
+        *([title] if title else []),
+        f'{layout_preset["label"]} Layout',
+    ])
+
+
+def render_graph(
+    graph_data,
+    category_attrs_dict,
+    dot_command,
+    dot_source_file_path,
+    output_directory_path,
+    output_filename,
+    output_formats,
+    layout_preset_name,
+    title='',
+    fontname='',
+    rankdir='',
+    max_dpi=300,
+    max_megapixels=None,
+    min_legible_dpi=0,
+    oversize_output_format=None,
+    thumbnail_min_megapixels=None,
+    layout_size_is_measured=False,
+    layout_file_path=None,
+    incremental_layout_engine=None,
+    time_budget=None,
+    retries_with_cheaper_presets=True,
+    supported_layout_engines=None,
+    cancel_event=None,
+    backed_up_output_formats=None,
+    backup_retention=unlimited_backup_retention,
+    uses_graphviz_library=False,
+    timing_record=None,
+    report_attempt=None,
+):
+    """
+    This function renders the given graph_data (see the analyzerigs module)
+    into one file for each of the given output_formats, using the layout preset
+    named by layout_preset_name. It returns a tuple (output_file_path_dict,
+    attempt_descriptions): a dictionary from each output format to the path of
+    its new file, and a list of strings describing each render attempt’s
+    outcome and duration.
+
+    Whenever an attempt exceeds the time_budget, the render is retried with the
+    preset’s cheaper fallback preset, if retries_with_cheaper_presets is true
+    and if there is any fallback preset. (Fallback presets whose layout engines
+    are not among the supported_layout_engines are skipped, unless it is None;
+    see the graphvizprobe module.) If no attempt finishes in time, then a
+    GraphvizTimeoutError describing every attempt is raised. If given,
+    report_attempt is called with the description of each attempt that timed
+    out.
+
+    PNG images are rendered at the highest DPI, up to max_dpi, that fits the
+    pixel budget of max_megapixels (see the rastersizes module). (PNG tiles
+    are always rendered at max_dpi.) The layout’s size is estimated from the
+    graph’s numbers of nodes and edges – or, if layout_size_is_measured is
+    true, measured by laying out the graph before rendering it. The render
+    then reuses the measured layout (like a stored layout) instead of laying
+    out the graph again, and it gets only what remains of the time budget
+    after the measuring. If that DPI is lower than min_legible_dpi, then the
+    graph is also rendered in the oversize_output_format (if it is not None,
+    and if no vector format is already being rendered), so that it stays
+    legible. If the PNG image may have more than thumbnail_min_megapixels
+    (unless it is None), then a small PNG thumbnail of the graph (see the
+    savefiles module’s png_thumbnail format) is also rendered from the same
+    layout, so that the thumbnail can be loaded into Blender instead.
+
+    If layout_file_path is not None, then each layout is stored in the layout
+    file at that path, and a stored layout of a graph with the same structure
+    is reused instead of laying out the graph again (see the storedlayouts
+    module). A layout size is then also measured from the stored layout.
+    If incremental_layout_engine is also not None (it may be 'neato' or
+    'fdp'), then a graph whose structure has changed is laid out by that
+    Graphviz layout engine incrementally, with its unchanged nodes pinned at
+    their positions in the most recent stored layout with the same layout
+    preset (if any).
+
+    Existing output files in the backed_up_output_formats (or in any format, if
+    it is None) are backed up, within the backup_retention policy (see the
+    backupfiles module), just before the new files are published. An attempt
+    that times out publishes no files, so the next attempt starts from the
+    same existing files.
+
+    If the timing_record is not None, then creating the DOT text, measuring
+    and storing layouts, running Graphviz, and backing up files are timed in
+    it (see the rendertimings module).
+
+    The other arguments are passed to the renderdot module’s
+    create_dot_digraph function and the savefiles module’s save_files
+    function; see their docstrings for more information. Any error raised by
+    save_files, other than a GraphvizTimeoutError, is raised immediately.
+    """
+    attempt_descriptions = []
+
+    while True:
+        layout_preset = layout_preset_dict[layout_preset_name]
+        layout_preset_label = layout_preset['label']
+
+        if layout_file_path is not None:
+            structural_hash = create_structural_hash(
+                graph_data,
+                category_attrs_dict,
+                layout_preset_name,
+                rankdir=rankdir,
+            )
+            stored_layout = read_stored_layout(
+                layout_file_path,
+                structural_hash,
+            )
+        else:
+            stored_layout = None
+
+        layout_is_reused = stored_layout is not None
+        layout_is_stored = (
+            layout_file_path is not None
+            and not layout_is_reused
+        )
+
+        if layout_is_stored and incremental_layout_engine is not None:
+            previous_layout_entry = read_previous_layout_entry(
+                layout_file_path,
+                layout_preset_name,
+                rankdir=rankdir,
+            )
+        else:
+            previous_layout_entry = None
+
+        layout_is_incremental = previous_layout_entry is not None
+        layout_is_measured = (
+            'png' in output_formats
+            and layout_size_is_measured
+            and not layout_is_reused
+        )
+        layout_engine = (
+            incremental_layout_engine
+            if layout_is_incremental
+            else layout_preset['engine']
+        )
+
+        # A reused layout’s positions are put into the DOT text. A layout that
+        # is to be stored or measured (and then reused) needs named edges. An
+        # incremental layout also needs its nodes’ previous positions.
+        if layout_is_reused:
+            entity_extra_attrs_dict = create_layout_attrs_dict(
+                stored_layout,
+                graph_data,
+            )
+        elif layout_is_incremental:
+            pinned_attrs_dict, num_of_pinned_nodes = (
+                create_incremental_layout_attrs_dict(
+                    previous_layout_entry,
+                    graph_data,
+                )
+            )
+            entity_extra_attrs_dict = {
+                **create_edge_id_attrs_dict(graph_data),
+                **pinned_attrs_dict,
+            }
+        elif layout_is_stored or layout_is_measured:
+            entity_extra_attrs_dict = create_edge_id_attrs_dict(graph_data)
+        else:
+            entity_extra_attrs_dict = {}
+
+        num_of_nodes, num_of_edges = count_graph_nodes_and_edges(graph_data)
+
+        def create_attempt_dot_text(entity_extra_attrs_dict, graph_attrs):
+            with record_timing_span(
+                timing_record,
+                'create_dot_digraph',
+                nodes=num_of_nodes,
+                edges=num_of_edges,
+            ) as span_sizes:
+                dot_text = create_dot_digraph(
+                    **graph_data,
+                    category_attrs_dict=category_attrs_dict,
+                    entity_extra_attrs_dict=entity_extra_attrs_dict,
+                    title=create_preset_title(title, layout_preset),
+                    fontname=fontname,
+                    rankdir=rankdir,
+                    graph_attrs={
+                        **layout_preset['graph_attrs'],
+                        **graph_attrs,
+                    },
+                    edge_labels_are_dropped=(
+                        layout_preset['edge_labels_are_dropped']
+                    ),
+                )
+                span_sizes['dot_bytes'] = len(dot_text.encode())
+
+            return dot_text
+
+        dot_text = create_attempt_dot_text(
+            entity_extra_attrs_dict,
+            (
+                incremental_layout_graph_attrs
+                if layout_is_incremental
+                else {}
+            ),
+        )
+
+        # The layout to store is rendered to this path by the same Graphviz
+        # run that lays out the graph.
+        stored_layout_output_file_path = dot_source_file_path + '.json0'
+
+        attempt_start_time = time.monotonic()
+        render_time_budget = time_budget
+        render_layout_is_reused = layout_is_reused
+
+        try:
+            attempt_output_formats = list(output_formats)
+            raster_resolution = None
+
+            if 'png' in output_formats:
+                if layout_is_reused:
+                    layout_size = get_layout_size(stored_layout)
+                elif layout_is_measured:
+                    with record_timing_span(timing_record, 'measure_layout'):
+                        measured_layout = json.loads(read_graph_layout(
+                            dot_text,
+                            dot_command,
+                            dot_source_file_path,
+                            layout_engine=layout_engine,
+                            time_budget=time_budget,
+                            cancel_event=cancel_event,
+                            uses_graphviz_library=uses_graphviz_library,
+                        ))
+                    layout_size = get_layout_size(measured_layout)
+
+                    # The render reuses the measured layout, rather than
+                    # laying out the graph again. Its edges keep their names,
+                    # in case the layout is also to be stored.
+                    layout_attrs_dict = create_layout_attrs_dict(
+                        measured_layout,
+                        graph_data,
+                    )
+                    edge_id_attrs_dict = create_edge_id_attrs_dict(graph_data)
+                    dot_text = create_attempt_dot_text(
+                        {
+                            **layout_attrs_dict,
+                            **{
+                                edge_id: {
+                                    **layout_attrs_dict.get(edge_id, {}),
+                                    **edge_id_attrs,
+                                }
+                                for edge_id, edge_id_attrs
+                                in edge_id_attrs_dict.items()
+                            },
+                        },
+                        {},
+                    )
+                    render_layout_is_reused = True
+
+                    # The render gets only what remains of the attempt’s time
+                    # budget after the measuring.
+                    if time_budget is not None:
+                        render_time_budget = max(
+                            time_budget
+                            - (time.monotonic() - attempt_start_time),
+                            0,
+                        )
+                else:
+                    layout_size = estimate_layout_size(
+                        num_of_nodes,
+                        num_of_edges,
+                    )
+
+                raster_resolution = choose_raster_resolution(
+                    layout_size,
+                    max_dpi=max_dpi,
+                    max_megapixels=max_megapixels,
+                    min_legible_dpi=min_legible_dpi,
+                    layout_size_is_estimated=not (
+                        layout_is_reused or layout_is_measured
+                    ),
+                )
+
+                oversize_output_format_is_added = (
+                    raster_resolution['is_oversize']
+                    and oversize_output_format is not None
+                    and not any(
+                        output_format in legible_output_formats
+                        for output_format
+                        in output_formats
+                    )
+                )
+                if oversize_output_format_is_added:
+                    attempt_output_formats.append(oversize_output_format)
+
+                if is_thumbnail_rendered(
+                    raster_resolution,
+                    thumbnail_min_megapixels,
+                ):
+                    attempt_output_formats.append('png_thumbnail')
+
+            output_file_path_dict = save_files(
+                dot_text=dot_text,
+                dot_command=dot_command,
+                dot_source_file_path=dot_source_file_path,
+                output_directory_path=output_directory_path,
+                output_filename=output_filename,
+                output_formats=attempt_output_formats,
+                layout_engine=layout_engine,
+                dpi=(
+                    raster_resolution['dpi']
+                    if raster_resolution is not None
+                    else max_dpi
+                ),
+                graph_attrs=(
+                    raster_resolution['graph_attrs']
+                    if raster_resolution is not None
+                    else {}
+                ),
+                # Each tile is small, so tiles are not limited by the pixel
+                # budget.
+                tile_dpi=max_dpi,
+                layout_is_reused=render_layout_is_reused,
+                extra_output_file_path_dict=(
+                    {'json0': stored_layout_output_file_path}
+                    if layout_is_stored
+                    else {}
+                ),
+                time_budget=render_time_budget,
+                cancel_event=cancel_event,
+                backed_up_output_formats=backed_up_output_formats,
+                backup_retention=backup_retention,
+                uses_graphviz_library=uses_graphviz_library,
+                timing_record=timing_record,
+            )
+
+        except GraphvizTimeoutError:
+            attempt_duration = time.monotonic() - attempt_start_time
+            attempt_descriptions.append(
+                f'{layout_preset_label} layout timed out '
+                f'after {attempt_duration:.1f} s'
+            )
+            if report_attempt is not None:
+                report_attempt(attempt_descriptions[-1])
+
+            fallback_layout_preset_name = layout_preset['fallback']
+            while (
+                fallback_layout_preset_name is not None
+                and not is_layout_preset_supported(
+                    fallback_layout_preset_name,
+                    supported_layout_engines,
+                )
+            ):
+                fallback_layout_preset_name = (
+                    layout_preset_dict[fallback_layout_preset_name]['fallback']
+                )
+
+            if (
+                retries_with_cheaper_presets
+                and fallback_layout_preset_name is not None
+            ):
+                layout_preset_name = fallback_layout_preset_name
+                continue
+
+            raise GraphvizTimeoutError('; '.join(attempt_descriptions))
+
+        if layout_is_stored:
+            with record_timing_span(timing_record, 'store_layout'):
+                with open(
+                    stored_layout_output_file_path,
+                    encoding='utf-8',
+                ) as file:
+                    store_layout(
+                        layout_file_path,
+                        structural_hash,
+                        file.read(),
+                        graph_data,
+                        layout_preset_name,
+                        rankdir=rankdir,
+                    )
+
+        attempt_duration = time.monotonic() - attempt_start_time
+        if layout_is_reused:
+            attempt_outcome = 'reused and restyled'
+        elif layout_is_incremental:
+            attempt_outcome = (
+                f'updated incrementally by {layout_engine} '
+                f'({num_of_pinned_nodes} of {num_of_nodes} nodes pinned)'
+            )
+        else:
+            attempt_outcome = 'finished'
+        attempt_description = (
+            f'{layout_preset_label} layout {attempt_outcome} '
+            f'in {attempt_duration:.1f} s'
+        )
+
+        if raster_resolution is not None:
+            attempt_description += (
+                f' at {raster_resolution["dpi"]} DPI '
+                f'(up to {raster_resolution["megapixels"]:.0f} megapixels)'
+            )
+            if oversize_output_format in attempt_output_formats[
+                len(output_formats):
+            ]:
+                attempt_description += (
+                    ', too large to be legible in the pixel budget, so also '
+                    'rendered as '
+                    + output_format_file_extension_dict[oversize_output_format]
+                )
+
+        if 'png_thumbnail' in output_file_path_dict:
+            attempt_description += ', with a thumbnail'
+
+        attempt_descriptions.append(attempt_description)
+
+        return (output_file_path_dict, attempt_descriptions)
+
+
+def is_thumbnail_rendered(raster_resolution, thumbnail_min_megapixels):
+    """
+    This function returns whether a render whose PNG image has the given
+    raster_resolution (see the rastersizes module’s choose_raster_resolution
+    function) also renders a PNG thumbnail: i.e., whether the PNG image may
+    have more than thumbnail_min_megapixels (unless it is None).
+    """
+    return (
+        thumbnail_min_megapixels is not None
+        and raster_resolution['megapixels'] > thumbnail_min_megapixels
+    )
+
+
+def is_render_batchable(render_graph_kwargs):
+    """
+    This function returns whether a render with the given render_graph_kwargs
+    (the keyword arguments for render_graph) may be rendered in a batch with
+    other renders (see render_graph_batch): i.e., whether its graph is small,
+    and whether it needs only a single Graphviz run. Renders that use
+    Graphviz’s shared libraries in-process are never batched, since they do
+    not spend time starting Graphviz up.
+    """
+    num_of_nodes, _ = count_graph_nodes_and_edges(
+        render_graph_kwargs['graph_data'],
+    )
+
+    return (
+        num_of_nodes <= batch_graph_max_num_of_nodes
+        and not render_graph_kwargs.get('layout_size_is_measured', False)
+        and not render_graph_kwargs.get('uses_graphviz_library', False)
+        and not any(
+            output_format in separately_rendered_output_formats
+            for output_format
+            in render_graph_kwargs['output_formats']
+        )
+    )
+
+
+def render_graph_batch(render_graph_kwargs_list):
+    """
+    This function renders a batch of graphs, one for each of the given
+    render_graph_kwargs_list’s items (keyword arguments for render_graph), and
+    it returns a list with one item for each of them, in order: either
+    render_graph’s result, or the error that stopped that graph alone from
+    being rendered. (Errors for one graph never affect the others.)
+
+    Graphs that share a DOT command, a layout engine, and output formats are
+    rendered together by a single Graphviz run (see the savefiles module’s
+    save_batch_files function), which saves the time that Graphviz takes to
+    start up for each graph. Each graph’s DPI (see render_graph) is put into
+    its own DOT text.
+
+    Any graph that is not batchable (see is_render_batchable) or that needs
+    more than one plain layout is rendered alone with render_graph instead: a
+    graph whose stored layout is reused or that is laid out incrementally, or
+    whose PNG image is too large to be legible or needs a thumbnail. So is
+    any graph that has no other graph to share a Graphviz run with, and every
+    graph in a batch whose run exceeds the time budget (which is then the
+    largest of the batch’s time budgets), so that they can be retried with
+    cheaper layout presets.
+
+    A graph whose cancel_event is already set is not rendered, and its result
+    is a GraphvizCancelledError. A batch’s Graphviz run is short, so it is not
+    cancelled by any one graph’s cancel_event.
+    """
+    render_graph_signature = inspect.signature(render_graph)
+
+    results = [None] * len(render_graph_kwargs_list)
+
+    # This list contains the indexes of the graphs that are rendered alone.
+    unbatched_indexes = []
+
+    # This dictionary maps each batch’s key (a DOT command, a layout engine,
+    # and output formats) to a list of the batch’s graphs, each of which is a
+    # dictionary.
+    batch_dict = {}
+
+    for index, render_graph_kwargs in enumerate(render_graph_kwargs_list):
+        bound_render_graph_args = render_graph_signature.bind(
+            **render_graph_kwargs,
+        )
+        bound_render_graph_args.apply_defaults()
+        render_graph_args = bound_render_graph_args.arguments
+
+        cancel_event = render_graph_args['cancel_event']
+        if cancel_event is not None and cancel_event.is_set():
+            results[index] = GraphvizCancelledError()
+            continue
+
+        if not is_render_batchable(render_graph_kwargs):
+            unbatched_indexes.append(index)
+            continue
+
+        graph_data = render_graph_args['graph_data']
+        category_attrs_dict = render_graph_args['category_attrs_dict']
+        output_formats = render_graph_args['output_formats']
+        layout_preset_name = render_graph_args['layout_preset_name']
+        layout_preset = layout_preset_dict[layout_preset_name]
+        layout_file_path = render_graph_args['layout_file_path']
+        rankdir = render_graph_args['rankdir']
+
+        if layout_file_path is not None:
+            structural_hash = create_structural_hash(
+                graph_data,
+                category_attrs_dict,
+                layout_preset_name,
+                rankdir=rankdir,
+            )
+            layout_is_reused = (
+                read_stored_layout(layout_file_path, structural_hash)
+                is not None
+            )
+            layout_is_incremental = (
+                not layout_is_reused
+                and render_graph_args['incremental_layout_engine'] is not None
+                and read_previous_layout_entry(
+                    layout_file_path,
+                    layout_preset_name,
+                    rankdir=rankdir,
+                ) is not None
+            )
+        else:
+            structural_hash = None
+            layout_is_reused = False
+            layout_is_incremental = False
+
+        if layout_is_reused or layout_is_incremental:
+            unbatched_indexes.append(index)
+            continue
+
+        max_dpi = render_graph_args['max_dpi']
+        raster_resolution = None
+        raster_graph_attrs = {'dpi': f'{max_dpi:g}'}
+
+        if 'png' in output_formats:
+            raster_resolution = choose_raster_resolution(
+                estimate_layout_size(
+                    *count_graph_nodes_and_edges(graph_data),
+                ),
+                max_dpi=max_dpi,
+                max_megapixels=render_graph_args['max_megapixels'],
+                min_legible_dpi=render_graph_args['min_legible_dpi'],
+                layout_size_is_estimated=True,
+            )
+
+            # A graph whose PNG image is too large to be legible, or large
+            # enough to need a thumbnail, needs more than one Graphviz run.
+            if (
+                raster_resolution['is_oversize']
+                and render_graph_args['oversize_output_format'] is not None
+            ) or is_thumbnail_rendered(
+                raster_resolution,
+                render_graph_args['thumbnail_min_megapixels'],
+            ):
+                unbatched_indexes.append(index)
+                continue
+
+            raster_graph_attrs = {
+                'dpi': f'{raster_resolution["dpi"]:g}',
+                **raster_resolution['graph_attrs'],
+            }
+
+        num_of_nodes, num_of_edges = count_graph_nodes_and_edges(graph_data)
+
+        with record_timing_span(
+            render_graph_args['timing_record'],
+            'create_dot_digraph',
+            nodes=num_of_nodes,
+            edges=num_of_edges,
+        ) as span_sizes:
+            dot_text = create_dot_digraph(
+                **graph_data,
+                category_attrs_dict=category_attrs_dict,
+                entity_extra_attrs_dict=(
+                    create_edge_id_attrs_dict(graph_data)
+                    if layout_file_path is not None
+                    else {}
+                ),
+                title=create_preset_title(
+                    render_graph_args['title'],
+                    layout_preset,
+                ),
+                fontname=render_graph_args['fontname'],
+                rankdir=rankdir,
+                graph_attrs={
+                    **layout_preset['graph_attrs'],
+                    **raster_graph_attrs,
+                },
+                edge_labels_are_dropped=(
+                    layout_preset['edge_labels_are_dropped']
+                ),
+            )
+            span_sizes['dot_bytes'] = len(dot_text.encode())
+
+        batch_key = (
+            render_graph_args['dot_command'],
+            layout_preset['engine'],
+            tuple(output_formats),
+        )
+        batch_dict.setdefault(batch_key, []).append({
+            'index': index,
+            'render_graph_args': render_graph_args,
+            'structural_hash': structural_hash,
+            'raster_resolution': raster_resolution,
+            'batch_item': {
+                'dot_text': dot_text,
+                'output_directory_path': (
+                    render_graph_args['output_directory_path']
+                ),
+                'output_filename': render_graph_args['output_filename'],
+                'backed_up_output_formats': (
+                    render_graph_args['backed_up_output_formats']
+                ),
+                'backup_retention': render_graph_args['backup_retention'],
+                'timing_record': render_graph_args['timing_record'],
+            },
+        })
+
+    for (dot_command, layout_engine, output_formats), batch_graphs in (
+        batch_dict.items()
+    ):
+        if len(batch_graphs) == 1:
+            unbatched_indexes.append(batch_graphs[0]['index'])
+            continue
+
+        time_budgets = [
+            batch_graph['render_graph_args']['time_budget']
+            for batch_graph
+            in batch_graphs
+        ]
+
+        # The layouts to store are rendered by the same Graphviz run.
+        layouts_are_stored = any(
+            batch_graph['structural_hash'] is not None
+            for batch_graph
+            in batch_graphs
+        )
+
+        temp_directory_path = tempfile.mkdtemp(prefix='rig-graphviz-batch-')
+        batch_start_time = time.monotonic()
+        batch_start_perf_counter = time.perf_counter()
+
+        try:
+            batch_results = save_batch_files(
+                [batch_graph['batch_item'] for batch_graph in batch_graphs],
+                dot_command,
+                temp_directory_path,
+                output_formats=output_formats,
+                layout_engine=layout_engine,
+                extra_output_formats=(
+                    ('json0',) if layouts_are_stored else ()
+                ),
+                time_budget=(
+                    None
+                    if None in time_budgets
+                    else max(time_budgets)
+                ),
+            )
+
+            batch_duration = time.monotonic() - batch_start_time
+
+            for batch_graph, batch_result in zip(
+                batch_graphs,
+                batch_results,
+            ):
+                index = batch_graph['index']
+                render_graph_args = batch_graph['render_graph_args']
+
+                # Each graph in the batch is timed as if it had the whole
+                # shared Graphviz run (including the backups of every graph).
+                add_timing_span(
+                    render_graph_args['timing_record'],
+                    'graphviz',
+                    batch_start_perf_counter,
+                    batch_duration,
+                    batched_graphs=len(batch_graphs),
+                )
+
+                if isinstance(batch_result, Exception):
+                    results[index] = batch_result
+                    continue
+
+                if batch_graph['structural_hash'] is not None:
+                    with open(
+                        batch_result.pop('json0'),
+                        encoding='utf-8',
+                    ) as file:
+                        store_layout(
+                            render_graph_args['layout_file_path'],
+                            batch_graph['structural_hash'],
+                            file.read(),
+                            render_graph_args['graph_data'],
+                            render_graph_args['layout_preset_name'],
+                            rankdir=render_graph_args['rankdir'],
+                        )
+                else:
+                    batch_result.pop('json0', None)
+
+                layout_preset_label = layout_preset_dict[
+                    render_graph_args['layout_preset_name']
+                ]['label']
+                attempt_description = (
+                    f'{layout_preset_label} layout finished '
+                    f'in {batch_duration:.1f} s, as one of '
+                    f'{len(batch_graphs)} graphs in one Graphviz run'
+                )
+
+                raster_resolution = batch_graph['raster_resolution']
+                if raster_resolution is not None:
+                    attempt_description += (
+                        f', at {raster_resolution["dpi"]} DPI '
+                        f'(up to {raster_resolution["megapixels"]:.0f} '
+                        'megapixels)'
+                    )
+
+                results[index] = (batch_result, [attempt_description])
+
+        except GraphvizTimeoutError:
+            # In this case, the batch took too long, so its graphs are
+            # rendered alone, with their own time budgets and retries.
+            unbatched_indexes.extend(
+                batch_graph['index']
+                for batch_graph
+                in batch_graphs
+            )
+
+        except Exception as err:
+            # In this case, the whole batch failed (e.g., because Graphviz
+            # could not be found), so every graph in it failed.
+            for batch_graph in batch_graphs:
+                results[batch_graph['index']] = err
+
+        finally:
+            shutil.rmtree(temp_directory_path, ignore_errors=True)
+
+    for index in sorted(unbatched_indexes):
+        try:
+            results[index] = render_graph(**render_graph_kwargs_list[index])
+        except Exception as err:
+            results[index] = err
+
+    return results
+
+
+def create_render_progress():
+    """
+    This function returns a new render-progress dictionary, which
+    render_graph_stages updates from its thread while another thread (e.g.,
+    Blender’s UI thread) reads it. It has these items:
+
+    stage_label: The label of the stage that is running, or None.
+
+    stage_start_time: The time.monotonic() time at which that stage started.
+
+    stage_results: A list of the results of render_graph for the stages that
+    have finished, in order.
+
+    attempt_descriptions: A list of the descriptions of render attempts that
+    have timed out (see render_graph’s report_attempt argument), in order.
+    """
+    return {
+        'stage_label': None,
+        'stage_start_time': time.monotonic(),
+        'stage_results': [],
+        'attempt_descriptions': [],
+    }
+
+
+def render_graph_stages(
+    render_stages,
+    render_progress=None,
+    render_profile=None,
+):
+    """
+    This function calls render_graph once for each of the given render_stages,
+    in order, and it returns a list of their results. Each render stage is a
+    dictionary with a label (e.g., 'Preview') and render_graph_kwargs (the
+    keyword arguments for render_graph). If given, the render_progress (see
+    create_render_progress) is updated as each stage starts and finishes.
+
+    If the render_profile is not None, then each stage is profiled in it (see
+    the renderprofiles module).
+
+    Any error raised by a stage stops the later stages and is raised
+    immediately.
+    """
+    if render_progress is None:
+        render_progress = create_render_progress()
+
+    for render_stage in render_stages:
+        render_progress['stage_label'] = render_stage['label']
+        render_progress['stage_start_time'] = time.monotonic()
+
+        with profile_render_part(render_profile):
+            stage_result = render_graph(
+                **render_stage['render_graph_kwargs'],
+                report_attempt=render_progress['attempt_descriptions'].append,
+            )
+        render_progress['stage_results'].append(stage_result)
+
+    render_progress['stage_label'] = None
+
+    return render_progress['stage_results']
+
+
+def start_background_task(function, *args, **kwargs):
+    """
+    This function starts calling the given function with the given arguments
+    in a new background thread. It immediately returns a
+    concurrent.futures.Future, which is resolved with the function’s result or
+    error.
+
+    The thread is a daemon thread, so that a long render does not stop Blender
+    from quitting. (Renders may be cancelled with their cancel_event
+    arguments.)
+    """
+    future = Future()
+
+    def run_task():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(function(*args, **kwargs))
+        except BaseException as err:
+            future.set_exception(err)
+
+    threading.Thread(target=run_task, daemon=True).start()
+
+    return future
+
+
+def start_background_render(**render_graph_kwargs):
+    """
+    This function starts calling render_graph with the given keyword arguments
+    in a new background thread (see start_background_task). It immediately
+    returns a concurrent.futures.Future, which is resolved with render_graph’s
+    result or error.
+    """
+    return start_background_task(render_graph, **render_graph_kwargs)
+
+
+def create_render_queue(
+    max_num_of_running_tasks=default_max_num_of_running_render_tasks,
+    batch_render_threshold=default_batch_render_threshold,
+):
+    """
+    This function returns a new render queue, which runs render tasks (see
+    submit_render_task) in background threads, but no more than
+    max_num_of_running_tasks at once, so that several renders in a row do not
+    start so many Graphviz processes that they slow each other down (and every
+    other program). The render queue is a dictionary with these items:
+
+    lock: A threading.Lock, which is held whenever the render queue’s tasks
+    are changed.
+
+    max_num_of_running_tasks: The maximum number of tasks that may run at
+    once. (A batch of tasks counts as one task; see below.) It may be changed
+    at any time; a change takes effect when the next task is submitted or
+    finishes.
+
+    batch_render_threshold: When more than this many batchable tasks (see
+    submit_render_stages) are waiting, they all run together as one batch,
+    with a single Graphviz run for their graphs (see render_graph_batch). It
+    may be changed at any time, like max_num_of_running_tasks.
+
+    pending_tasks: A list of the tasks that are waiting to run, in order from
+    oldest to newest.
+
+    running_tasks: A list of the tasks that are running.
+
+    num_of_running_workers: The number of threads that are running tasks (or
+    batches of tasks).
+
+    Each task is a dictionary with these items:
+
+    key: A hashable key for the output files that the task renders (e.g., their
+    path without a file extension). Tasks with the same key never run at once.
+
+    function, args, kwargs: The function that the task calls, and its
+    arguments.
+
+    cancel_event: A threading.Event that cancels the task’s render when set.
+
+    future: A concurrent.futures.Future, which is resolved with the function’s
+    result or error.
+
+    is_superseded: Whether a newer task with the same key has been submitted.
+
+    batched_render_stage, render_progress: If the task is batchable, then its
+    only render stage and its render progress (see submit_render_stages), or
+    else None.
+    """
+    return {
+        'lock': threading.Lock(),
+        'max_num_of_running_tasks': max_num_of_running_tasks,
+        'batch_render_threshold': batch_render_threshold,
+        'pending_tasks': [],
+        'running_tasks': [],
+        'num_of_running_workers': 0,
+    }
+
+
+def create_render_task(task_key, cancel_event, function, *args, **kwargs):
+    """
+    This function returns a new render task (see create_render_queue) that
+    calls the given function with the given arguments.
+    """
+    return {
+        'key': task_key,
+        'function': function,
+        'args': args,
+        'kwargs': kwargs,
+        'cancel_event': cancel_event,
+        'future': Future(),
+        'is_superseded': False,
+        'batched_render_stage': None,
+        'render_progress': None,
+    }
+
+
+def submit_render_task(
+    render_queue,
+    task_key,
+    cancel_event,
+    function,
+    *args,
+    **kwargs,
+):
+    """
+    This function submits a new task to the given render_queue (see
+    create_render_queue), which calls the given function with the given
+    arguments in a background thread once the render queue has room for it.
+    It immediately returns a concurrent.futures.Future, which is resolved with
+    the function’s result or error.
+
+    The function must raise a GraphvizCancelledError if the given
+    cancel_event (a threading.Event) is set while it runs, as render_graph
+    does. If the cancel_event is set before the task starts, then the task
+    never starts, and its future is resolved with a GraphvizCancelledError.
+
+    Duplicate renders are coalesced, so that only the latest wins. Any older
+    task with the same task_key is superseded: if it is still waiting, then it
+    is removed from the render queue, and if it is running, then it is
+    cancelled with its cancel_event. Either way, its future is resolved with a
+    RenderSupersededError (unless it finishes before it can be cancelled). The
+    new task waits for any older running task with the same task_key to stop,
+    so that they never write the same output files at once.
+    """
+    return enqueue_render_task(
+        render_queue,
+        create_render_task(task_key, cancel_event, function, *args, **kwargs),
+    )
+
+
+def submit_render_stages(
+    render_queue,
+    task_key,
+    cancel_event,
+    render_stages,
+    render_progress,
+    render_profile=None,
+):
+    """
+    This function submits a new task to the given render_queue that calls
+    render_graph_stages with the given render_stages, render_progress, and
+    render_profile, like submit_render_task. It immediately returns a
+    concurrent.futures.Future, which is resolved with render_graph_stages’s
+    result or error.
+
+    If there is only one render stage, and if it is batchable (see
+    is_render_batchable), then the task may instead be run in a batch together
+    with other such tasks (see create_render_queue). Its result is the same,
+    and its errors are its own. (A profiled task is never batched, since its
+    profile would also include the other tasks’ graphs.)
+    """
+    render_task = create_render_task(
+        task_key,
+        cancel_event,
+        render_graph_stages,
+        render_stages,
+        render_progress,
+        render_profile,
+    )
+
+    if (
+        render_profile is None
+        and len(render_stages) == 1
+        and is_render_batchable(render_stages[0]['render_graph_kwargs'])
+    ):
+        render_task['batched_render_stage'] = render_stages[0]
+        render_task['render_progress'] = render_progress
+
+    return enqueue_render_task(render_queue, render_task)
+
+
+def enqueue_render_task(render_queue, task):
+    """
+    This function adds the given task to the given render_queue, superseding
+    any older task with the same key (see submit_render_task), and it returns
+    the task’s future.
+    """
+    task_key = task['key']
+
+    with render_queue['lock']:
+        superseded_pending_tasks = [
+            pending_task
+            for pending_task
+            in render_queue['pending_tasks']
+            if pending_task['key'] == task_key
+        ]
+        render_queue['pending_tasks'] = [
+            pending_task
+            for pending_task
+            in render_queue['pending_tasks']
+            if pending_task['key'] != task_key
+        ]
+
+        for running_task in render_queue['running_tasks']:
+            if running_task['key'] == task_key:
+                running_task['is_superseded'] = True
+                running_task['cancel_event'].set()
+
+        render_queue['pending_tasks'].append(task)
+        start_pending_render_tasks(render_queue)
+
+    # The superseded tasks’ futures are resolved outside of the lock, because
+    # resolving a future calls its callbacks, which might submit other tasks.
+    for superseded_task in superseded_pending_tasks:
+        superseded_task['is_superseded'] = True
+        superseded_task['cancel_event'].set()
+        if superseded_task['future'].set_running_or_notify_cancel():
+            superseded_task['future'].set_exception(RenderSupersededError(
+                'A newer render of the same output files was submitted.',
+            ))
+
+    return task['future']
+
+
+def start_pending_render_tasks(render_queue):
+    """
+    This function starts running as many of the given render_queue’s pending
+    tasks (in order from oldest to newest) as it has room for, skipping any
+    task whose key is the same as that of a running task. If more batchable
+    tasks are waiting than the render queue’s batch_render_threshold, then
+    they are started first, together in one batch. It must be called while
+    the render queue’s lock is held. It returns None.
+    """
+    running_task_keys = {
+        running_task['key']
+        for running_task
+        in render_queue['running_tasks']
+    }
+
+    def start_worker(target, tasks):
+        for task in tasks:
+            render_queue['pending_tasks'].remove(task)
+            render_queue['running_tasks'].append(task)
+            running_task_keys.add(task['key'])
+
+        render_queue['num_of_running_workers'] += 1
+
+        # The thread is a daemon thread, so that a long render does not stop
+        # Blender from quitting.
+        threading.Thread(
+            target=target,
+            args=(render_queue, tasks),
+            daemon=True,
+        ).start()
+
+    def has_room():
+        return (
+            render_queue['num_of_running_workers']
+            < render_queue['max_num_of_running_tasks']
+        )
+
+    batchable_tasks = [
+        task
+        for task
+        in render_queue['pending_tasks']
+        if task['batched_render_stage'] is not None
+        and task['key'] not in running_task_keys
+    ]
+    if (
+        has_room()
+        and len(batchable_tasks) > render_queue['batch_render_threshold']
+    ):
+        start_worker(run_render_task_batch, batchable_tasks)
+
+    for task in list(render_queue['pending_tasks']):
+        if not has_room():
+            break
+
+        if task['key'] in running_task_keys:
+            continue
+
+        start_worker(run_render_tasks, [task])
+
+
+def finish_render_tasks(render_queue, tasks):
+    """
+    This function removes the given finished tasks, which were run by one
+    worker thread, from the given render_queue, then starts any pending tasks
+    that now have room. It returns None.
+    """
+    with render_queue['lock']:
+        for task in tasks:
+            render_queue['running_tasks'].remove(task)
+        render_queue['num_of_running_workers'] -= 1
+        start_pending_render_tasks(render_queue)
+
+
+def resolve_render_task(task, result=None, error=None):
+    """
+    This function resolves the given running task’s future with the given
+    result, or with the given error if it is not None. It returns None.
+    """
+    future = task['future']
+
+    if error is None:
+        future.set_result(result)
+    elif task['is_superseded'] and isinstance(error, GraphvizCancelledError):
+        future.set_exception(RenderSupersededError(
+            'A newer render of the same output files was submitted.',
+        ))
+    else:
+        future.set_exception(error)
+
+
+def run_render_tasks(render_queue, tasks):
+    """
+    This function runs the given tasks from the given render_queue (see
+    create_render_queue) one by one in the current thread. When the tasks
+    finish, it makes room for the next pending tasks, then resolves the tasks’
+    futures. It returns None.
+    """
+    outcomes = []
+
+    for task in tasks:
+        # A future that was cancelled (with its cancel method) is not run.
+        if not task['future'].set_running_or_notify_cancel():
+            continue
+
+        try:
+            if task['cancel_event'].is_set():
+                # In this case, the render was cancelled before it started.
+                raise GraphvizCancelledError(
+                    'The render was cancelled before it started.',
+                )
+            outcomes.append((
+                task,
+                task['function'](*task['args'], **task['kwargs']),
+                None,
+            ))
+        except BaseException as err:
+            outcomes.append((task, None, err))
+
+    finish_render_tasks(render_queue, tasks)
+
+    for task, result, error in outcomes:
+        resolve_render_task(task, result, error)
+
+
+def run_render_task_batch(render_queue, tasks):
+    """
+    This function runs the given batchable tasks from the given render_queue
+    (see create_render_queue) together in the current thread, rendering their
+    graphs with render_graph_batch. Like run_render_tasks, it then makes room
+    for the next pending tasks and resolves the tasks’ futures, each with its
+    own render_graph_stages result or error. It returns None.
+    """
+    running_tasks = [
+        task
+        for task
+        in tasks
+        if task['future'].set_running_or_notify_cancel()
+    ]
+
+    for task in running_tasks:
+        task['render_progress']['stage_label'] = (
+            task['batched_render_stage']['label']
+        )
+        task['render_progress']['stage_start_time'] = time.monotonic()
+
+    try:
+        results = render_graph_batch([
+            task['batched_render_stage']['render_graph_kwargs']
+            for task
+            in running_tasks
+        ])
+    except BaseException as err:
+        results = [err] * len(running_tasks)
+
+    finish_render_tasks(render_queue, tasks)
+
+    for task, result in zip(running_tasks, results):
+        render_progress = task['render_progress']
+        render_progress['stage_label'] = None
+
+        if isinstance(result, BaseException):
+            resolve_render_task(task, error=result)
+        else:
+            render_progress['stage_results'].append(result)
+            resolve_render_task(task, render_progress['stage_results'])
@@ -0,0 +1,141 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This module profiles renders at the level of Python functions, with Python’s
+built-in cProfile module. The rendertimings module shows which stage of a
+render is slow; a profile shows which functions (e.g., which accesses of
+Blender’s RNA data, or which of the add-on’s helpers) make it slow.
+
+A render runs in more than one thread: the rig is analyzed in Blender’s main
+thread, and the DOT text is created (and Graphviz is run) in a render queue’s
+background thread. Because cProfile profiles only the thread in which it is
+enabled, each thread’s part of the render is profiled separately, and the
+profiles are combined when they are written.
+
+A render profile is a dictionary with these items:
+
+profiles: A list of the cProfile.Profile objects of the render’s finished
+parts, in the order in which they finished.
+
+lock: A threading.Lock that is held whenever profiles are added.
+
+Every function in this module accepts None instead of a render profile, in
+which case nothing is profiled. Profiling is off unless it is chosen in the
+add-on’s preferences, so renders that are not profiled do not pay for it.
+"""
+
+import contextlib
+import cProfile
+import io
+import pstats
+import threading
+
+# The text summary of a render profile lists this many functions for each
+# sort order.
+num_of_summarized_functions = 40
+
+# The text summary of a render profile lists functions in these pstats sort
+# orders: first by the time spent in them and in the functions that they call,
+# then by the time spent in them alone.
+summary_sort_keys = ('cumulative', 'tottime')
+
+
+def create_render_profile():
+    """
+    This function returns a new, empty render profile (see this module’s
+    docstring).
+    """
+    return {
+        'profiles': [],
+        'lock': threading.Lock(),
+    }
+
+
+@contextlib.contextmanager
+def profile_render_part(render_profile):
+    """
+    This function returns a context manager that profiles its block (even if
+    the block raises an error) in the current thread, adding the block’s
+    profile to the given render_profile. If the render_profile is None, then
+    the block runs without being profiled.
+
+    Python allows only one profiler at a time in a thread (and, in Python
+    3.12 and later, in a process). If another profiler is already running,
+    then the block also runs without being profiled.
+    """
+    if render_profile is None:
+        yield
+        return
+
+    profile = cProfile.Profile()
+
+    try:
+        profile.enable()
+    except ValueError:
+        # In this case, another profiler is already running.
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        profile.disable()
+        with render_profile['lock']:
+            render_profile['profiles'].append(profile)
+
+
+def create_profile_stats(render_profile):
+    """
+    This function returns a pstats.Stats object that combines the profiles of
+    the given render_profile, or None if the render_profile is None or has no
+    profiles.
+    """
+    if render_profile is None:
+        return None
+
+    with render_profile['lock']:
+        profiles = list(render_profile['profiles'])
+
+    if not profiles:
+        return None
+
+    return pstats.Stats(*profiles)
+
+
+def summarize_profile_stats(profile_stats):
+    """
+    This function returns a text summary of the given profile_stats (a
+    pstats.Stats object), listing its top functions in each of the
+    summary_sort_keys orders.
+    """
+    summary_stream = io.StringIO()
+    profile_stats.stream = summary_stream
+
+    for sort_key in summary_sort_keys:
+        profile_stats.sort_stats(sort_key).print_stats(
+            num_of_summarized_functions,
+        )
+
+    return summary_stream.getvalue()
+
+
+def write_render_profile(render_profile, profile_file_path, summary_file_path):
+    """
+    This function writes the given render_profile’s combined profiles to a
+    profile file (which can be read by pstats, SnakeViz, and other profile
+    viewers) at the given profile_file_path, and it writes a text summary of
+    them (see summarize_profile_stats) to the given summary_file_path. It
+    returns whether the render_profile had any profiles to write.
+    """
+    profile_stats = create_profile_stats(render_profile)
+
+    if profile_stats is None:
+        return False
+
+    profile_stats.dump_stats(profile_file_path)
+
+    with open(summary_file_path, mode='w', encoding='utf-8') as file:
+        file.write(summarize_profile_stats(profile_stats))
+
+    return True
@@ -0,0 +1,260 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This module records how long each stage of a render takes – loading edit-mode
+data, analyzing the rig, creating the DOT text, running Graphviz, backing up
+existing files, loading the PNG image, and so on – along with the sizes that
+each stage worked on (e.g., numbers of bones, nodes, and edges, and numbers of
+DOT and PNG bytes). When a render is slow, its timings show where the time
+went.
+
+A timing record is a dictionary with these items:
+
+start_time: The time.perf_counter() time at which the timing record was
+created. Spans’ times are relative to it.
+
+spans: A list of the timing record’s spans, in the order in which they
+finished. Each span is a dictionary with these items:
+
+* name: The name of the stage (e.g., 'analyze_rig_graph').
+* start_time: The number of seconds from the timing record’s start_time to the
+  span’s start.
+* duration: The span’s duration in seconds.
+* thread_id: The threading.get_ident() ID of the thread that ran the stage.
+* sizes: A dictionary from size names (e.g., 'nodes' or 'dot_bytes') to
+  integers.
+
+lock: A threading.Lock that is held whenever spans are added, since the stages
+of a render run in both Blender’s main thread and background threads.
+
+Every function in this module accepts None instead of a timing record, in
+which case nothing is recorded, so that callers need not check whether timings
+are being recorded.
+
+A timing record may be exported as a Chrome trace file (which can be opened
+in Chrome’s about:tracing page or in Perfetto), or appended as one line to a
+JSON Lines file, which may collect the timings of many renders (e.g., by
+several users into a shared directory) for aggregation.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+
+def create_timing_record():
+    """
+    This function returns a new, empty timing record (see this module’s
+    docstring).
+    """
+    return {
+        'start_time': time.perf_counter(),
+        'spans': [],
+        'lock': threading.Lock(),
+    }
+
+
+def add_timing_span(timing_record, name, start_time, duration, **sizes):
+    """
+    This function adds a finished span to the given timing_record, with the
+    given name, start_time (a time.perf_counter() time), duration (in
+    seconds), and sizes (integers). It returns None.
+    """
+    if timing_record is None:
+        return
+
+    span = {
+        'name': name,
+        'start_time': start_time - timing_record['start_time'],
+        'duration': duration,
+        'thread_id': threading.get_ident(),
+        'sizes': sizes,
+    }
+
+    with timing_record['lock']:
+        timing_record['spans'].append(span)
+
+
+@contextlib.contextmanager
+def record_timing_span(timing_record, name, **sizes):
+    """
+    This function returns a context manager that adds a span with the given
+    name and sizes to the given timing_record, lasting for as long as its
+    block runs (even if the block raises an error). The context manager
+    yields the span’s sizes dictionary, into which the block may put sizes
+    that it finds out later (e.g., the size of a file that it creates).
+    """
+    start_time = time.perf_counter()
+
+    try:
+        yield sizes
+    finally:
+        add_timing_span(
+            timing_record,
+            name,
+            start_time,
+            time.perf_counter() - start_time,
+            **sizes,
+        )
+
+
+def get_file_size(file_path):
+    """
+    This function returns the size of the file at the given file_path in
+    bytes, or 0 if it cannot be read.
+    """
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+def describe_duration(duration):
+    """
+    This function returns a short, human-readable string for the given
+    duration in seconds (e.g., '12 ms' or '2.35 s').
+    """
+    if duration < 1:
+        return f'{duration * 1000:.0f} ms'
+    else:
+        return f'{duration:.2f} s'
+
+
+def describe_size(size_name, size):
+    """
+    This function returns a short, human-readable string for the given size
+    with the given size_name (e.g., '5,000 bones' or 'PNG 1.2 MB').
+    """
+    if size_name.endswith('_bytes'):
+        file_kind = size_name[:-len('_bytes')].upper()
+        if size < 1024 * 1024:
+            return f'{file_kind} {size / 1024:.1f} KB'
+        else:
+            return f'{file_kind} {size / (1024 * 1024):.1f} MB'
+    else:
+        return f'{size:,} {size_name.replace("_", " ")}'
+
+
+def summarize_timing_record(timing_record):
+    """
+    This function returns a one-line summary of the given timing_record: the
+    total duration of each span name (in the order in which the names first
+    finished), followed by the latest value of each size. It returns None if
+    the timing_record is None or has no spans.
+    """
+    if timing_record is None:
+        return None
+
+    with timing_record['lock']:
+        spans = list(timing_record['spans'])
+
+    if not spans:
+        return None
+
+    duration_dict = {}
+    size_dict = {}
+    for span in spans:
+        duration_dict[span['name']] = (
+            duration_dict.get(span['name'], 0) + span['duration']
+        )
+        size_dict.update(span['sizes'])
+
+    return '; '.join([
+        ', '.join(
+            f'{name} {describe_duration(duration)}'
+            for name, duration
+            in duration_dict.items()
+        ),
+        *(
+            [', '.join(
+                describe_size(size_name, size)
+                for size_name, size
+                in size_dict.items()
+            )]
+            if size_dict
+            else []
+        ),
+    ])
+
+
+def create_chrome_trace(timing_record, metadata={}):
+    """
+    This function returns a dictionary in the Chrome Trace Event Format for
+    the given timing_record, with one complete event for each span. The given
+    metadata (a dictionary of JSON-serializable values, e.g., the output file
+    path) is put into the trace’s otherData.
+    """
+    with timing_record['lock']:
+        spans = list(timing_record['spans'])
+
+    process_id = os.getpid()
+
+    return {
+        'traceEvents': [
+            {
+                'name': span['name'],
+                'cat': 'rig_graphviz',
+                'ph': 'X',
+                # Chrome traces’ times are in microseconds.
+                'ts': round(span['start_time'] * 1_000_000),
+                'dur': round(span['duration'] * 1_000_000),
+                'pid': process_id,
+                'tid': span['thread_id'],
+                'args': span['sizes'],
+            }
+            for span
+            in spans
+        ],
+        'displayTimeUnit': 'ms',
+        'otherData': metadata,
+    }
+
+
+def write_chrome_trace_file(timing_record, file_path, metadata={}):
+    """
+    This function writes the given timing_record, with the given metadata, to
+    a Chrome trace file at the given file_path (see create_chrome_trace). It
+    returns None.
+    """
+    if timing_record is None:
+        return
+
+    with open(file_path, mode='w', encoding='utf-8') as file:
+        json.dump(create_chrome_trace(timing_record, metadata), file)
+
+
+def append_timing_json_line(timing_record, file_path, metadata={}):
+    """
+    This function appends one line to the JSON Lines file at the given
+    file_path (creating the file if needed), with a JSON object holding the
+    given metadata and the given timing_record’s spans. It returns None.
+
+    Each line is written with a single write call, so that renders that
+    append to the same file at once (e.g., in a shared directory) do not
+    interleave their lines.
+    """
+    if timing_record is None:
+        return
+
+    with timing_record['lock']:
+        spans = list(timing_record['spans'])
+
+    json_line = json.dumps({
+        **metadata,
+        'spans': [
+            {
+                'name': span['name'],
+                'start_time': round(span['start_time'], 6),
+                'duration': round(span['duration'], 6),
+                'sizes': span['sizes'],
+            }
+            for span
+            in spans
+        ],
+    }) + '\n'
+
+    with open(file_path, mode='a', encoding='utf-8') as file:
+        file.write(json_line)
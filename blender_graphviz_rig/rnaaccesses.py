@@ -0,0 +1,353 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This module counts how many times the analysis of a rig (see the analyzerigs
+and analyzebones modules) reads the attributes of Blender’s data and looks up
+items in Blender’s collections. Almost all of the analysis’s time is spent in
+these accesses of Blender’s RNA data (e.g., bones[name], pose.bones[name],
+constraints, and getattr(c, 'target')), since each one goes through Blender’s
+RNA layer, so their counts show which functions make the analysis slow – and
+whether a change makes any function access the data more times than it needs
+to.
+
+The accesses are counted by wrapping the scene objects that are given to the
+analyzerigs module’s analyze_rig_graph function in counting proxies (see
+wrap_rna_value). A counting proxy passes every access through to the struct
+that it wraps, but it first counts the access under the name of the function
+that made it, and it wraps the accessed value in another counting proxy (unless
+the value is a string, number, boolean, or None). The proxies work the same
+with any objects that act like Blender’s structs and collections (e.g., fake
+rigs that are created outside of Blender), so the counts for a rig are
+repeatable.
+
+An RNA-access counter is a dictionary with these items:
+
+counts: A dictionary from tuples (function_name, access_kind, access_name) to
+the numbers of accesses. The function_name is the name of the function that
+made the accesses, prefixed by its module’s name (e.g.,
+'analyzebones.classify_bone'). The access_kind is either 'attribute' (for an
+attribute read) or 'lookup' (for a collection lookup, membership test, length,
+iterated item, or method call). The access_name names the accessed attribute
+with the attribute through which its struct was reached (e.g., 'pose.bones'),
+or the collection with a description of the lookup (e.g., 'pose.bones[]',
+'data.bones in', or 'bones[].constraints iteration').
+
+proxies: A dictionary from each struct that has been wrapped to its counting
+proxy, so that a struct that is reached in different ways (e.g., as an
+operand and again as a constraint’s target) is always wrapped by the same
+proxy (named after the first way in which it was reached), and so that the
+analysis’s identity checks (e.g., target is armature_object) behave as they
+would without the proxies.
+
+Counting accesses slows the analysis down several times over, so it is only
+done when it is chosen in the add-on’s preferences.
+"""
+
+import sys
+
+# Values of these types are not wrapped in counting proxies. (Reading them is
+# counted, but what is done with them afterward is not an RNA access.)
+unwrapped_value_types = (str, bytes, int, float, bool, type(None))
+
+
+def create_rna_access_counter():
+    """
+    This function returns a new RNA-access counter (see this module’s
+    docstring).
+    """
+    return {
+        'counts': {},
+        'proxies': {},
+    }
+
+
+def get_accessing_function_name(frame):
+    """
+    This function returns the name of the function that is running in the
+    given frame, prefixed by the last part of its module’s name (e.g.,
+    'analyzerigs.declare_plain_bone_node').
+    """
+    module_name = frame.f_globals.get('__name__', '')
+    return f'{module_name.rpartition(".")[2]}.{frame.f_code.co_name}'
+
+
+def count_rna_access(rna_access_counter, access_kind, access_name):
+    """
+    This function counts one access of the given access_kind and access_name
+    (see this module’s docstring) in the given rna_access_counter, made by the
+    function that called the counting proxy’s method that called this
+    function. It returns None.
+    """
+    # Frame 0 is this function, and frame 1 is the counting proxy’s method.
+    count_key = (
+        get_accessing_function_name(sys._getframe(2)),
+        access_kind,
+        access_name,
+    )
+    counts = rna_access_counter['counts']
+    counts[count_key] = counts.get(count_key, 0) + 1
+
+
+def join_rna_value_name(value_name, attribute_name):
+    """
+    This function returns the name of the value of the attribute with the
+    given attribute_name of a value with the given value_name (e.g.,
+    'pose.bones' for the attribute 'bones' of the value 'objects[].pose'). Only
+    the value_name’s last part is kept, so that names stay short.
+    """
+    if value_name:
+        return f'{value_name.rpartition(".")[2]}.{attribute_name}'
+    else:
+        return attribute_name
+
+
+def wrap_rna_value(rna_access_counter, value, value_name=''):
+    """
+    This function returns a counting proxy for the given value (see
+    RnaAccessCountingProxy), which counts its accesses in the given
+    rna_access_counter. The value_name describes how the value was reached
+    (e.g., 'pose.bones'; see join_rna_value_name), and it names the value’s
+    accesses. Strings, numbers, booleans, and None are returned as they are.
+    """
+    if isinstance(value, unwrapped_value_types):
+        return value
+
+    if isinstance(value, RnaAccessCountingProxy):
+        return value
+
+    proxies = rna_access_counter['proxies']
+
+    try:
+        proxy = proxies.get(value)
+    except TypeError:
+        # In this case, the value is unhashable, so it cannot share a proxy.
+        return RnaAccessCountingProxy(rna_access_counter, value, value_name)
+
+    if proxy is None:
+        proxy = RnaAccessCountingProxy(rna_access_counter, value, value_name)
+        proxies[value] = proxy
+
+    return proxy
+
+
+def unwrap_rna_value(value):
+    """
+    This function returns the struct that the given value wraps, if it is a
+    counting proxy, or else the value itself.
+    """
+    if isinstance(value, RnaAccessCountingProxy):
+        return object.__getattribute__(value, '_wrapped_value')
+    else:
+        return value
+
+
+class RnaAccessCountingProxy:
+    """
+    This class is a counting proxy (see this module’s docstring) for a
+    Blender struct or collection (or for anything that acts like one). Its
+    instances should be created with wrap_rna_value.
+
+    Its own attributes have names that Blender’s structs do not use, and they
+    are read with object.__getattribute__, so that every other attribute read
+    passes through to the wrapped value.
+    """
+
+    __slots__ = ('_rna_access_counter', '_wrapped_value', '_value_name')
+
+    def __init__(self, rna_access_counter, wrapped_value, value_name):
+        object.__setattr__(self, '_rna_access_counter', rna_access_counter)
+        object.__setattr__(self, '_wrapped_value', wrapped_value)
+        object.__setattr__(self, '_value_name', value_name)
+
+    def __getattr__(self, attribute_name):
+        rna_access_counter = object.__getattribute__(
+            self,
+            '_rna_access_counter',
+        )
+        wrapped_value = object.__getattribute__(self, '_wrapped_value')
+        value_name = object.__getattribute__(self, '_value_name')
+
+        attribute_value_name = join_rna_value_name(value_name, attribute_name)
+
+        try:
+            attribute_value = getattr(wrapped_value, attribute_name)
+        except AttributeError:
+            # A missing attribute (e.g., the target of a Limit Rotation
+            # constraint) is still looked up, so its read is also counted.
+            count_rna_access(
+                rna_access_counter,
+                'attribute',
+                attribute_value_name,
+            )
+            raise
+
+        if callable(attribute_value):
+            # In this case, the attribute is a method (e.g., a collection’s
+            # get method), whose calls are counted as lookups instead.
+            def call_rna_method(*args, **kwargs):
+                count_rna_access(
+                    rna_access_counter,
+                    'lookup',
+                    f'{attribute_value_name}()',
+                )
+                return wrap_rna_value(
+                    rna_access_counter,
+                    attribute_value(
+                        *map(unwrap_rna_value, args),
+                        **kwargs,
+                    ),
+                    f'{value_name}[]',
+                )
+
+            return call_rna_method
+
+        count_rna_access(
+            rna_access_counter,
+            'attribute',
+            attribute_value_name,
+        )
+
+        return wrap_rna_value(
+            rna_access_counter,
+            attribute_value,
+            attribute_value_name,
+        )
+
+    def __setattr__(self, attribute_name, value):
+        setattr(
+            object.__getattribute__(self, '_wrapped_value'),
+            attribute_name,
+            unwrap_rna_value(value),
+        )
+
+    def __getitem__(self, key):
+        rna_access_counter = object.__getattribute__(
+            self,
+            '_rna_access_counter',
+        )
+        value_name = object.__getattribute__(self, '_value_name')
+        count_rna_access(rna_access_counter, 'lookup', f'{value_name}[]')
+
+        return wrap_rna_value(
+            rna_access_counter,
+            object.__getattribute__(self, '_wrapped_value')[key],
+            f'{value_name}[]',
+        )
+
+    def __contains__(self, key):
+        value_name = object.__getattribute__(self, '_value_name')
+        count_rna_access(
+            object.__getattribute__(self, '_rna_access_counter'),
+            'lookup',
+            f'{value_name} in',
+        )
+
+        return (
+            unwrap_rna_value(key)
+            in object.__getattribute__(self, '_wrapped_value')
+        )
+
+    def __len__(self):
+        value_name = object.__getattribute__(self, '_value_name')
+        count_rna_access(
+            object.__getattribute__(self, '_rna_access_counter'),
+            'lookup',
+            f'len({value_name})',
+        )
+
+        return len(object.__getattribute__(self, '_wrapped_value'))
+
+    def __iter__(self):
+        rna_access_counter = object.__getattribute__(
+            self,
+            '_rna_access_counter',
+        )
+        value_name = object.__getattribute__(self, '_value_name')
+
+        # Each item is counted when it is reached, under the function that
+        # is iterating over the collection.
+        for item in object.__getattribute__(self, '_wrapped_value'):
+            count_rna_access(
+                rna_access_counter,
+                'lookup',
+                f'{value_name} iteration',
+            )
+            yield wrap_rna_value(rna_access_counter, item, f'{value_name}[]')
+
+    def __bool__(self):
+        return bool(object.__getattribute__(self, '_wrapped_value'))
+
+    def __eq__(self, other):
+        return (
+            object.__getattribute__(self, '_wrapped_value')
+            == unwrap_rna_value(other)
+        )
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(object.__getattribute__(self, '_wrapped_value'))
+
+    def __repr__(self):
+        wrapped_value = object.__getattribute__(self, '_wrapped_value')
+        return f'<RnaAccessCountingProxy of {wrapped_value!r}>'
+
+
+def sum_rna_access_counts_by_function(rna_access_counter):
+    """
+    This function returns a dictionary from the name of each function that
+    made any accesses in the given rna_access_counter to a dictionary with the
+    function’s numbers of attribute reads and collection lookups (with the
+    keys 'attribute' and 'lookup'). Its items are ordered from the function
+    with the most accesses to the function with the fewest.
+    """
+    function_count_dict = {}
+
+    for (function_name, access_kind, _), num_of_accesses in (
+        rna_access_counter['counts'].items()
+    ):
+        function_counts = function_count_dict.setdefault(
+            function_name,
+            {'attribute': 0, 'lookup': 0},
+        )
+        function_counts[access_kind] += num_of_accesses
+
+    return dict(sorted(
+        function_count_dict.items(),
+        key=lambda item: -(item[1]['attribute'] + item[1]['lookup']),
+    ))
+
+
+def summarize_rna_access_counts(rna_access_counter, max_num_of_functions=5):
+    """
+    This function returns a one-line summary of the given rna_access_counter:
+    its total numbers of attribute reads and collection lookups, followed by
+    those of the max_num_of_functions functions with the most accesses.
+    """
+    function_count_dict = sum_rna_access_counts_by_function(
+        rna_access_counter,
+    )
+
+    num_of_attribute_reads = sum(
+        function_counts['attribute']
+        for function_counts
+        in function_count_dict.values()
+    )
+    num_of_lookups = sum(
+        function_counts['lookup']
+        for function_counts
+        in function_count_dict.values()
+    )
+
+    return '; '.join([
+        f'{num_of_attribute_reads:,} attribute reads and '
+        f'{num_of_lookups:,} collection lookups in total',
+        *(
+            f'{function_name} {function_counts["attribute"]:,} + '
+            f'{function_counts["lookup"]:,}'
+            for function_name, function_counts
+            in list(function_count_dict.items())[:max_num_of_functions]
+        ),
+    ])
@@ -6,13 +6,111 @@ This module takes strings that represent directed graphs with the DOT language,
 and it renders them into image files using Graphviz.
 """
 
-import itertools
-import shutil
+from .backupfiles import back_up_file, unlimited_backup_retention
+from .graphvizerrors import (
+    GraphvizNotFoundError,
+    GraphvizOutputError,
+    GraphvizTimeoutError,
+    GraphvizCancelledError,
+)
+from .rendertimings import record_timing_span
+from .graphvizlibrary import (
+    load_graphviz_library,
+    render_with_graphviz_library,
+    GraphvizLibraryError,
+    GraphvizLibraryInputError,
+)
+
+from concurrent.futures import Future, InvalidStateError
+import json
+import math
 import os
+import secrets
+import shutil
 import errno
 import asyncio
+import threading
+import time
+
+# This dictionary maps each supported output format (a Graphviz -T format
+# name) to the file extension of the files that it renders. Graphviz’s json
+# format contains the graph’s computed layout (its node positions, edge
+# splines, and so on) rather than an image. The png_tiles, ps_pages, and
+# png_thumbnail formats are not Graphviz formats; see
+# separately_rendered_output_formats.
+output_format_file_extension_dict = {
+    'png': '.png',
+    'svg': '.svg',
+    'svgz': '.svgz',
+    'pdf': '.pdf',
+    'json': '.json',
+    'png_tiles': '.tiles',
+    'ps_pages': '.ps',
+    'png_thumbnail': '.thumbnail.png',
+}
+
+# These output formats split a huge graph into parts, so that no single giant
+# bitmap is ever held in memory:
+#
+# png_tiles: A directory of PNG tiles (tile_side pixels square, except at the
+# right and bottom edges), with a JSON manifest of their positions (see
+# save_png_tiles_async).
+#
+# ps_pages: A PostScript document with one page for each page_size part of the
+# graph. (Graphviz paginates only PostScript output, not PDF output, so
+# multi-page PDF documents must be converted from it, e.g., with ps2pdf.)
+#
+# They are rendered by separate Graphviz runs that all reuse a single layout.
+tiled_output_formats = ('png_tiles', 'ps_pages')
+
+# These output formats are rendered by separate Graphviz runs that all reuse
+# the single layout of the other formats. Besides the tiled_output_formats,
+# the png_thumbnail format is a small PNG image of the whole graph (at most
+# thumbnail_side pixels wide and tall; see choose_thumbnail_dpi), which can be
+# loaded into Blender instead of a huge PNG image.
+separately_rendered_output_formats = (*tiled_output_formats, 'png_thumbnail')
+
+# This is the width and height (in pixels) of each PNG tile.
+tile_side = 2048
+
+# This is the largest width or height (in pixels) of a PNG thumbnail.
+thumbnail_side = 1024
+
+# This is the width and height (in inches) of each PostScript page (US
+# Letter).
+page_size = (8.5, 11)
 
-output_file_extension = '.png'
+# Graphviz renders each output file into a hidden partial file with this
+# extension, which is renamed to the output file only once it is complete.
+partial_file_extension = '.partial'
+
+# This is the filename of the manifest in each directory of PNG tiles.
+tile_manifest_filename = 'manifest.json'
+
+points_per_inch = 72
+
+# These are the output formats that are rendered when no others are specified.
+default_output_formats = ('png',)
+
+# Every image is padded by this many inches on each side, which is more than
+# Graphviz’s default padding (0.0555 inches, or 4 typographic points).
+graph_padding = 1
+
+# While Graphviz runs, its process is checked this often (in seconds) for
+# whether it has exceeded its time budget or has been cancelled.
+graphviz_poll_interval = 0.1
+
+
+def get_output_file_path(directory_path, filename, output_format):
+    """
+    This function returns the path of the file that renders the given
+    output_format at the given directory_path and filename (which has no file
+    extension).
+    """
+    return (
+        os.path.join(directory_path, filename)
+        + output_format_file_extension_dict[output_format]
+    )
 
 
 def save_temp_dot_source_file(dot_text, dot_source_file_path):
@@ -26,65 +124,49 @@ def save_temp_dot_source_file(dot_text, dot_source_file_path):
         file.write(dot_text)
 
 
-class GraphvizNotFoundError(Exception):
+async def kill_process_async(proc, communicate_task):
     """
-    This error class is used to indicate that the system shell could not find
-    the Graphviz DOT application.
+    This asynchronous function kills the given OS process, then waits for the
+    given communicate_task (from the process’s communicate method) to finish,
+    so that the process does not linger as a zombie. It returns None.
     """
-    pass
-
+    try:
+        proc.kill()
+    except ProcessLookupError:
+        # In this case, the process had already exited by itself.
+        pass
 
-class GraphvizOutputError(Exception):
-    """
-    This error class is used to indicate a problem raised by the Graphviz
-    application itself, such as a DOT-language syntax error in an input or
-    inability to save an image file at a given output location.
-    """
-    pass
+    await communicate_task
 
 
-async def exec_graphviz_async(
-    dot_command,
-    dot_source_file_path,
-    output_file_path,
+async def run_graphviz_async(
+    graphviz_args,
+    time_budget=None,
+    cancel_event=None,
 ):
     """
-    This asynchronous function executes the Graphviz command on the given DOT
-    source file. Once complete, it returns None. If it encounters problems
-    while rendering and saving, it may raise an OSError, a
-    GraphvizNotFoundError, or a GraphvizOutputError.
+    This asynchronous function runs a Graphviz process with the given
+    graphviz_args (a list of command-line arguments, starting with the DOT
+    command), and it returns a tuple (returncode, stderr_text) once the
+    process exits. It does not check the returncode itself. If the DOT command
+    cannot be found, then it raises a GraphvizNotFoundError, and it may raise
+    an OSError for other problems from the OS.
+
+    If time_budget (a number of seconds) is not None, and if Graphviz is still
+    running after that long, then its process is killed and a
+    GraphvizTimeoutError is raised. If cancel_event (a threading.Event) is not
+    None, and if it is set while Graphviz is running, then its process is
+    killed and a GraphvizCancelledError is raised.
     """
     try:
         # Create an OS process running Graphviz. The create_subprocess_exec
-        # function escapes command-argument strings and prevents shell-injection
-        # attacks.
+        # function escapes command-argument strings and prevents
+        # shell-injection attacks.
         proc = await asyncio.create_subprocess_exec(
-            # The dot command from Graphviz must be installed into the shell
-            # path.
-            dot_command,
-            # The new image’s file path.
-            '-o', output_file_path,
-            # The new image is rendered as a PNG.
-            '-T', 'png',
-            # The new image’s DPI is at 200 to prevent ugly pixelation.
-            '-Gdpi=300',
-            # The new image is to have a bigger padding than the default (which
-            # is 0.555, or 4 typographic points).
-            '-Gpad=1',
-            # The input DOT source file’s path.
-            dot_source_file_path,
+            *graphviz_args,
             # Pipe the process’s stderr text into a StreamWriter.
             stderr=asyncio.subprocess.PIPE,
         )
-        # Waits for the process to finish and gets the resulting stderr
-        # StreamWriter.
-        _, stderr = await proc.communicate()
-        # Graphviz returns an exit code of 0 if it is successful; it returns a
-        # non-zero exit code if it is not successful.
-        if proc.returncode:
-            # When Graphviz returns an error exit code, then the image saving
-            # was unsuccessful.
-            raise GraphvizOutputError(stderr.decode())
 
     except OSError as err:
         if err.errno == errno.ENOENT:
@@ -96,58 +178,733 @@ async def exec_graphviz_async(
             # occurred while running Graphviz DOT.
             raise err
 
+    start_time = time.monotonic()
+
+    # Waits for the process to finish and gets the resulting stderr
+    # StreamWriter – checking regularly on the time budget and the
+    # cancel_event in the meantime.
+    communicate_task = asyncio.ensure_future(proc.communicate())
+    while True:
+        done_tasks, _ = await asyncio.wait(
+            {communicate_task},
+            timeout=graphviz_poll_interval,
+        )
+        if done_tasks:
+            break
+
+        if cancel_event is not None and cancel_event.is_set():
+            await kill_process_async(proc, communicate_task)
+            raise GraphvizCancelledError()
+
+        elapsed_time = time.monotonic() - start_time
+        if time_budget is not None and elapsed_time > time_budget:
+            await kill_process_async(proc, communicate_task)
+            raise GraphvizTimeoutError(
+                f'Graphviz did not finish within {time_budget:g} seconds.'
+            )
+
+    _, stderr = communicate_task.result()
+
+    return (proc.returncode, stderr.decode())
+
+
+def create_graph_attr_args(dpi=300, graph_attrs={}):
+    """
+    This function returns a list of Graphviz -G command-line arguments for the
+    given dpi and graph_attrs (see exec_graphviz_async).
+    """
+    # The new images’ DPI (300 by default, to prevent ugly pixelation) and
+    # padding (which is bigger than the default), followed by any other graph
+    # attributes.
+    return [
+        f'-G{attr_name}={attr_value}'
+        for attr_name, attr_value
+        in {
+            'dpi': None if dpi is None else f'{dpi:g}',
+            'pad': f'{graph_padding:g}',
+            **graph_attrs,
+        }.items()
+        if attr_value is not None
+    ]
+
+
+async def exec_graphviz_async(
+    dot_command,
+    dot_source_file_path,
+    output_file_path_dict,
+    layout_engine='dot',
+    dpi=300,
+    graph_attrs={},
+    layout_is_reused=False,
+    time_budget=None,
+    cancel_event=None,
+    uses_graphviz_library=False,
+):
+    """
+    This asynchronous function executes the Graphviz command on the given DOT
+    source file. Once complete, it returns None. If it encounters problems
+    while rendering and saving, it may raise an OSError, a
+    GraphvizNotFoundError, or a GraphvizOutputError.
+
+    The output_file_path_dict is a dictionary from each output format to
+    render (see output_format_file_extension_dict) to the path of its new file.
+    Graphviz lays out the graph only once, no matter how many formats it
+    renders.
+
+    The layout_engine is the name of the Graphviz layout engine to use, such as
+    'dot' or 'sfdp' (see the layoutpresets module).
+
+    The dpi is the resolution of raster images, in pixels per inch. The
+    graph_attrs are a dictionary of extra DOT graph attributes, which are given
+    to Graphviz with -G. If the dpi or any of the graph_attrs’ values is None,
+    then that attribute is left out; for example, {'pad': None} leaves out the
+    default padding.
+
+    If layout_is_reused is true, then the DOT source file must already contain
+    a layout (e.g., from Graphviz’s dot output format), whose positions are
+    kept as they are (with neato -n2) instead of being laid out again by the
+    layout_engine.
+
+    The time_budget and cancel_event are passed to run_graphviz_async; see its
+    docstring for more information.
+
+    If uses_graphviz_library is true, and if Graphviz’s shared libraries can
+    be loaded (see the graphvizlibrary module), then the graph is rendered
+    in-process with them instead (see exec_graphviz_library_async). The dot
+    command is still run if they are busy with another render, or if they
+    cannot lay out or render the graph.
+    """
+    if uses_graphviz_library:
+        graphviz_library = load_graphviz_library(dot_command)
+        graph_is_rendered = (
+            graphviz_library is not None
+            and await exec_graphviz_library_async(
+                graphviz_library,
+                dot_source_file_path,
+                output_file_path_dict,
+                layout_engine=layout_engine,
+                dpi=dpi,
+                graph_attrs=graph_attrs,
+                layout_is_reused=layout_is_reused,
+                time_budget=time_budget,
+                cancel_event=cancel_event,
+            )
+        )
+        if graph_is_rendered:
+            return
+
+    returncode, stderr_text = await run_graphviz_async(
+        [
+            # The dot command from Graphviz must be installed into the shell
+            # path.
+            dot_command,
+            # The layout engine, or the engine that reuses an existing layout.
+            *(
+                ('-K', 'neato', '-n2')
+                if layout_is_reused
+                else ('-K', layout_engine)
+            ),
+            # Each output format is followed by the path of its new file.
+            # Graphviz applies each -o option to the -T option preceding it.
+            *[
+                arg
+                for output_format, output_file_path
+                in output_file_path_dict.items()
+                for arg
+                in ('-T', output_format, '-o', output_file_path)
+            ],
+            *create_graph_attr_args(dpi, graph_attrs),
+            # The input DOT source file’s path.
+            dot_source_file_path,
+        ],
+        time_budget=time_budget,
+        cancel_event=cancel_event,
+    )
+
+    # Graphviz returns an exit code of 0 if it is successful; it returns a
+    # non-zero exit code if it is not successful.
+    if returncode:
+        # When Graphviz returns an error exit code, then the image saving was
+        # unsuccessful.
+        raise GraphvizOutputError(stderr_text)
+
     # If Graphviz successfully rendered and saved the image file, then this
     # function will return None.
 
 
-def get_unused_suffixed_filename(directory_path, filename, file_extension):
+async def exec_graphviz_library_async(
+    graphviz_library,
+    dot_source_file_path,
+    output_file_path_dict,
+    layout_engine='dot',
+    dpi=300,
+    graph_attrs={},
+    layout_is_reused=False,
+    time_budget=None,
+    cancel_event=None,
+):
     """
-    This function returns an unused filename string, consisting of filename –
-    then “.0”, “.1”, “.2”, “.3”, “.4”, “.5”, “.6”, “.7”, “.8”, “.9”, “.10”, or
-    whatever is first unused – then the file_extension.
+    This asynchronous function renders the given DOT source file in-process
+    with the given graphviz_library (see the graphvizlibrary module), in a
+    worker thread, into memory, then saves the rendered data into the files
+    at the paths in the given output_file_path_dict. It returns True once
+    complete, or False if the dot command should be run instead (because the
+    libraries are busy with another render, or because they could not lay out
+    or render the graph). If the DOT source file cannot be read by Graphviz,
+    then a GraphvizOutputError is raised, as if by exec_graphviz_async.
+
+    The other arguments are the same as those of exec_graphviz_async. If the
+    time_budget is exceeded or the cancel_event is set, then the render is
+    abandoned (it cannot be killed like a process), and a GraphvizTimeoutError
+    or GraphvizCancelledError is raised immediately; its rendered data is
+    discarded whenever it finishes.
     """
-    base_filename = os.path.join(directory_path, filename)
+    with open(dot_source_file_path, encoding='utf-8') as file:
+        dot_text = file.read()
+
+    render_future = Future()
+
+    def settle_render_future(settle, value):
+        # An abandoned render’s future has already been cancelled (see
+        # below), so its result is simply dropped.
+        try:
+            settle(value)
+        except InvalidStateError:
+            pass
+
+    def run_render():
+        try:
+            output_data_dict = render_with_graphviz_library(
+                graphviz_library,
+                dot_text,
+                list(output_file_path_dict),
+                # This is the library’s equivalent of neato -n2.
+                layout_engine='nop2' if layout_is_reused else layout_engine,
+                graph_attrs={
+                    'dpi': None if dpi is None else f'{dpi:g}',
+                    'pad': f'{graph_padding:g}',
+                    **graph_attrs,
+                },
+            )
+        except BaseException as err:
+            # The future is settled within this block, since Python deletes
+            # err when the block ends.
+            settle_render_future(render_future.set_exception, err)
+        else:
+            settle_render_future(render_future.set_result, output_data_dict)
+
+    # The thread is a daemon thread, so that an abandoned render does not stop
+    # Blender from quitting.
+    threading.Thread(target=run_render, daemon=True).start()
+    start_time = time.monotonic()
+
+    # Waits for the render to finish – checking regularly on the time budget
+    # and the cancel_event in the meantime. An abandoned render’s wrapped
+    # future is cancelled, so that its result is ignored.
+    wrapped_render_future = asyncio.wrap_future(render_future)
+    while True:
+        done_tasks, _ = await asyncio.wait(
+            {wrapped_render_future},
+            timeout=graphviz_poll_interval,
+        )
+        if done_tasks:
+            break
+
+        if cancel_event is not None and cancel_event.is_set():
+            wrapped_render_future.cancel()
+            raise GraphvizCancelledError()
+
+        elapsed_time = time.monotonic() - start_time
+        if time_budget is not None and elapsed_time > time_budget:
+            wrapped_render_future.cancel()
+            raise GraphvizTimeoutError(
+                f'Graphviz did not finish within {time_budget:g} seconds.'
+            )
+
+    try:
+        output_data_dict = wrapped_render_future.result()
+
+    except GraphvizLibraryInputError as err:
+        # In this case, the dot command would report the same syntax error.
+        raise GraphvizOutputError(str(err))
 
-    # This iterator indefinitely yields consecutive integers starting from 0.
-    fresh_integers = itertools.count()
+    except GraphvizLibraryError:
+        # In this case, the libraries lack a plugin that the dot command
+        # might have, or the dot command will report the error itself.
+        return False
 
-    for i in fresh_integers:
-        trial_filename = f'{base_filename}.{i}{file_extension}'
-        if not os.path.exists(trial_filename):
-            return trial_filename
+    if output_data_dict is None:
+        # In this case, the libraries are busy with another render.
+        return False
 
+    for output_format, output_file_path in output_file_path_dict.items():
+        with open(output_file_path, mode='wb') as file:
+            file.write(output_data_dict[output_format])
 
-def back_up_file(directory_path, filename, file_extension):
+    return True
+
+
+async def exec_graphviz_batch_async(
+    dot_command,
+    dot_source_file_paths,
+    output_formats,
+    layout_engine='dot',
+    graph_attrs={},
+    time_budget=None,
+    cancel_event=None,
+):
     """
-    If a file exists at the given directory_path with the given filename and
-    file_extension, then this function copies it to a backup file named
-    filename – then “.0”, “.1”, “.2”, “.3”, “.4”, “.5”, “.6”, “.7”, “.8”, “.9”,
-    “.10”, or whatever is first unused – then the file_extension.
+    This asynchronous function executes the Graphviz command once on all of
+    the given DOT source files, rendering each of them in each of the given
+    output_formats (Graphviz formats, not the
+    separately_rendered_output_formats) with the given layout_engine. This
+    saves the time that Graphviz takes to start up (loading its plugins and
+    fonts) for each graph, which dominates the render time of small graphs.
+
+    Graphviz’s -O option names each new file after its DOT source file, with
+    the format appended – e.g., “graph-0.gv.png” for “graph-0.gv”. Graphviz
+    reads all of the DOT source files, even if some of them have errors.
+
+    This function returns a list with one item for each DOT source file, in
+    order: either a dictionary from each output format to the path of its new
+    file, or (if any of its files is missing) a GraphvizOutputError with the
+    Graphviz messages about that DOT source file. The graph_attrs (see
+    exec_graphviz_async) are given to every graph; graph attributes in a DOT
+    source file (e.g., its own dpi) override them.
+
+    The time_budget and cancel_event apply to the whole run and are passed to
+    run_graphviz_async; see its docstring for more information.
     """
-    unused_suffixed_filename = get_unused_suffixed_filename(
+    returncode, stderr_text = await run_graphviz_async(
+        [
+            dot_command,
+            '-K',
+            layout_engine,
+            *[
+                arg
+                for output_format
+                in output_formats
+                for arg
+                in ('-T', output_format)
+            ],
+            '-O',
+            *create_graph_attr_args(None, graph_attrs),
+            *dot_source_file_paths,
+        ],
+        time_budget=time_budget,
+        cancel_event=cancel_event,
+    )
+
+    results = []
+
+    for dot_source_file_path in dot_source_file_paths:
+        output_file_path_dict = {
+            output_format: f'{dot_source_file_path}.{output_format}'
+            for output_format
+            in output_formats
+        }
+
+        # A negative returncode means that Graphviz was killed by a signal
+        # (e.g., after a crash), so even its existing files may be truncated.
+        graph_is_rendered = returncode >= 0 and all(
+            os.path.isfile(output_file_path)
+            for output_file_path
+            in output_file_path_dict.values()
+        )
+
+        if graph_is_rendered:
+            results.append(output_file_path_dict)
+        else:
+            # Graphviz’s messages about a DOT source file’s syntax name the
+            # file, followed by a colon (e.g., 'Error: …/graph-1.gv: syntax
+            # error in line 3'). The colon keeps a path such as …/graph-1.gv
+            # from matching the messages about …/graph-10.gv. If there are no
+            # such messages, then every message is included.
+            graph_error_text = '\n'.join(
+                line
+                for line
+                in stderr_text.splitlines()
+                if f'{dot_source_file_path}:' in line
+            )
+            results.append(GraphvizOutputError(
+                graph_error_text
+                or stderr_text
+                or f'Graphviz exited with code {returncode}.'
+            ))
+
+    return results
+
+
+def choose_thumbnail_dpi(layout_bounding_box, max_dpi):
+    """
+    This function returns the DPI (which may be less than 1) at which a PNG
+    thumbnail of a layout with the given layout_bounding_box (a string of
+    points like '0,0,1234.5,678', from Graphviz’s json output format), with
+    the usual padding, is at most thumbnail_side pixels wide and tall. The DPI
+    is never higher than max_dpi (e.g., the DPI of the full PNG image).
+    """
+    left, bottom, right, top = (
+        float(coordinate)
+        for coordinate
+        in layout_bounding_box.split(',')
+    )
+    padded_side = (
+        max(right - left, top - bottom) / points_per_inch
+        + 2 * graph_padding
+    )
+
+    return min(max_dpi, thumbnail_side / padded_side)
+
+
+def create_tile_grid(layout_bounding_box, dpi):
+    """
+    This function returns a list of dictionaries, one for each PNG tile of a
+    layout with the given layout_bounding_box (a string of points like
+    '0,0,1234.5,678', from Graphviz’s json output format) at the given dpi.
+    Tiles are ordered by row from the top, then by column from the left. Each
+    dictionary has these keys –
+
+    filename: The tile’s filename, like 'tile-0-1.png'.
+
+    row, column: The tile’s row and column in the grid.
+
+    x, y, width, height: The tile’s position and size in the whole image, in
+    pixels from its top-left corner.
+
+    viewport: The Graphviz viewport graph attribute that renders only the tile.
+    """
+    left, bottom, right, top = (
+        float(coordinate)
+        for coordinate
+        in layout_bounding_box.split(',')
+    )
+    tile_side_in_points = tile_side * points_per_inch / dpi
+    num_of_columns = max(math.ceil((right - left) / tile_side_in_points), 1)
+    num_of_rows = max(math.ceil((top - bottom) / tile_side_in_points), 1)
+
+    tiles = []
+
+    for row in range(num_of_rows):
+        for column in range(num_of_columns):
+            tile_left = left + column * tile_side_in_points
+            tile_top = top - row * tile_side_in_points
+            tile_width = min(tile_side_in_points, right - tile_left)
+            tile_height = min(tile_side_in_points, tile_top - bottom)
+
+            tiles.append({
+                'filename': f'tile-{row}-{column}.png',
+                'row': row,
+                'column': column,
+                'x': column * tile_side,
+                'y': row * tile_side,
+                'width': round(tile_width * dpi / points_per_inch),
+                'height': round(tile_height * dpi / points_per_inch),
+                # A viewport is its width and height in points, a zoom
+                # factor, and its center in the layout’s coordinates (whose
+                # y axis points up).
+                'viewport': (
+                    f'{tile_width:.2f},{tile_height:.2f},1,'
+                    f'{tile_left + tile_width / 2:.2f},'
+                    f'{tile_top - tile_height / 2:.2f}'
+                ),
+            })
+
+    return tiles
+
+
+async def save_png_tiles_async(
+    dot_command,
+    layout_file_path,
+    layout_bounding_box,
+    tiles_directory_path,
+    dpi=300,
+    get_time_budget=lambda: None,
+    cancel_event=None,
+    uses_graphviz_library=False,
+):
+    """
+    This asynchronous function renders the layout in the given
+    layout_file_path (from Graphviz’s dot output format) into a grid of PNG
+    tiles in the given tiles_directory_path (see create_tile_grid), with one
+    Graphviz run per tile. It then writes a manifest file named
+    tile_manifest_filename, and it returns None.
+
+    The manifest is a JSON object with the whole image’s width, height, and
+    dpi; the tile_side; the numbers of rows and columns; and a list of tiles,
+    each with its filename, row, column, x, y, width, and height (see
+    create_tile_grid). Because tiles never have padding, tile positions are
+    simply pixels from the layout’s top-left corner.
+
+    The get_time_budget function is called before each run for its remaining
+    time budget.
+    """
+    os.makedirs(tiles_directory_path, exist_ok=True)
+
+    tiles = create_tile_grid(layout_bounding_box, dpi)
+
+    for tile in tiles:
+        await exec_graphviz_async(
+            dot_command,
+            layout_file_path,
+            {'png': os.path.join(tiles_directory_path, tile['filename'])},
+            dpi=dpi,
+            graph_attrs={'pad': '0', 'viewport': tile['viewport']},
+            layout_is_reused=True,
+            time_budget=get_time_budget(),
+            cancel_event=cancel_event,
+            uses_graphviz_library=uses_graphviz_library,
+        )
+
+    manifest = {
+        'width': max(tile['x'] + tile['width'] for tile in tiles),
+        'height': max(tile['y'] + tile['height'] for tile in tiles),
+        'dpi': dpi,
+        'tile_side': tile_side,
+        'rows': tiles[-1]['row'] + 1,
+        'columns': tiles[-1]['column'] + 1,
+        'tiles': [
+            {
+                key: value
+                for key, value
+                in tile.items()
+                if key != 'viewport'
+            }
+            for tile
+            in tiles
+        ],
+    }
+
+    manifest_file_path = os.path.join(
+        tiles_directory_path,
+        tile_manifest_filename,
+    )
+    with open(manifest_file_path, mode='w+', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2)
+
+
+def get_partial_file_path(output_file_path):
+    """
+    This function returns a new, unique path of a partial file next to the
+    given output_file_path, like “.Rig.png.0123456789abcdef.partial”, into
+    which Graphviz may render the output file before it is published. Partial
+    files are hidden, and they do not end with their formats’ file extensions,
+    so that viewers and file watchers ignore them.
+    """
+    directory_path, output_name = os.path.split(output_file_path)
+
+    return os.path.join(
         directory_path,
-        filename,
-        file_extension,
+        f'.{output_name}.{secrets.token_hex(8)}{partial_file_extension}',
     )
-    source_file_path = (
-        os.path.join(directory_path, filename) + file_extension
+
+
+def remove_partial_file(partial_file_path):
+    """
+    This function removes the partial file (or directory) at the given
+    partial_file_path. It does nothing if there is no such file.
+    """
+    if os.path.isdir(partial_file_path):
+        shutil.rmtree(partial_file_path, ignore_errors=True)
+    else:
+        try:
+            os.remove(partial_file_path)
+        except FileNotFoundError:
+            pass
+
+
+def publish_partial_file(partial_file_path, output_file_path):
+    """
+    This function atomically replaces the file at the given output_file_path
+    (if any) with the complete partial file at the given partial_file_path.
+    Any program that opens the output_file_path sees either the old file or
+    the new file, never a truncated one.
+
+    A directory (e.g., of PNG tiles) cannot atomically replace another
+    non-empty directory, so any old output directory is first moved aside,
+    then removed after the new directory is in place.
+    """
+    if os.path.isdir(partial_file_path) and os.path.lexists(output_file_path):
+        discarded_file_path = get_partial_file_path(output_file_path)
+        os.replace(output_file_path, discarded_file_path)
+        os.replace(partial_file_path, output_file_path)
+        remove_partial_file(discarded_file_path)
+    else:
+        os.replace(partial_file_path, output_file_path)
+
+
+def publish_output_files(
+    output_directory_path,
+    output_filename,
+    output_file_path_dict,
+    partial_file_path_dict,
+    backed_up_output_formats=None,
+    backup_retention=unlimited_backup_retention,
+    timing_record=None,
+):
+    """
+    This function publishes complete partial files, one by one: for each
+    output format, the existing output file at its path in the given
+    output_file_path_dict (if any) is backed up, and then the partial file at
+    its path in the given partial_file_path_dict atomically replaces it. (See
+    save_files for more information.) Each backup is timed in the given
+    timing_record (see the rendertimings module). It returns None.
+    """
+    if backed_up_output_formats is None:
+        backed_up_output_formats = output_file_path_dict.keys()
+
+    # Each existing output file is backed up with a hard link, where possible,
+    # so that it stays in place until its new file replaces it.
+    for output_format, output_file_path in output_file_path_dict.items():
+        if output_format in backed_up_output_formats:
+            with record_timing_span(timing_record, 'back_up_file'):
+                back_up_file(
+                    output_directory_path,
+                    output_filename,
+                    output_format_file_extension_dict[output_format],
+                    retention=backup_retention,
+                    file_is_kept=True,
+                )
+
+        publish_partial_file(
+            partial_file_path_dict[output_format],
+            output_file_path,
+        )
+
+
+async def render_output_files_async(
+    dot_command,
+    dot_source_file_path,
+    output_file_path_dict,
+    layout_engine='dot',
+    dpi=300,
+    graph_attrs={},
+    tile_dpi=300,
+    layout_is_reused=False,
+    extra_output_file_path_dict={},
+    time_budget=None,
+    cancel_event=None,
+    uses_graphviz_library=False,
+):
+    """
+    This asynchronous function renders the DOT-source file at the given
+    dot_source_file_path into the given output_file_path_dict’s paths, with
+    one or more Graphviz runs. It returns None. See save_files for more
+    information on its arguments.
+    """
+    plain_output_file_path_dict = {
+        output_format: output_file_path
+        for output_format, output_file_path
+        in output_file_path_dict.items()
+        if output_format not in separately_rendered_output_formats
+    }
+
+    if len(plain_output_file_path_dict) == len(output_file_path_dict):
+        # In this case, every format is rendered by a single Graphviz run.
+        await exec_graphviz_async(
+            dot_command,
+            dot_source_file_path,
+            {**output_file_path_dict, **extra_output_file_path_dict},
+            layout_engine=layout_engine,
+            dpi=dpi,
+            graph_attrs=graph_attrs,
+            layout_is_reused=layout_is_reused,
+            time_budget=time_budget,
+            cancel_event=cancel_event,
+            uses_graphviz_library=uses_graphviz_library,
+        )
+
+        return
+
+    # Otherwise, the graph is laid out once, and every format is rendered from
+    # that layout by separate runs, which share the time budget.
+    start_time = time.monotonic()
+
+    def get_time_budget():
+        if time_budget is None:
+            return None
+        return max(time_budget - (time.monotonic() - start_time), 0)
+
+    # The layout has no DPI, padding, or other graph_attrs, which are meant
+    # only for some renders; Graphviz may not let the command line override
+    # attributes that are already in a DOT file.
+    layout_file_path = dot_source_file_path + '.layout.gv'
+    layout_json_file_path = (
+        dot_source_file_path + output_format_file_extension_dict['json']
     )
-    destination_file_path = (
-        os.path.join(directory_path, unused_suffixed_filename)
+    await exec_graphviz_async(
+        dot_command,
+        dot_source_file_path,
+        {
+            'dot': layout_file_path,
+            'json': layout_json_file_path,
+            **extra_output_file_path_dict,
+        },
+        layout_engine=layout_engine,
+        dpi=None,
+        graph_attrs={'pad': None},
+        layout_is_reused=layout_is_reused,
+        time_budget=get_time_budget(),
+        cancel_event=cancel_event,
+        uses_graphviz_library=uses_graphviz_library,
     )
 
-    try:
-        shutil.copyfile(source_file_path, destination_file_path)
+    if plain_output_file_path_dict:
+        await exec_graphviz_async(
+            dot_command,
+            layout_file_path,
+            plain_output_file_path_dict,
+            dpi=dpi,
+            graph_attrs=graph_attrs,
+            layout_is_reused=True,
+            time_budget=get_time_budget(),
+            cancel_event=cancel_event,
+            uses_graphviz_library=uses_graphviz_library,
+        )
 
-    except OSError as err:
-        if err.errno == errno.ENOENT:
-            # In this case, there is no file yet to back up.
-            return
-        else:
-            # In this case, a strange and unexpected error from the OS occurred
-            # while copying the file, such as lack of writing permissions in
-            # directory_path.
-            raise err
+    if (
+        'png_tiles' in output_file_path_dict
+        or 'png_thumbnail' in output_file_path_dict
+    ):
+        with open(layout_json_file_path, encoding='utf-8') as file:
+            layout_bounding_box = json.load(file)['bb']
+
+    if 'png_thumbnail' in output_file_path_dict:
+        await exec_graphviz_async(
+            dot_command,
+            layout_file_path,
+            {'png': output_file_path_dict['png_thumbnail']},
+            dpi=choose_thumbnail_dpi(layout_bounding_box, dpi),
+            layout_is_reused=True,
+            time_budget=get_time_budget(),
+            cancel_event=cancel_event,
+            uses_graphviz_library=uses_graphviz_library,
+        )
+
+    if 'png_tiles' in output_file_path_dict:
+        await save_png_tiles_async(
+            dot_command,
+            layout_file_path,
+            layout_bounding_box,
+            output_file_path_dict['png_tiles'],
+            dpi=tile_dpi,
+            get_time_budget=get_time_budget,
+            cancel_event=cancel_event,
+            uses_graphviz_library=uses_graphviz_library,
+        )
+
+    if 'ps_pages' in output_file_path_dict:
+        page_width, page_height = page_size
+        await exec_graphviz_async(
+            dot_command,
+            layout_file_path,
+            {'ps2': output_file_path_dict['ps_pages']},
+            dpi=None,
+            graph_attrs={'page': f'{page_width:g},{page_height:g}'},
+            layout_is_reused=True,
+            time_budget=get_time_budget(),
+            cancel_event=cancel_event,
+            uses_graphviz_library=uses_graphviz_library,
+        )
 
 
 async def save_files_async(
@@ -156,32 +913,107 @@ async def save_files_async(
     dot_source_file_path,
     output_directory_path,
     output_filename,
+    output_formats=default_output_formats,
+    layout_engine='dot',
+    dpi=300,
+    graph_attrs={},
+    tile_dpi=300,
+    layout_is_reused=False,
+    extra_output_file_path_dict={},
+    time_budget=None,
+    cancel_event=None,
+    uses_graphviz_library=False,
+    backed_up_output_formats=None,
+    backup_retention=unlimited_backup_retention,
+    timing_record=None,
 ):
     """
     This asynchronous function sequentially and asynchronously performs all of
-    the add-on’s file-saving tasks with the given dot_text and file paths.
+    the add-on’s file-saving tasks with the given dot_text and file paths. It
+    returns a dictionary from each of the output_formats to the path of its
+    new file.
     """
     save_temp_dot_source_file(dot_text, dot_source_file_path)
 
-    back_up_file(output_directory_path, output_filename, output_file_extension)
+    output_file_path_dict = {
+        output_format: get_output_file_path(
+            output_directory_path,
+            output_filename,
+            output_format,
+        )
+        for output_format
+        in output_formats
+    }
 
-    output_file_path = (
-        os.path.join(output_directory_path, output_filename)
-        + output_file_extension
-    )
+    # Graphviz renders every output file into a partial file next to it.
+    partial_file_path_dict = {
+        output_format: get_partial_file_path(output_file_path)
+        for output_format, output_file_path
+        in output_file_path_dict.items()
+    }
 
-    await exec_graphviz_async(
-        dot_command,
-        dot_source_file_path,
-        output_file_path,
+    try:
+        with record_timing_span(timing_record, 'graphviz') as span_sizes:
+            await render_output_files_async(
+                dot_command,
+                dot_source_file_path,
+                partial_file_path_dict,
+                layout_engine=layout_engine,
+                dpi=dpi,
+                graph_attrs=graph_attrs,
+                tile_dpi=tile_dpi,
+                layout_is_reused=layout_is_reused,
+                extra_output_file_path_dict=extra_output_file_path_dict,
+                time_budget=time_budget,
+                cancel_event=cancel_event,
+                uses_graphviz_library=uses_graphviz_library,
+            )
+            if 'png' in partial_file_path_dict:
+                span_sizes['png_bytes'] = os.path.getsize(
+                    partial_file_path_dict['png'],
+                )
+
+    except BaseException as err:
+        # In this case, Graphviz failed, timed out, or was cancelled, so its
+        # partial files (which may be truncated) are discarded, and the
+        # existing output files are left alone.
+        for partial_file_path in partial_file_path_dict.values():
+            remove_partial_file(partial_file_path)
+        raise err
+
+    # Only once every file is complete are they published.
+    publish_output_files(
+        output_directory_path,
+        output_filename,
+        output_file_path_dict,
+        partial_file_path_dict,
+        backed_up_output_formats=backed_up_output_formats,
+        backup_retention=backup_retention,
+        timing_record=timing_record,
     )
 
+    return output_file_path_dict
+
+
 def save_files(
     dot_text,
     dot_command,
     dot_source_file_path,
     output_directory_path,
     output_filename,
+    output_formats=default_output_formats,
+    layout_engine='dot',
+    dpi=300,
+    graph_attrs={},
+    tile_dpi=300,
+    layout_is_reused=False,
+    extra_output_file_path_dict={},
+    time_budget=None,
+    cancel_event=None,
+    uses_graphviz_library=False,
+    backed_up_output_formats=None,
+    backup_retention=unlimited_backup_retention,
+    timing_record=None,
 ):
     """
     This function synchronously renders and creates a image file using
@@ -193,14 +1025,51 @@ def save_files(
 
     The dot_command must be a string like 'dot' (for Linux and macOS) or
     'C:\\Program Files\\Graphviz\\bin\\dot.exe' (for Windows), which the shell
-    will run to render that text DOT-source file into an image at the given
-    output_directory_path and output_filename (with a “.png”).
+    will run to render that text DOT-source file into one file for each of
+    the given output_formats (see output_format_file_extension_dict) at the
+    given output_directory_path and output_filename (with each format’s file
+    extension). All of the files come from a single Graphviz layout, which
+    uses the given layout_engine. Raster images have the given dpi, and the
+    given graph_attrs (see exec_graphviz_async) are applied to every format
+    except the separately_rendered_output_formats.
+
+    The separately_rendered_output_formats are rendered from the same layout
+    by separate Graphviz runs (with the layout stored next to the
+    dot_source_file_path). PNG tiles have the given tile_dpi, and a PNG
+    thumbnail has the DPI at which it fits within thumbnail_side pixels (but
+    no more than the given dpi).
+
+    If layout_is_reused is true, then the dot_text must already contain a
+    layout (see exec_graphviz_async). The extra_output_file_path_dict is a
+    dictionary from any other Graphviz output formats to paths, which are
+    rendered by the same Graphviz run that lays out the graph but are not
+    returned (e.g., the layout that the storedlayouts module stores).
 
-    If a PNG image file already exists at the given location, then it will be
-    copied to a backup file using the back_up_file function.
+    Every file is first rendered into a hidden partial file next to its
+    location (see get_partial_file_path). Only after every Graphviz run has
+    succeeded are the files published, one by one: if a file already exists
+    at a location, then it is backed up using the backupfiles module’s
+    back_up_file function (which then evicts the oldest backups that exceed
+    the given backup_retention policy), and then the new file atomically
+    replaces it. If any run fails, then every partial file is removed, and no
+    existing file is changed. Existing files are backed up only for the
+    backed_up_output_formats, which are all of the output_formats if None
+    (e.g., a preview’s PNG image is not worth backing up when the full
+    render replaces it).
+
+    The time_budget, cancel_event, and uses_graphviz_library are passed to
+    exec_graphviz_async; see its docstring for more information. (When there
+    are several Graphviz runs, they share the time budget.)
+
+    If the timing_record is not None, then the Graphviz runs and the backups
+    are timed in it (see the rendertimings module).
+
+    This function returns a dictionary from each of the output_formats to the
+    path of its new file.
 
     Any error returned by Graphviz or the OS will respectively raise a
-    RuntimeError or an OSError.
+    GraphvizOutputError or an OSError. Exceeding the time budget raises a
+    GraphvizTimeoutError, and cancellation raises a GraphvizCancelledError.
     """
     return asyncio.run(
         save_files_async(
@@ -209,5 +1078,249 @@ def save_files(
             dot_source_file_path,
             output_directory_path,
             output_filename,
+            output_formats=output_formats,
+            layout_engine=layout_engine,
+            dpi=dpi,
+            graph_attrs=graph_attrs,
+            tile_dpi=tile_dpi,
+            layout_is_reused=layout_is_reused,
+            extra_output_file_path_dict=extra_output_file_path_dict,
+            time_budget=time_budget,
+            cancel_event=cancel_event,
+            uses_graphviz_library=uses_graphviz_library,
+            backed_up_output_formats=backed_up_output_formats,
+            backup_retention=backup_retention,
+            timing_record=timing_record,
+        ),
+    )
+
+
+async def read_graph_layout_async(
+    dot_text,
+    dot_command,
+    dot_source_file_path,
+    layout_engine='dot',
+    time_budget=None,
+    cancel_event=None,
+    uses_graphviz_library=False,
+):
+    """
+    This asynchronous function lays out the given dot_text with Graphviz
+    without rendering any image, and it returns the layout as a string in
+    Graphviz’s json output format. The layout is temporarily saved next to the
+    dot_source_file_path.
+    """
+    save_temp_dot_source_file(dot_text, dot_source_file_path)
+
+    layout_file_path = (
+        dot_source_file_path + output_format_file_extension_dict['json']
+    )
+
+    await exec_graphviz_async(
+        dot_command,
+        dot_source_file_path,
+        {'json': layout_file_path},
+        layout_engine=layout_engine,
+        time_budget=time_budget,
+        cancel_event=cancel_event,
+        uses_graphviz_library=uses_graphviz_library,
+    )
+
+    with open(layout_file_path, encoding='utf-8') as file:
+        return file.read()
+
+
+def read_graph_layout(
+    dot_text,
+    dot_command,
+    dot_source_file_path,
+    layout_engine='dot',
+    time_budget=None,
+    cancel_event=None,
+    uses_graphviz_library=False,
+):
+    """
+    This function synchronously lays out the given dot_text with Graphviz
+    without rendering any image, and it returns the layout as a string in
+    Graphviz’s json output format (which includes the graph’s bounding box).
+    Like a render, this takes as long as the layout itself.
+
+    The arguments and errors are the same as those of save_files; see its
+    docstring for more information.
+    """
+    return asyncio.run(
+        read_graph_layout_async(
+            dot_text,
+            dot_command,
+            dot_source_file_path,
+            layout_engine=layout_engine,
+            time_budget=time_budget,
+            cancel_event=cancel_event,
+            uses_graphviz_library=uses_graphviz_library,
+        ),
+    )
+
+
+async def save_batch_files_async(
+    batch_items,
+    dot_command,
+    temp_directory_path,
+    output_formats=default_output_formats,
+    layout_engine='dot',
+    extra_output_formats=(),
+    time_budget=None,
+    cancel_event=None,
+):
+    """
+    This asynchronous function performs the file-saving tasks of a batch of
+    graphs with a single Graphviz run. See save_batch_files.
+    """
+    dot_source_file_paths = [
+        os.path.join(temp_directory_path, f'graph-{index}.gv')
+        for index
+        in range(len(batch_items))
+    ]
+
+    for batch_item, dot_source_file_path in zip(
+        batch_items,
+        dot_source_file_paths,
+    ):
+        save_temp_dot_source_file(batch_item['dot_text'], dot_source_file_path)
+
+    batch_results = await exec_graphviz_batch_async(
+        dot_command,
+        dot_source_file_paths,
+        [*output_formats, *extra_output_formats],
+        layout_engine=layout_engine,
+        time_budget=time_budget,
+        cancel_event=cancel_event,
+    )
+
+    results = []
+
+    for batch_item, batch_result in zip(batch_items, batch_results):
+        if isinstance(batch_result, GraphvizOutputError):
+            results.append(batch_result)
+            continue
+
+        output_directory_path = batch_item['output_directory_path']
+        output_filename = batch_item['output_filename']
+
+        output_file_path_dict = {
+            output_format: get_output_file_path(
+                output_directory_path,
+                output_filename,
+                output_format,
+            )
+            for output_format
+            in output_formats
+        }
+        partial_file_path_dict = {}
+
+        try:
+            # Each new file is first moved next to its location as a partial
+            # file (which copies it if the temporary directory is on another
+            # filesystem), so that it can be published atomically.
+            for output_format, output_file_path in (
+                output_file_path_dict.items()
+            ):
+                partial_file_path_dict[output_format] = (
+                    get_partial_file_path(output_file_path)
+                )
+                shutil.move(
+                    batch_result[output_format],
+                    partial_file_path_dict[output_format],
+                )
+
+            publish_output_files(
+                output_directory_path,
+                output_filename,
+                output_file_path_dict,
+                partial_file_path_dict,
+                backed_up_output_formats=batch_item.get(
+                    'backed_up_output_formats',
+                ),
+                backup_retention=batch_item.get(
+                    'backup_retention',
+                    unlimited_backup_retention,
+                ),
+                timing_record=batch_item.get('timing_record'),
+            )
+
+        except OSError as err:
+            for partial_file_path in partial_file_path_dict.values():
+                remove_partial_file(partial_file_path)
+            results.append(err)
+            continue
+
+        results.append({
+            **output_file_path_dict,
+            **{
+                output_format: batch_result[output_format]
+                for output_format
+                in extra_output_formats
+            },
+        })
+
+    return results
+
+
+def save_batch_files(
+    batch_items,
+    dot_command,
+    temp_directory_path,
+    output_formats=default_output_formats,
+    layout_engine='dot',
+    extra_output_formats=(),
+    time_budget=None,
+    cancel_event=None,
+):
+    """
+    This function synchronously renders a batch of graphs with a single
+    Graphviz run (see exec_graphviz_batch_async), which is much faster than
+    one run for each graph when the graphs are small. Each of the batch_items
+    is a dictionary with these items:
+
+    dot_text: The graph’s DOT text, which is saved in the given
+    temp_directory_path. Graph attributes that differ between graphs (e.g.,
+    the dpi) must be in their DOT text.
+
+    output_directory_path, output_filename: Where the graph’s files are
+    published, as in save_files.
+
+    backed_up_output_formats, backup_retention (optional): How the graph’s
+    existing files are backed up, as in save_files.
+
+    timing_record (optional): The timing record in which the graph’s backups
+    are timed, as in save_files.
+
+    Every graph is rendered in each of the given output_formats (which must not
+    include any of the separately_rendered_output_formats) with the given
+    layout_engine. Each graph is also rendered in any of the given
+    extra_output_formats, whose files stay in the temp_directory_path (e.g.,
+    the layout that the storedlayouts module stores).
+
+    This function returns a list with one item for each of the batch_items, in
+    order: either a dictionary from each output format (including the
+    extra_output_formats) to the path of its new file, or the error (a
+    GraphvizOutputError or an OSError) that stopped that graph alone from being
+    rendered or published. A graph’s files are published, as in save_files,
+    only if all of them were rendered; other graphs’ errors do not affect them.
+
+    Errors that affect the whole batch are raised instead: a
+    GraphvizNotFoundError, a GraphvizTimeoutError (if the whole run exceeds
+    the time_budget), or a GraphvizCancelledError (if the cancel_event is
+    set). In these cases, no file is published.
+    """
+    return asyncio.run(
+        save_batch_files_async(
+            batch_items,
+            dot_command,
+            temp_directory_path,
+            output_formats=output_formats,
+            layout_engine=layout_engine,
+            extra_output_formats=extra_output_formats,
+            time_budget=time_budget,
+            cancel_event=cancel_event,
         ),
     )
@@ -0,0 +1,460 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This module stores graphs’ Graphviz layouts, so that a graph whose structure
+has not changed can be restyled without being laid out again.
+
+Laying out a large rig graph may take minutes, but most re-renders change only
+its styles: its title (which includes the time of rendering), its font, or the
+colors in the add-on’s category attrs. So every layout is stored next to the
+output image in Graphviz’s json0 output format (which has node positions, edge
+splines, and cluster bounding boxes, but no drawing instructions). A restyle
+puts those positions into the new DOT text as entity extra attrs (see the
+renderdot module), and Graphviz only draws them (with neato -n2), which costs a
+fraction of a full layout.
+
+Each layout is keyed by the graph’s structural hash, which covers everything
+that affects the layout – the graph’s entities, labels, and categories, the
+category attrs that affect geometry, the layout preset, and the rank direction
+– but not the title, font, or colors. A stored layout is thus ignored
+automatically whenever the graph’s structure changes.
+
+When a graph’s structure has changed, its most recent layout with the same
+layout preset may still seed an incremental layout: nodes are matched to that
+layout’s nodes by their stable keys (their clusters’ labels and their own
+labels, which come from Blender’s object and bone names, unlike entity IDs,
+which are renumbered by every analysis). Each matching node whose neighbors
+have not changed is pinned at its previous position, and only the remaining
+nodes are placed freely by neato (or fdp). This is faster than a full layout,
+and it keeps the picture of an edited rig stable across renders.
+
+A layout file is a JSON object with a “layouts” object, from structural hashes
+to layout entries, in order from least to most recently stored. Each layout
+entry is an object with these items:
+
+layout: The layout, in Graphviz’s json0 output format.
+
+layout_preset_name: The name of the layout preset that created the layout.
+
+rankdir: The rank direction of the layout.
+
+node_keys: An object from each node’s name in the layout to its stable key.
+
+Only the max_num_of_stored_layouts most recent layouts are kept (e.g., for a
+preview’s layout and a full render’s layout).
+"""
+
+import hashlib
+import json
+import statistics
+
+# This is the file extension of layout files, which is appended to the output
+# filename.
+layout_file_extension = '.layout.json'
+
+max_num_of_stored_layouts = 4
+
+# These graph attrs make neato and fdp read pos attrs in points (which is the
+# unit of Graphviz’s output) and keep pinned nodes at those positions, rather
+# than translating the whole layout to the origin.
+incremental_layout_graph_attrs = {
+    'inputscale': '72',
+    'notranslate': 'true',
+}
+
+# These DOT attributes change only how entities look, not where Graphviz
+# places them, so they are left out of structural hashes.
+style_attr_names = frozenset((
+    'color',
+    'fillcolor',
+    'fontcolor',
+    'bgcolor',
+    'pencolor',
+    'style',
+))
+
+
+def create_structural_hash(
+    graph_data,
+    category_attrs_dict,
+    layout_preset_name,
+    rankdir='',
+):
+    """
+    This function returns a hexadecimal string that hashes everything about
+    the given graph_data (see the analyzerigs module) that affects its layout,
+    along with the category attrs that are not style_attr_names, the name of
+    the layout preset, and the rankdir.
+    """
+    structure = {
+        'free_nodes': sorted(graph_data['free_nodes'], key=repr),
+        'cluster_nodes': sorted(
+            (
+                [cluster_id, sorted(node_ids, key=repr)]
+                for cluster_id, node_ids
+                in graph_data['cluster_nodes_dict'].items()
+            ),
+            key=repr,
+        ),
+        'edges': sorted(
+            (
+                [edge_id, *edge_tuple]
+                for edge_id, edge_tuple
+                in graph_data['edge_tuple_dict'].items()
+            ),
+            key=repr,
+        ),
+        'labels': sorted(
+            graph_data['entity_label_dict'].items(),
+            key=repr,
+        ),
+        'categories': sorted(
+            graph_data['entity_categories_dict'].items(),
+            key=repr,
+        ),
+        'category_attrs': {
+            category_name: {
+                attr_key: attr_val
+                for attr_key, attr_val
+                in category_attrs.items()
+                if attr_key not in style_attr_names
+            }
+            for category_name, category_attrs
+            in category_attrs_dict.items()
+        },
+        'layout_preset_name': layout_preset_name,
+        'rankdir': rankdir,
+    }
+
+    structure_json = json.dumps(structure, sort_keys=True, default=repr)
+
+    return hashlib.sha256(structure_json.encode()).hexdigest()
+
+
+def read_layout_file(layout_file_path):
+    """
+    This function returns the “layouts” object (a dictionary from structural
+    hashes to layout entries) from the layout file at the given
+    layout_file_path. If there is no such file, or if it cannot be read as a
+    layout file, then it returns an empty dictionary.
+    """
+    try:
+        with open(layout_file_path, encoding='utf-8') as file:
+            return json.load(file)['layouts']
+
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def read_stored_layout(layout_file_path, structural_hash):
+    """
+    This function returns the layout (a dictionary from Graphviz’s json0 output
+    format) that is stored for the given structural_hash in the layout file at
+    the given layout_file_path, or None if there is no such layout.
+    """
+    layout_entry = read_layout_file(layout_file_path).get(structural_hash)
+
+    return layout_entry['layout'] if layout_entry is not None else None
+
+
+def read_previous_layout_entry(
+    layout_file_path,
+    layout_preset_name,
+    rankdir='',
+):
+    """
+    This function returns the most recently stored layout entry (see this
+    module’s docstring) in the layout file at the given layout_file_path that
+    was created with the given layout_preset_name and rankdir, or None if
+    there is no such layout entry.
+    """
+    for layout_entry in reversed(read_layout_file(layout_file_path).values()):
+        entry_matches = (
+            layout_entry.get('layout_preset_name') == layout_preset_name
+            and layout_entry.get('rankdir') == rankdir
+            and 'node_keys' in layout_entry
+        )
+        if entry_matches:
+            return layout_entry
+
+    return None
+
+
+def store_layout(
+    layout_file_path,
+    structural_hash,
+    layout_json_text,
+    graph_data,
+    layout_preset_name,
+    rankdir='',
+):
+    """
+    This function stores the given layout_json_text (in Graphviz’s json0
+    output format) of the given graph_data, laid out with the given
+    layout_preset_name and rankdir, for the given structural_hash in the
+    layout file at the given layout_file_path. It evicts the least recently
+    stored layouts beyond max_num_of_stored_layouts. It returns None.
+    """
+    layouts = read_layout_file(layout_file_path)
+
+    # The layout is moved to the end, as the most recently stored one.
+    layouts.pop(structural_hash, None)
+    layouts[structural_hash] = {
+        'layout': json.loads(layout_json_text),
+        'layout_preset_name': layout_preset_name,
+        'rankdir': rankdir,
+        'node_keys': {
+            str(node_id): node_key
+            for node_id, node_key
+            in create_node_key_dict(graph_data).items()
+        },
+    }
+
+    kept_structural_hashes = list(layouts)[-max_num_of_stored_layouts:]
+
+    with open(layout_file_path, mode='w+', encoding='utf-8') as file:
+        json.dump(
+            {
+                'layouts': {
+                    kept_structural_hash: layouts[kept_structural_hash]
+                    for kept_structural_hash
+                    in kept_structural_hashes
+                },
+            },
+            file,
+        )
+
+
+def create_edge_id_attrs_dict(graph_data):
+    """
+    This function returns an entity_extra_attrs_dict (see the renderdot module)
+    that names each edge with its edge ID. Graphviz does not otherwise identify
+    edges in its json0 output format, so the graph must be laid out with these
+    extra attrs for its layout to be stored.
+    """
+    return {
+        edge_id: {'id': edge_id}
+        for edge_id
+        in graph_data['edge_tuple_dict']
+    }
+
+
+def create_layout_attrs_dict(layout, graph_data):
+    """
+    This function returns an entity_extra_attrs_dict (see the renderdot module)
+    with the positions of the entities of the given graph_data in the given
+    stored layout: each node’s position and size, each edge’s spline and label
+    position, and each cluster’s bounding box and label position. (The graph’s
+    own bounding box is left out, so that Graphviz fits it to the new title.)
+    """
+    # Graphviz names entities with strings, but entity IDs may be integers.
+    entity_id_dict = {
+        str(entity_id): entity_id
+        for entity_id
+        in (
+            *graph_data['free_nodes'],
+            *graph_data['cluster_nodes_dict'],
+            *(
+                node_id
+                for node_ids
+                in graph_data['cluster_nodes_dict'].values()
+                for node_id
+                in node_ids
+            ),
+            *graph_data['edge_tuple_dict'],
+        )
+    }
+
+    layout_attrs_dict = {}
+    cluster_name_prefix = 'cluster_'
+
+    for layout_object in layout.get('objects', []):
+        name = layout_object.get('name', '')
+
+        if name.startswith(cluster_name_prefix):
+            entity_id = entity_id_dict.get(name[len(cluster_name_prefix):])
+            attr_keys = ('bb', 'lp')
+        elif 'nodes' in layout_object or 'subgraphs' in layout_object:
+            # In this case, the object is an anonymous subgraph.
+            continue
+        else:
+            entity_id = entity_id_dict.get(name)
+            attr_keys = ('pos', 'width', 'height')
+
+        if entity_id is not None:
+            layout_attrs_dict[entity_id] = {
+                attr_key: layout_object[attr_key]
+                for attr_key
+                in attr_keys
+                if attr_key in layout_object
+            }
+
+    for layout_edge in layout.get('edges', []):
+        entity_id = entity_id_dict.get(layout_edge.get('id'))
+
+        if entity_id is not None:
+            layout_attrs_dict[entity_id] = {
+                attr_key: layout_edge[attr_key]
+                for attr_key
+                in ('pos', 'lp')
+                if attr_key in layout_edge
+            }
+
+    return layout_attrs_dict
+
+
+def create_node_key_dict(graph_data):
+    """
+    This function returns a dictionary from the entity ID of each node of the
+    given graph_data (see the analyzerigs module) to its stable key: a string
+    that joins the label of the node’s cluster (if any) and the node’s own
+    label. Unlike entity IDs, stable keys stay the same when a rig is analyzed
+    again after it is edited. Nodes whose stable keys are not unique in the
+    graph are left out, so that they are never mistaken for one another.
+    """
+    entity_label_dict = graph_data['entity_label_dict']
+
+    node_key_dict = {
+        node_id: json.dumps(
+            [None, entity_label_dict.get(node_id)],
+            ensure_ascii=False,
+        )
+        for node_id
+        in graph_data['free_nodes']
+    }
+    for cluster_id, node_ids in graph_data['cluster_nodes_dict'].items():
+        for node_id in node_ids:
+            node_key_dict[node_id] = json.dumps(
+                [
+                    entity_label_dict.get(cluster_id),
+                    entity_label_dict.get(node_id),
+                ],
+                ensure_ascii=False,
+            )
+
+    node_key_counts = {}
+    for node_key in node_key_dict.values():
+        node_key_counts[node_key] = node_key_counts.get(node_key, 0) + 1
+
+    return {
+        node_id: node_key
+        for node_id, node_key
+        in node_key_dict.items()
+        if node_key_counts[node_key] == 1
+    }
+
+
+def create_key_neighbors_dict(key_edge_tuples):
+    """
+    This function returns a dictionary from each stable key in the given
+    key_edge_tuples (pairs of the stable keys of edges’ origin and destination
+    nodes) to a frozenset of the stable keys of its neighbors.
+    """
+    key_neighbors_dict = {}
+
+    for origin_key, destination_key in key_edge_tuples:
+        key_neighbors_dict.setdefault(origin_key, set()).add(destination_key)
+        key_neighbors_dict.setdefault(destination_key, set()).add(origin_key)
+
+    return {
+        node_key: frozenset(neighbor_keys)
+        for node_key, neighbor_keys
+        in key_neighbors_dict.items()
+    }
+
+
+def create_incremental_layout_attrs_dict(previous_layout_entry, graph_data):
+    """
+    This function returns a tuple (entity_extra_attrs_dict,
+    num_of_pinned_nodes) for laying out the given graph_data incrementally
+    from the given previous_layout_entry (see this module’s docstring). The
+    entity_extra_attrs_dict (see the renderdot module) gives the nodes pos
+    attrs, which must be read with the incremental_layout_graph_attrs:
+
+    * Each node whose stable key and neighbors’ stable keys have not changed is
+      pinned at its previous position.
+
+    * Each other node that was in the previous layout (i.e., whose edges have
+      changed) starts at its previous position but is placed freely.
+
+    * Each new node starts at the mean previous position of its neighbors, if
+      any of them was in the previous layout, so that it is placed near them.
+    """
+    previous_layout = previous_layout_entry['layout']
+    previous_node_key_dict = previous_layout_entry['node_keys']
+
+    # Edges in json0 refer to nodes by their _gvid numbers.
+    previous_gvid_key_dict = {}
+    previous_key_pos_dict = {}
+    for layout_object in previous_layout.get('objects', []):
+        node_key = previous_node_key_dict.get(layout_object.get('name'))
+        if node_key is not None and 'pos' in layout_object:
+            previous_gvid_key_dict[layout_object['_gvid']] = node_key
+            previous_key_pos_dict[node_key] = tuple(
+                float(coordinate)
+                for coordinate
+                in layout_object['pos'].split(',')
+            )
+
+    previous_key_neighbors_dict = create_key_neighbors_dict(
+        (
+            previous_gvid_key_dict.get(layout_edge['tail']),
+            previous_gvid_key_dict.get(layout_edge['head']),
+        )
+        for layout_edge
+        in previous_layout.get('edges', [])
+    )
+
+    node_key_dict = create_node_key_dict(graph_data)
+    key_neighbors_dict = create_key_neighbors_dict(
+        (
+            node_key_dict.get(origin_node_id),
+            node_key_dict.get(destination_node_id),
+        )
+        for origin_node_id, destination_node_id
+        in graph_data['edge_tuple_dict'].values()
+    )
+
+    layout_attrs_dict = {}
+    num_of_pinned_nodes = 0
+
+    for node_id, node_key in node_key_dict.items():
+        neighbor_keys = key_neighbors_dict.get(node_key, frozenset())
+        previous_pos = previous_key_pos_dict.get(node_key)
+
+        if previous_pos is not None:
+            node_is_pinned = (
+                neighbor_keys
+                == previous_key_neighbors_dict.get(node_key, frozenset())
+            )
+            start_pos = previous_pos
+        else:
+            node_is_pinned = False
+            neighbor_previous_poses = [
+                previous_key_pos_dict[neighbor_key]
+                for neighbor_key
+                in neighbor_keys
+                if neighbor_key in previous_key_pos_dict
+            ]
+            start_pos = (
+                tuple(
+                    statistics.fmean(coordinates)
+                    for coordinates
+                    in zip(*neighbor_previous_poses)
+                )
+                if neighbor_previous_poses
+                else None
+            )
+
+        if start_pos is not None:
+            # A trailing “!” pins a node at its pos.
+            layout_attrs_dict[node_id] = {
+                'pos': (
+                    f'{start_pos[0]:g},{start_pos[1]:g}'
+                    + ('!' if node_is_pinned else '')
+                ),
+            }
+            num_of_pinned_nodes += node_is_pinned
+
+    return (layout_attrs_dict, num_of_pinned_nodes)
@@ -0,0 +1,223 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+These tests check the counting proxies of the add-on’s rnaaccesses module
+against fake rigs (see the tools directory’s fakerigs module), outside of
+Blender. The counts for a fake rig are repeatable, so these tests assert them
+exactly.
+
+Run them from the repository’s root directory, e.g.:
+
+.. code-block: sh
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        'tools',
+    ),
+)
+
+from addonmodules import import_addon_module # noqa: E402
+from fakerigs import create_fake_rig # noqa: E402
+
+analyzerigs = import_addon_module('analyzerigs')
+rnaaccesses = import_addon_module('rnaaccesses')
+
+
+def count_fake_rig_rna_accesses(num_of_bones, seed=0):
+    """
+    This function analyzes a fake rig with the given num_of_bones and random
+    seed, with every bone included, and it returns the RNA-access counter of
+    the analysis.
+    """
+    rna_access_counter = rnaaccesses.create_rna_access_counter()
+
+    analyzerigs.analyze_rig_graph(
+        [
+            rnaaccesses.wrap_rna_value(
+                rna_access_counter,
+                create_fake_rig(num_of_bones, seed),
+                'objects[]',
+            ),
+        ],
+        is_bone_excluded=lambda bone, armature_object: False,
+    )
+
+    return rna_access_counter
+
+
+class TestRnaAccessCountingProxy(unittest.TestCase):
+    def test_struct_is_always_wrapped_by_same_proxy(self):
+        rna_access_counter = rnaaccesses.create_rna_access_counter()
+        fake_rig = create_fake_rig(10)
+
+        proxy = rnaaccesses.wrap_rna_value(
+            rna_access_counter,
+            fake_rig,
+            'objects[]',
+        )
+
+        # A struct that is reached again in another way keeps its first
+        # proxy, so identity checks behave as they would without proxies.
+        self.assertIs(
+            rnaaccesses.wrap_rna_value(rna_access_counter, fake_rig, 'target'),
+            proxy,
+        )
+        self.assertIs(
+            rnaaccesses.wrap_rna_value(rna_access_counter, proxy, 'target'),
+            proxy,
+        )
+        self.assertIs(proxy.data, proxy.data)
+        self.assertIs(rnaaccesses.unwrap_rna_value(proxy), fake_rig)
+
+    def test_proxy_is_equal_to_and_hashed_like_its_struct(self):
+        rna_access_counter = rnaaccesses.create_rna_access_counter()
+        fake_rig = create_fake_rig(10)
+
+        proxy = rnaaccesses.wrap_rna_value(
+            rna_access_counter,
+            fake_rig,
+            'objects[]',
+        )
+
+        self.assertEqual(proxy, fake_rig)
+        self.assertFalse(proxy != fake_rig)
+        self.assertEqual(hash(proxy), hash(fake_rig))
+        self.assertIn(proxy, {fake_rig})
+        self.assertIn(fake_rig, {proxy})
+
+    def test_plain_values_are_not_wrapped(self):
+        rna_access_counter = rnaaccesses.create_rna_access_counter()
+
+        for value in ('bone', 1, 1.5, True, None):
+            self.assertIs(
+                rnaaccesses.wrap_rna_value(rna_access_counter, value),
+                value,
+            )
+
+        self.assertEqual(rna_access_counter['proxies'], {})
+
+    def test_accesses_are_counted_under_accessing_function(self):
+        rna_access_counter = rnaaccesses.create_rna_access_counter()
+        proxy = rnaaccesses.wrap_rna_value(
+            rna_access_counter,
+            create_fake_rig(10),
+            'objects[]',
+        )
+
+        # A comprehension would have its own frame before Python 3.12, so
+        # this is a plain loop.
+        bone_names = []
+        for bone in proxy.data.bones:
+            bone_names.append(bone.name)
+        proxy.pose.bones[bone_names[0]]
+        bone_is_found = bone_names[0] in proxy.data.bones
+
+        self.assertTrue(bone_is_found)
+        function_name = (
+            f'{__name__.rpartition(".")[2]}.'
+            'test_accesses_are_counted_under_accessing_function'
+        )
+        self.assertEqual(rna_access_counter['counts'], {
+            (function_name, 'attribute', 'objects[].data'): 2,
+            (function_name, 'attribute', 'data.bones'): 2,
+            (function_name, 'lookup', 'data.bones iteration'): 10,
+            (function_name, 'attribute', 'bones[].name'): 10,
+            (function_name, 'attribute', 'objects[].pose'): 1,
+            (function_name, 'attribute', 'pose.bones'): 1,
+            (function_name, 'lookup', 'pose.bones[]'): 1,
+            (function_name, 'lookup', 'data.bones in'): 1,
+        })
+
+
+class TestRigAnalysisRnaAccessCounts(unittest.TestCase):
+    def test_each_bone_is_iterated_over_once(self):
+        for num_of_bones in (10, 50, 200):
+            with self.subTest(num_of_bones=num_of_bones):
+                rna_access_counter = count_fake_rig_rna_accesses(num_of_bones)
+
+                self.assertEqual(
+                    rna_access_counter['counts'][(
+                        'analyzerigs.declare_armature_entities',
+                        'lookup',
+                        'data.bones iteration',
+                    )],
+                    num_of_bones,
+                )
+
+    def test_classify_bone_counts(self):
+        # These counts are for a fake rig of 50 bones with the random seed 0.
+        # If a change reduces them, then they should be updated here; if a
+        # change increases them, then it has added redundant accesses.
+        rna_access_counter = count_fake_rig_rna_accesses(50)
+        counts = rna_access_counter['counts']
+
+        self.assertEqual(
+            {
+                access_name: num_of_accesses
+                for (function_name, access_kind, access_name), num_of_accesses
+                in counts.items()
+                if function_name == 'analyzebones.classify_bone'
+                and access_kind == 'lookup'
+            },
+            {
+                'pose.bones[]': 90,
+                'data.bones[]': 45,
+                'data.bones in': 45,
+            },
+        )
+        self.assertEqual(
+            rnaaccesses.sum_rna_access_counts_by_function(
+                rna_access_counter,
+            )['analyzebones.classify_bone'],
+            {'attribute': 275, 'lookup': 180},
+        )
+
+    def test_counts_are_repeatable(self):
+        self.assertEqual(
+            count_fake_rig_rna_accesses(100, seed=1)['counts'],
+            count_fake_rig_rna_accesses(100, seed=1)['counts'],
+        )
+
+
+class TestRnaAccessCountSummaries(unittest.TestCase):
+    def test_functions_are_summed_and_ordered_by_accesses(self):
+        rna_access_counter = rnaaccesses.create_rna_access_counter()
+        rna_access_counter['counts'].update({
+            ('analyzerigs.a', 'attribute', 'bones[].name'): 3,
+            ('analyzerigs.a', 'lookup', 'pose.bones[]'): 1,
+            ('analyzebones.b', 'attribute', 'bones[].parent'): 2,
+            ('analyzebones.b', 'lookup', 'data.bones[]'): 5,
+            ('analyzebones.c', 'attribute', 'bones[].name'): 1,
+        })
+
+        self.assertEqual(
+            list(rnaaccesses.sum_rna_access_counts_by_function(
+                rna_access_counter,
+            ).items()),
+            [
+                ('analyzebones.b', {'attribute': 2, 'lookup': 5}),
+                ('analyzerigs.a', {'attribute': 3, 'lookup': 1}),
+                ('analyzebones.c', {'attribute': 1, 'lookup': 0}),
+            ],
+        )
+        self.assertEqual(
+            rnaaccesses.summarize_rna_access_counts(
+                rna_access_counter,
+                max_num_of_functions=2,
+            ),
+            '6 attribute reads and 6 collection lookups in total; '
+            'analyzebones.b 2 + 5; analyzerigs.a 3 + 1',
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+These tests check how the add-on’s savefiles module settles in-process
+renders (see its exec_graphviz_library_async function), outside of Blender
+and without Graphviz’s libraries: the library’s render function is replaced
+by one that raises each of the library’s errors.
+
+Run them from the repository’s root directory, e.g.:
+
+.. code-block: sh
+    python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        'tools',
+    ),
+)
+
+from addonmodules import import_addon_module # noqa: E402
+
+graphvizlibrary = import_addon_module('graphvizlibrary')
+savefiles = import_addon_module('savefiles')
+
+
+class TestExecGraphvizLibraryAsync(unittest.TestCase):
+    def setUp(self):
+        temp_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_directory.cleanup)
+
+        self.dot_source_file_path = os.path.join(
+            temp_directory.name,
+            'graph.gv',
+        )
+        with open(self.dot_source_file_path, 'w', encoding='utf-8') as file:
+            file.write('digraph { a -> b }')
+
+        self.output_file_path_dict = {
+            'svg': os.path.join(temp_directory.name, 'graph.svg'),
+        }
+
+    def exec_graphviz_library(self, render_error):
+        """
+        This method runs exec_graphviz_library_async with a library whose
+        render raises the given render_error, and it returns its result.
+        """
+        with mock.patch.object(
+            savefiles,
+            'render_with_graphviz_library',
+            side_effect=render_error,
+        ):
+            return asyncio.run(savefiles.exec_graphviz_library_async(
+                graphviz_library=None,
+                dot_source_file_path=self.dot_source_file_path,
+                output_file_path_dict=self.output_file_path_dict,
+                time_budget=10,
+            ))
+
+    def test_library_error_falls_back_to_dot_command(self):
+        self.assertIs(
+            self.exec_graphviz_library(
+                graphvizlibrary.GraphvizLibraryError('No layout plugin.'),
+            ),
+            False,
+        )
+
+    def test_library_input_error_is_output_error(self):
+        with self.assertRaises(savefiles.GraphvizOutputError) as context:
+            self.exec_graphviz_library(
+                graphvizlibrary.GraphvizLibraryInputError('Syntax error.'),
+            )
+
+        self.assertEqual(str(context.exception), 'Syntax error.')
+
+    def test_busy_library_falls_back_to_dot_command(self):
+        self.assertIs(self.exec_graphviz_library(lambda *_, **__: None), False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This module lets the development tools in this directory use the add-on’s
+modules outside of Blender.
+
+Importing the add-on package normally would run its __init__ module, which
+requires Blender’s bpy module. Instead, this module registers a bare package
+whose path is the add-on’s directory, so that the add-on’s other modules (which
+do not import bpy) can be imported by themselves.
+"""
+
+import ast
+import importlib
+import os
+import sys
+import types
+
+addon_package_name = 'blender_graphviz_rig'
+
+addon_directory_path = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    addon_package_name,
+)
+
+
+def import_addon_module(module_name):
+    """
+    This function imports and returns the add-on module with the given
+    module_name (e.g., 'renderdot'), without running the add-on’s __init__
+    module.
+    """
+    if addon_package_name not in sys.modules:
+        package = types.ModuleType(addon_package_name)
+        package.__path__ = [addon_directory_path]
+        sys.modules[addon_package_name] = package
+
+    return importlib.import_module(f'{addon_package_name}.{module_name}')
+
+
+def read_addon_constant(constant_name):
+    """
+    This function reads the literal value (such as a dictionary of strings)
+    that the add-on’s __init__ module assigns to the given constant_name. The
+    __init__ module is parsed but not run.
+    """
+    init_file_path = os.path.join(addon_directory_path, '__init__.py')
+
+    with open(init_file_path, encoding='utf-8') as file:
+        module_node = ast.parse(file.read())
+
+    for node in module_node.body:
+        is_matching_assignment = (
+            isinstance(node, ast.Assign)
+            and any(
+                isinstance(target, ast.Name) and target.id == constant_name
+                for target
+                in node.targets
+            )
+        )
+        if is_matching_assignment:
+            return ast.literal_eval(node.value)
+
+    raise KeyError(constant_name)
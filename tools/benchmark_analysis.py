@@ -0,0 +1,297 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This script benchmarks the add-on’s rig analysis and DOT generation outside
+of Blender, on fake rigs (see the fakerigs module) of several sizes. For each
+size, it times these stages:
+
+classify_bone: Classifying every bone of the rig by its symmetry (see the
+analyzebones module).
+
+analyze_rig_graph: Analyzing the whole rig into graph data (see the
+analyzerigs module).
+
+create_dot_digraph: Creating the graph data’s DOT text with a layout preset’s
+graph attributes (see the renderdot module).
+
+dot: Laying out the DOT text with Graphviz, if a DOT command is given. (Only
+rigs up to --max-dot-bones bones are laid out, since Graphviz can take many
+minutes on the largest ones.)
+
+The fake rigs’ proportions (symmetric chains, constraints, cross-armature
+targets, and mesh vertex groups) can be changed with options.
+
+The results can be saved as a baseline, and later results can be compared
+with it: with --baseline, the script fails if any stage takes more than
+--threshold times as long as its baseline duration. Baselines are only
+comparable on the same machine with the same options.
+
+Run it from the repository’s root directory, e.g.:
+
+.. code-block: sh
+    python tools/benchmark_analysis.py --save-baseline benchmark.json
+    python tools/benchmark_analysis.py --baseline benchmark.json
+    python tools/benchmark_analysis.py --bones 1000 --dot-command dot
+"""
+
+from addonmodules import import_addon_module, read_addon_constant
+from compare_dot_output import time_best_of
+from fakerigs import create_fake_rigs
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+analyzebones = import_addon_module('analyzebones')
+analyzerigs = import_addon_module('analyzerigs')
+layoutpresets = import_addon_module('layoutpresets')
+renderdot = import_addon_module('renderdot')
+
+stage_names = (
+    'classify_bone',
+    'analyze_rig_graph',
+    'create_dot_digraph',
+    'dot',
+)
+
+# Stages that take less time than this many seconds, both in the baseline
+# and now, are never counted as regressions, since their durations are
+# mostly noise.
+min_regression_duration = 0.005
+
+
+def classify_all_bones(armature_objects):
+    """
+    This function classifies every bone of the given armature_objects with
+    the analyzebones module’s classify_bone function. It returns None.
+    """
+    for armature_object in armature_objects:
+        for bone in armature_object.data.bones:
+            analyzebones.classify_bone(bone, armature_object)
+
+
+def time_dot_layout(dot_command, dot_text, layout_engine, timeout):
+    """
+    This function saves the dot_text into a temporary file, then returns the
+    duration (in seconds) of Graphviz laying it out with the given
+    layout_engine and the dot output format.
+    """
+    with tempfile.TemporaryDirectory() as directory_path:
+        dot_source_file_path = os.path.join(directory_path, 'graph.gv')
+        with open(dot_source_file_path, mode='w', encoding='utf-8') as file:
+            file.write(dot_text)
+
+        _, duration = time_best_of(1, lambda: subprocess.run(
+            [
+                dot_command,
+                f'-K{layout_engine}',
+                '-Tdot',
+                '-o',
+                os.devnull,
+                dot_source_file_path,
+            ],
+            check=True,
+            timeout=timeout,
+        ))
+
+    return duration
+
+
+def benchmark_rig(num_of_bones, args, category_attrs_dict):
+    """
+    This function creates a fake rig with num_of_bones bones and the
+    proportions in the given command-line args, and it returns a dictionary
+    from each stage name (see stage_names) to its best duration in seconds
+    (or None for a skipped stage).
+    """
+    armature_objects = create_fake_rigs(
+        num_of_bones,
+        num_of_armatures=args.armatures,
+        chain_length=args.chain_length,
+        symmetric_fraction=args.symmetric_fraction,
+        constraint_density=args.constraint_density,
+        cross_armature_fraction=args.cross_armature_fraction,
+        num_of_vertex_groups=args.vertex_groups,
+        seed=args.seed,
+    )
+    layout_preset = layoutpresets.layout_preset_dict[args.layout_preset]
+
+    _, classify_duration = time_best_of(
+        args.repeat,
+        lambda: classify_all_bones(armature_objects),
+    )
+    graph_data, analyze_duration = time_best_of(
+        args.repeat,
+        lambda: analyzerigs.analyze_rig_graph(
+            armature_objects,
+            is_bone_excluded=lambda bone, armature_object: False,
+        ),
+    )
+    dot_text, create_duration = time_best_of(
+        args.repeat,
+        lambda: renderdot.create_dot_digraph(
+            **graph_data,
+            category_attrs_dict=category_attrs_dict,
+            title='Benchmark',
+            graph_attrs=layout_preset['graph_attrs'],
+            edge_labels_are_dropped=layout_preset['edge_labels_are_dropped'],
+        ),
+    )
+
+    dot_duration = (
+        time_dot_layout(
+            args.dot_command,
+            dot_text,
+            layout_preset['engine'],
+            args.dot_timeout,
+        )
+        if args.dot_command and num_of_bones <= args.max_dot_bones
+        else None
+    )
+
+    return {
+        'classify_bone': classify_duration,
+        'analyze_rig_graph': analyze_duration,
+        'create_dot_digraph': create_duration,
+        'dot': dot_duration,
+    }
+
+
+def find_regressions(results, baseline_results, threshold):
+    """
+    This function returns a list of strings that describe each stage
+    duration in the given results (a dictionary from numbers of bones, as
+    strings, to dictionaries of stage durations) that is more than threshold
+    times as long as the same stage’s duration in the given
+    baseline_results.
+    """
+    regressions = []
+
+    for bones_key, stage_duration_dict in results.items():
+        for stage_name, duration in stage_duration_dict.items():
+            baseline_duration = (
+                baseline_results
+                .get(bones_key, {})
+                .get(stage_name)
+            )
+            is_regression = (
+                duration is not None
+                and baseline_duration is not None
+                and duration > baseline_duration * threshold
+                and duration >= min_regression_duration
+            )
+            if is_regression:
+                regressions.append(
+                    f'{stage_name} with {int(bones_key):,} bones: '
+                    f'{duration * 1000:.1f} ms '
+                    f'(baseline: {baseline_duration * 1000:.1f} ms, '
+                    f'{duration / baseline_duration:.2f}×)'
+                )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--bones',
+        type=int,
+        nargs='+',
+        default=[1000, 10000, 50000],
+    )
+    parser.add_argument('--armatures', type=int, default=1)
+    parser.add_argument('--chain-length', type=int, default=10)
+    parser.add_argument('--symmetric-fraction', type=float, default=0.9)
+    parser.add_argument('--constraint-density', type=float, default=0.3)
+    parser.add_argument('--cross-armature-fraction', type=float, default=0.1)
+    parser.add_argument('--vertex-groups', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--layout-preset', default='fast')
+    parser.add_argument(
+        '--dot-command',
+        help='Graphviz DOT command; if omitted, the dot stage is skipped.',
+    )
+    parser.add_argument('--max-dot-bones', type=int, default=10000)
+    parser.add_argument('--dot-timeout', type=float, default=600)
+    parser.add_argument('--save-baseline', metavar='JSON_PATH')
+    parser.add_argument('--baseline', metavar='JSON_PATH')
+    parser.add_argument('--threshold', type=float, default=1.25)
+    args = parser.parse_args()
+
+    category_attrs_dict = read_addon_constant('dot_category_attrs_dict')
+    options = {
+        option_name: getattr(args, option_name)
+        for option_name
+        in (
+            'armatures',
+            'chain_length',
+            'symmetric_fraction',
+            'constraint_density',
+            'cross_armature_fraction',
+            'vertex_groups',
+            'seed',
+            'layout_preset',
+        )
+    }
+
+    print(f'best of {args.repeat}, {args.layout_preset} layout preset')
+    print(
+        f'{"bones":>8} '
+        + ' '.join(f'{stage_name + " ms":>21}' for stage_name in stage_names)
+    )
+
+    # The results’ keys are strings, like those of the JSON baseline.
+    results = {}
+    for num_of_bones in args.bones:
+        stage_duration_dict = benchmark_rig(
+            num_of_bones,
+            args,
+            category_attrs_dict,
+        )
+        results[str(num_of_bones)] = stage_duration_dict
+        print(
+            f'{num_of_bones:>8,} '
+            + ' '.join(
+                f'{stage_duration_dict[stage_name] * 1000:>21.1f}'
+                if stage_duration_dict[stage_name] is not None
+                else f'{"–":>21}'
+                for stage_name
+                in stage_names
+            )
+        )
+
+    if args.save_baseline:
+        with open(args.save_baseline, mode='w', encoding='utf-8') as file:
+            json.dump({'options': options, 'results': results}, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+
+        if baseline['options'] != options:
+            sys.exit(
+                'The baseline was measured with other options: '
+                f'{baseline["options"]}'
+            )
+
+        regressions = find_regressions(
+            results,
+            baseline['results'],
+            args.threshold,
+        )
+        if regressions:
+            sys.exit(
+                f'These stages regressed by more than {args.threshold}×:\n'
+                + '\n'.join(regressions)
+            )
+
+        print(f'\nNo stage regressed by more than {args.threshold}×.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This script compares the two forms of DOT text that the renderdot module’s
+create_dot_digraph function can produce for the same synthetic rig graph:
+
+inlined: Every node and edge statement repeats all of its category attrs.
+
+defaults: Entities are grouped into anonymous subgraphs whose node or edge
+defaults declare each group’s category attrs once (the add-on’s default).
+
+For each form, it reports the DOT text’s size, the time create_dot_digraph took
+to generate it, and – if a Graphviz DOT command is available – the time
+Graphviz took to parse it (with the canon output format, which skips layout).
+
+Run it from the repository’s root directory, e.g.:
+
+.. code-block: sh
+    python tools/compare_dot_output.py --bones 5000 --dot-command dot
+"""
+
+from addonmodules import import_addon_module, read_addon_constant
+
+import argparse
+import os
+import random
+import subprocess
+import tempfile
+import time
+
+renderdot = import_addon_module('renderdot')
+
+bone_name_stems = ('DEF-spine', 'ORG-arm', 'MCH-hand', 'thumb', 'f_index')
+
+
+def create_synthetic_graph_data(num_of_bones, num_of_armatures, seed=0):
+    """
+    This function returns graph data resembling what the analyzerigs module’s
+    analyze_rig_graph function returns for armatures with the given total
+    num_of_bones: bone nodes in one cluster per armature, parent edges along
+    bone chains, and constraint edges between random bones.
+    """
+    rng = random.Random(seed)
+    graph_data = {
+        'free_nodes': set(),
+        'cluster_nodes_dict': {},
+        'edge_tuple_dict': {},
+        'entity_label_dict': {},
+        'entity_categories_dict': {},
+    }
+    fresh_ids = iter(range(10 ** 9))
+    bone_node_ids = []
+
+    for armature_index in range(num_of_armatures):
+        cluster_id = next(fresh_ids)
+        graph_data['cluster_nodes_dict'][cluster_id] = set()
+        graph_data['entity_label_dict'][cluster_id] = (
+            f'Armature {armature_index}'
+        )
+
+    cluster_ids = list(graph_data['cluster_nodes_dict'])
+
+    for bone_index in range(num_of_bones):
+        node_id = next(fresh_ids)
+        cluster_id = cluster_ids[bone_index % num_of_armatures]
+        graph_data['cluster_nodes_dict'][cluster_id].add(node_id)
+        stem = rng.choice(bone_name_stems)
+        graph_data['entity_label_dict'][node_id] = f'{stem}.{bone_index:03}.↔'
+        graph_data['entity_categories_dict'][node_id] = (
+            'bone',
+            'deforming' if stem.startswith('DEF') else '',
+            rng.choice(('asymmetric', 'left_symmetric', 'antisymmetric')),
+            *(('root',) if bone_index < num_of_armatures else ()),
+        )
+        bone_node_ids.append(node_id)
+
+        # Every bone except the first bones in each armature has a parent.
+        if bone_index >= num_of_armatures:
+            parent_node_id = bone_node_ids[bone_index - num_of_armatures]
+            edge_id = next(fresh_ids)
+            graph_data['edge_tuple_dict'][edge_id] = (node_id, parent_node_id)
+            graph_data['entity_categories_dict'][edge_id] = (
+                ('parent', 'connected')
+                if rng.random() < 0.5
+                else ('parent',)
+            )
+
+    # About half of the bones have a constraint.
+    for node_id in bone_node_ids[::2]:
+        edge_id = next(fresh_ids)
+        graph_data['edge_tuple_dict'][edge_id] = (
+            node_id, rng.choice(bone_node_ids),
+        )
+        graph_data['entity_label_dict'][edge_id] = 'Copy Transforms'
+        graph_data['entity_categories_dict'][edge_id] = ('constraint',)
+
+    return graph_data
+
+
+def time_best_of(repeat, function):
+    """
+    This function calls the given function repeat times and returns a tuple
+    (result, best_duration_in_seconds).
+    """
+    best_duration = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        duration = time.perf_counter() - start
+        if best_duration is None or duration < best_duration:
+            best_duration = duration
+    return result, best_duration
+
+
+def time_dot_parse(dot_command, dot_text, repeat):
+    """
+    This function saves the dot_text into a temporary file, then returns the
+    best duration (in seconds) of Graphviz parsing and re-emitting it with the
+    canon output format, which does not lay out the graph.
+    """
+    with tempfile.TemporaryDirectory() as directory_path:
+        dot_source_file_path = os.path.join(directory_path, 'graph.gv')
+        with open(dot_source_file_path, mode='w+') as file:
+            file.write(dot_text)
+
+        _, duration = time_best_of(repeat, lambda: subprocess.run(
+            [dot_command, '-Tcanon', '-o', os.devnull, dot_source_file_path],
+            check=True,
+        ))
+
+    return duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--bones', type=int, default=2000)
+    parser.add_argument('--armatures', type=int, default=2)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--dot-command',
+        help='Graphviz DOT command; if omitted, parse times are skipped.',
+    )
+    args = parser.parse_args()
+
+    graph_data = create_synthetic_graph_data(args.bones, args.armatures)
+    category_attrs_dict = read_addon_constant('dot_category_attrs_dict')
+
+    print(
+        f'{args.bones} bones, {len(graph_data["edge_tuple_dict"])} edges, '
+        f'best of {args.repeat}'
+    )
+    print(
+        f'{"form":<10} {"DOT bytes":>12} {"generate ms":>12} '
+        f'{"parse ms":>10}'
+    )
+
+    for form_name, category_attrs_are_inlined in (
+        ('inlined', True),
+        ('defaults', False),
+    ):
+        dot_text, generate_duration = time_best_of(
+            args.repeat,
+            lambda: renderdot.create_dot_digraph(
+                **graph_data,
+                category_attrs_dict=category_attrs_dict,
+                title='Comparison',
+                category_attrs_are_inlined=category_attrs_are_inlined,
+            ),
+        )
+        parse_duration_string = (
+            '{:.1f}'.format(
+                time_dot_parse(args.dot_command, dot_text, args.repeat) * 1000
+            )
+            if args.dot_command
+            else '–'
+        )
+        print(
+            f'{form_name:<10} {len(dot_text.encode()):>12,} '
+            f'{generate_duration * 1000:>12.1f} {parse_duration_string:>10}'
+        )
+
+
+if __name__ == '__main__':
+    main()
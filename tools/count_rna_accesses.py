@@ -0,0 +1,148 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This script counts how many times each function of the add-on’s rig analysis
+(see the analyzerigs and analyzebones modules) reads attributes and looks up
+collection items while it analyzes a fake rig (see the fakerigs module),
+using the counting proxies of the rnaaccesses module. It prints each
+function’s counts, along with the most frequent accesses.
+
+The counts for a fake rig are repeatable, so they can be saved and later
+checked: with --check, the script fails if any function’s counts exceed its
+saved counts, which catches changes that add redundant lookups of Blender’s
+data.
+
+Run it from the repository’s root directory, e.g.:
+
+.. code-block: sh
+    python tools/count_rna_accesses.py --bones 1000 --save rna-counts.json
+    python tools/count_rna_accesses.py --bones 1000 --check rna-counts.json
+"""
+
+from addonmodules import import_addon_module
+from fakerigs import create_fake_rig
+
+import argparse
+import json
+import sys
+
+analyzerigs = import_addon_module('analyzerigs')
+rnaaccesses = import_addon_module('rnaaccesses')
+
+
+def count_fake_rig_rna_accesses(num_of_bones, seed=0):
+    """
+    This function analyzes a fake rig with the given num_of_bones and random
+    seed, with every bone included, and it returns the RNA-access counter
+    (see the rnaaccesses module) of the analysis.
+    """
+    rna_access_counter = rnaaccesses.create_rna_access_counter()
+    fake_rig = create_fake_rig(num_of_bones, seed)
+
+    analyzerigs.analyze_rig_graph(
+        [
+            rnaaccesses.wrap_rna_value(
+                rna_access_counter,
+                fake_rig,
+                'objects[]',
+            ),
+        ],
+        is_bone_excluded=lambda bone, armature_object: False,
+    )
+
+    return rna_access_counter
+
+
+def find_exceeding_counts(function_count_dict, saved_function_count_dict):
+    """
+    This function returns a list of strings that describe each function
+    count in the given function_count_dict (see the rnaaccesses module’s
+    sum_rna_access_counts_by_function) that exceeds the same count in the
+    given saved_function_count_dict.
+    """
+    return [
+        f'{function_name} {access_kind}: {num_of_accesses:,} '
+        f'(saved: {saved_num_of_accesses:,})'
+        for function_name, function_counts
+        in function_count_dict.items()
+        for access_kind, num_of_accesses
+        in function_counts.items()
+        for saved_num_of_accesses
+        in [
+            saved_function_count_dict
+            .get(function_name, {})
+            .get(access_kind, 0)
+        ]
+        if num_of_accesses > saved_num_of_accesses
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--bones', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--save', metavar='JSON_PATH')
+    parser.add_argument('--check', metavar='JSON_PATH')
+    args = parser.parse_args()
+
+    rna_access_counter = count_fake_rig_rna_accesses(args.bones, args.seed)
+    function_count_dict = rnaaccesses.sum_rna_access_counts_by_function(
+        rna_access_counter,
+    )
+
+    print(f'{"function":<48} {"attribute":>10} {"lookup":>10}')
+    for function_name, function_counts in function_count_dict.items():
+        print(
+            f'{function_name:<48} {function_counts["attribute"]:>10,} '
+            f'{function_counts["lookup"]:>10,}'
+        )
+
+    print()
+    print(f'{"function":<48} {"access":<36} {"count":>8}')
+    top_count_items = sorted(
+        rna_access_counter['counts'].items(),
+        key=lambda item: -item[1],
+    )[:args.top]
+    for (function_name, _, access_name), num_of_accesses in top_count_items:
+        print(f'{function_name:<48} {access_name:<36} {num_of_accesses:>8,}')
+
+    saved_counts = {
+        'bones': args.bones,
+        'seed': args.seed,
+        'functions': function_count_dict,
+    }
+
+    if args.save:
+        with open(args.save, mode='w', encoding='utf-8') as file:
+            json.dump(saved_counts, file, indent=2)
+
+    if args.check:
+        with open(args.check, encoding='utf-8') as file:
+            saved_counts = json.load(file)
+
+        if (saved_counts['bones'], saved_counts['seed']) != (
+            args.bones,
+            args.seed,
+        ):
+            sys.exit(
+                f'The saved counts are for {saved_counts["bones"]} bones '
+                f'with seed {saved_counts["seed"]}.'
+            )
+
+        exceeding_counts = find_exceeding_counts(
+            function_count_dict,
+            saved_counts['functions'],
+        )
+        if exceeding_counts:
+            sys.exit(
+                'These RNA-access counts exceed the saved counts:\n'
+                + '\n'.join(exceeding_counts)
+            )
+
+        print('\nNo RNA-access count exceeds the saved counts.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,426 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This module creates fake rigs: plain Python objects that act like the parts
+of Blender’s data that the add-on’s analyzerigs and analyzebones modules read
+(scene objects, armatures, Bones, PoseBones, constraints, vertex groups, and
+their collections). They let the development tools in this directory analyze
+rigs of any size outside of Blender, with repeatable results.
+
+A fake rig is one or more armature scene objects whose bones form chains
+(like spines, limbs, and fingers). Most chains are left- and right-sided
+pairs, whose bones have mirrored names (e.g., “arm.0003.02.L” and
+“arm.0003.02.R”), parents, and constraints, so that they are classified as
+symmetric; some pairs differ in one constraint, so that they are
+antisymmetric, and the rest of the chains are unsided. Bones are constrained
+to bones of earlier chains in their own armature, to bones in other
+armatures, to the vertex groups of a mesh scene object, and to an empty scene
+object.
+"""
+
+import random
+
+chain_name_stems = ('spine', 'arm', 'leg', 'finger', 'tail', 'ear', 'MCH-arm')
+
+
+class FakeCollection:
+    """
+    This class acts like a Blender collection property (e.g.,
+    armature.bones): its items can be looked up by name or by index, tested
+    for membership by name, counted, and iterated over in order.
+    """
+
+    def __init__(self, items=()):
+        self.item_list = list(items)
+        self.item_dict = {item.name: item for item in self.item_list}
+
+    def add(self, item):
+        self.item_list.append(item)
+        self.item_dict[item.name] = item
+        return item
+
+    def get(self, key, default=None):
+        return self.item_dict.get(key, default)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.item_dict[key]
+        else:
+            return self.item_list[key]
+
+    def __contains__(self, key):
+        return key in self.item_dict
+
+    def __iter__(self):
+        return iter(self.item_list)
+
+    def __len__(self):
+        return len(self.item_list)
+
+
+class FakeConstraint:
+    """
+    This class acts like a Blender constraint with a target (e.g., Copy
+    Rotation).
+    """
+
+    def __init__(self, name, type, target, subtarget=''):
+        self.name = name
+        self.type = type
+        self.target = target
+        self.subtarget = subtarget
+
+
+class FakeTargetlessConstraint:
+    """
+    This class acts like a Blender constraint without a target (e.g., Limit
+    Rotation), which has no target or subtarget attributes.
+    """
+
+    def __init__(self, name, type):
+        self.name = name
+        self.type = type
+
+
+class FakeBone:
+    """
+    This class acts like a Blender Bone (or EditBone).
+    """
+
+    def __init__(self, name, parent=None, use_deform=True):
+        self.name = name
+        self.parent = parent
+        self.use_deform = use_deform
+        self.use_connect = parent is not None
+        self.hide = False
+        self.layers = [True] + [False] * 31
+
+
+class FakePoseBone:
+    """
+    This class acts like a Blender PoseBone.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.constraints = FakeCollection()
+
+
+class FakeArmature:
+    """
+    This class acts like a Blender armature data-block.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.bones = FakeCollection()
+        self.edit_bones = self.bones
+        self.layers = [True] + [False] * 31
+
+
+class FakePose:
+    """
+    This class acts like a Blender Pose.
+    """
+
+    def __init__(self):
+        self.bones = FakeCollection()
+
+
+class FakeVertexGroup:
+    """
+    This class acts like a Blender vertex group.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeObject:
+    """
+    This class acts like a Blender scene object of the given type (e.g.,
+    'ARMATURE' or 'EMPTY').
+    """
+
+    def __init__(self, name, type, data=None, pose=None):
+        self.name = name
+        self.type = type
+        self.data = data
+        self.pose = pose
+        self.parent = None
+        self.parent_type = 'OBJECT'
+        self.parent_bone = ''
+        self.constraints = FakeCollection()
+        self.vertex_groups = FakeCollection()
+
+
+def add_fake_bone(armature_object, bone_name, parent_bone, use_deform):
+    """
+    This function adds a new Bone, and its PoseBone, with the given
+    bone_name, parent_bone, and use_deform to the given armature_object. It
+    returns the new PoseBone.
+    """
+    armature_object.data.bones.add(
+        FakeBone(bone_name, parent=parent_bone, use_deform=use_deform),
+    )
+    return armature_object.pose.bones.add(FakePoseBone(bone_name))
+
+
+def create_fake_armature_object(name):
+    """
+    This function returns a new armature scene object with the given name and
+    no bones.
+    """
+    return FakeObject(
+        name,
+        'ARMATURE',
+        data=FakeArmature(name),
+        pose=FakePose(),
+    )
+
+
+def choose_fake_constraint_target(
+    rng,
+    armature_index,
+    earlier_bone_name_stem_lists,
+    mesh_object,
+    constraint_density,
+    cross_armature_fraction,
+    vertex_group_fraction,
+):
+    """
+    This function randomly chooses whether a bone of the armature with the
+    given armature_index has a constraint with a target, and what its target
+    is. It returns a tuple (target_kind, target_index, subtarget_stem), or
+    None if the bone has no such constraint.
+
+    The target_kind is 'bone' (with the index of the target armature and a
+    tuple (bone_name_stem, is_sided) from earlier_bone_name_stem_lists),
+    'vertex_group' (with the name of one of the mesh_object’s vertex groups),
+    or 'empty'.
+    """
+    if rng.random() >= constraint_density:
+        return None
+
+    target_roll = rng.random()
+    other_armature_indices = [
+        other_armature_index
+        for other_armature_index, bone_name_stems
+        in enumerate(earlier_bone_name_stem_lists)
+        if other_armature_index != armature_index and bone_name_stems
+    ]
+
+    if mesh_object is not None and target_roll < vertex_group_fraction:
+        return (
+            'vertex_group',
+            None,
+            rng.choice(mesh_object.vertex_groups).name,
+        )
+
+    target_roll -= vertex_group_fraction
+    if other_armature_indices and target_roll < cross_armature_fraction:
+        target_index = rng.choice(other_armature_indices)
+    elif earlier_bone_name_stem_lists[armature_index]:
+        target_index = armature_index
+    else:
+        return ('empty', None, None)
+
+    return (
+        'bone',
+        target_index,
+        rng.choice(earlier_bone_name_stem_lists[target_index]),
+    )
+
+
+def create_fake_rigs(
+    num_of_bones,
+    num_of_armatures=1,
+    chain_length=10,
+    symmetric_fraction=0.9,
+    antisymmetric_fraction=0.05,
+    constraint_density=0.3,
+    cross_armature_fraction=0.1,
+    num_of_vertex_groups=0,
+    vertex_group_fraction=0.1,
+    seed=0,
+):
+    """
+    This function returns a list of the armature scene objects of a new fake
+    rig (see this module’s docstring), generated from the given random seed.
+
+    The armatures have num_of_bones bones in total, in chains of chain_length
+    bones, which are dealt to the num_of_armatures armatures in turn. About
+    symmetric_fraction of the chains are sided pairs, about
+    antisymmetric_fraction of which are antisymmetric.
+
+    About constraint_density of the bones have a constraint with a target.
+    About cross_armature_fraction of those constraints target a bone in
+    another armature (the same bone for both sides of a chain, since Blender
+    only mirrors subtargets within the same armature). If num_of_vertex_groups
+    is not 0, then a mesh scene object has that many vertex groups, and about
+    vertex_group_fraction of the constraints target them. The rest of the
+    constraints target bones of earlier chains in their own armature (or, in
+    the first chains, an empty scene object). About a tenth of the bones also
+    have a target-less constraint.
+    """
+    rng = random.Random(seed)
+
+    armature_objects = [
+        create_fake_armature_object(f'Fake Rig {armature_index}')
+        for armature_index
+        in range(num_of_armatures)
+    ]
+    empty_object = FakeObject('Fake Target', 'EMPTY')
+    mesh_object = None
+    if num_of_vertex_groups:
+        mesh_object = FakeObject('Fake Mesh', 'MESH')
+        for vertex_group_index in range(num_of_vertex_groups):
+            mesh_object.vertex_groups.add(
+                FakeVertexGroup(f'group.{vertex_group_index:04}'),
+            )
+
+    for armature_object in armature_objects:
+        armature_object.constraints.add(
+            FakeConstraint('Child Of', 'CHILD_OF', empty_object),
+        )
+
+    # Constraints target bones of earlier chains. For each armature, this has
+    # a list of tuples (bone_name_stem, is_sided) for the bones of its earlier
+    # chains, whose names are without sides.
+    earlier_bone_name_stem_lists = [[] for _ in armature_objects]
+
+    num_of_created_bones = 0
+    chain_index = 0
+    while num_of_created_bones < num_of_bones:
+        armature_index = chain_index % num_of_armatures
+        armature_object = armature_objects[armature_index]
+        chain_name_stem = f'{rng.choice(chain_name_stems)}.{chain_index:04}'
+        is_sided = (
+            rng.random() < symmetric_fraction
+            and num_of_bones - num_of_created_bones >= 2 * chain_length
+        )
+        is_antisymmetric = (
+            is_sided
+            and rng.random() < antisymmetric_fraction
+        )
+        sides = ('L', 'R') if is_sided else ('',)
+        use_deform = not chain_name_stem.startswith('MCH')
+        chain_bone_count = min(
+            chain_length,
+            num_of_bones - num_of_created_bones,
+        )
+
+        # Both sides of a chain get the same constraint choices, so that they
+        # are symmetric.
+        constraint_choices = [
+            (
+                choose_fake_constraint_target(
+                    rng,
+                    armature_index,
+                    earlier_bone_name_stem_lists,
+                    mesh_object,
+                    constraint_density,
+                    cross_armature_fraction,
+                    vertex_group_fraction,
+                ),
+                rng.random() < 0.1,
+            )
+            for _
+            in range(chain_bone_count)
+        ]
+
+        for side in sides:
+            parent_bone = None
+            for bone_index, (constraint_target, has_targetless_constraint) in (
+                enumerate(constraint_choices)
+            ):
+                bone_name_stem = f'{chain_name_stem}.{bone_index:02}'
+                bone_name = (
+                    f'{bone_name_stem}.{side}'
+                    if side
+                    else bone_name_stem
+                )
+                pose_bone = add_fake_bone(
+                    armature_object,
+                    bone_name,
+                    parent_bone,
+                    use_deform,
+                )
+                parent_bone = armature_object.data.bones[bone_name]
+
+                if constraint_target is not None:
+                    target_kind, target_index, subtarget_stem = (
+                        constraint_target
+                    )
+
+                    if target_kind == 'bone':
+                        subtarget_name_stem, subtarget_is_sided = (
+                            subtarget_stem
+                        )
+                        # A sided bone targets a sided bone in its own
+                        # armature on its own side.
+                        subtarget_side = (
+                            side
+                            if side and target_index == armature_index
+                            else 'L'
+                        )
+                        pose_bone.constraints.add(FakeConstraint(
+                            'Copy Rotation',
+                            'COPY_ROTATION',
+                            armature_objects[target_index],
+                            (
+                                f'{subtarget_name_stem}.{subtarget_side}'
+                                if subtarget_is_sided
+                                else subtarget_name_stem
+                            ),
+                        ))
+                    elif target_kind == 'vertex_group':
+                        pose_bone.constraints.add(FakeConstraint(
+                            'Copy Location',
+                            'COPY_LOCATION',
+                            mesh_object,
+                            subtarget_stem,
+                        ))
+                    else:
+                        pose_bone.constraints.add(FakeConstraint(
+                            'Damped Track',
+                            'DAMPED_TRACK',
+                            empty_object,
+                        ))
+
+                if is_antisymmetric and side == 'R' and bone_index == 0:
+                    # Right-sided bones of antisymmetric chains have an extra
+                    # constraint.
+                    pose_bone.constraints.add(FakeConstraint(
+                        'Copy Scale',
+                        'COPY_SCALE',
+                        empty_object,
+                    ))
+
+                if has_targetless_constraint:
+                    # Target-less constraints come last, since the analysis
+                    # stops at the first one.
+                    pose_bone.constraints.add(FakeTargetlessConstraint(
+                        'Limit Rotation',
+                        'LIMIT_ROTATION',
+                    ))
+
+        earlier_bone_name_stem_lists[armature_index].extend(
+            (f'{chain_name_stem}.{bone_index:02}', is_sided)
+            for bone_index
+            in range(chain_bone_count)
+        )
+        num_of_created_bones += chain_bone_count * len(sides)
+        chain_index += 1
+
+    return armature_objects
+
+
+def create_fake_rig(num_of_bones, seed=0):
+    """
+    This function returns the armature scene object of a new fake rig with
+    one armature and num_of_bones bones, with the default proportions of
+    create_fake_rigs, generated from the given random seed.
+    """
+    return create_fake_rigs(num_of_bones, seed=seed)[0]
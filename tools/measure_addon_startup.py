@@ -0,0 +1,118 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This script measures how long the add-on takes to start: to import its
+package and to register its classes and menus, as Blender does for every
+enabled add-on whenever it starts. It lists the add-on’s modules that are
+loaded once the add-on is registered, then it times importing the modules
+that the add-on imports only when its first operator runs (see the add-on’s
+__init__ module), which is the time that registration saves.
+
+It must run inside Blender, in a new Blender process (so that none of the
+add-on’s modules are loaded yet), from the repository’s root directory, e.g.:
+
+.. code-block: sh
+    blender --background --factory-startup \\
+        --python tools/measure_addon_startup.py
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+
+import bpy # noqa: F401
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+addon_package_name = 'blender_graphviz_rig'
+
+# These are the modules that the add-on imports when its first operator runs,
+# in the order in which they are first needed.
+deferred_module_names = (
+    'analyzebones',
+    'analyzerigs',
+    'rnaaccesses',
+    'renderprofiles',
+    'storedlayouts',
+    'savefiles',
+    'renderjobs',
+)
+
+
+def get_loaded_addon_module_names():
+    """
+    This function returns a sorted list of the names of the add-on’s modules
+    that are loaded, without the package’s name.
+    """
+    return sorted(
+        module_name.rpartition('.')[2]
+        for module_name
+        in sys.modules
+        if module_name.startswith(f'{addon_package_name}.')
+    )
+
+
+def time_call(fn):
+    """
+    This function calls fn with no arguments, and it returns a tuple of fn’s
+    result and the call’s duration in milliseconds.
+    """
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.parse_args(argv)
+
+    if addon_package_name in sys.modules:
+        sys.exit(
+            'The add-on is already loaded; run this script in a new Blender '
+            'process with --factory-startup.'
+        )
+
+    addon_package, import_duration = time_call(
+        lambda: importlib.import_module(addon_package_name),
+    )
+    _, register_duration = time_call(addon_package.register)
+    registered_module_names = get_loaded_addon_module_names()
+
+    _, deferred_import_duration = time_call(lambda: [
+        importlib.import_module(f'{addon_package_name}.{module_name}')
+        for module_name
+        in deferred_module_names
+    ])
+    deferred_module_names_now_loaded = [
+        module_name
+        for module_name
+        in get_loaded_addon_module_names()
+        if module_name not in registered_module_names
+    ]
+
+    addon_package.unregister()
+
+    for step_name, duration in (
+        ('import', import_duration),
+        ('register', register_duration),
+        ('first operator’s imports', deferred_import_duration),
+    ):
+        print(f'{step_name:<28} {duration:>10.1f} ms')
+    print()
+    print(
+        f'Loaded when registered ({len(registered_module_names)}): '
+        + ', '.join(registered_module_names)
+    )
+    print(
+        f'Loaded by the first operator '
+        f'({len(deferred_module_names_now_loaded)}): '
+        + ', '.join(deferred_module_names_now_loaded)
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# This module is licensed by its authors under the GNU Affero General Public
+# License 3.0.
+
+"""
+This script measures how long the selected-bones operator’s poll method
+takes on a large armature. Blender calls the poll method whenever it redraws
+a menu that contains the operator (the Armature menu in Edit Mode and the
+Pose menu in Pose Mode), so its time is added to every redraw of those menus.
+
+It creates an armature with the given number of bones, selects the given
+number of them (including the active bone), and times both the add-on’s poll
+method and the previous poll method – which loaded the armature’s edit-mode
+data and built a list of every selected Bone struct – in armature Edit Mode
+and in Pose Mode. With --unselected-active-bone, the active bone is not
+selected, so that the add-on’s poll method takes its slower fallback path
+(see the add-on’s is_any_bone_selected function).
+
+It must run inside Blender, from the repository’s root directory, e.g.:
+
+.. code-block: sh
+    blender --background --factory-startup \\
+        --python tools/measure_selected_bones_poll.py -- --bones 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import blender_graphviz_rig # noqa: E402
+
+
+def previous_poll(context):
+    """
+    This function is the selected-bones operator’s previous poll method, which
+    called get_selected_bones before it stopped loading edit-mode data.
+    """
+    if context.mode != 'EDIT_ARMATURE' and context.mode != 'POSE':
+        return False
+
+    active_object = context.view_layer.objects.active
+    active_object.update_from_editmode()
+
+    if context.mode == 'EDIT_ARMATURE':
+        selected_bones = [
+            active_object.data.bones[eb.name]
+            for eb
+            in context.selected_bones
+        ]
+    else:
+        selected_bones = [
+            active_object.data.bones[pb.name]
+            for pb
+            in context.selected_pose_bones
+        ]
+
+    return bool(len(selected_bones))
+
+
+def create_armature_object(
+    num_of_bones,
+    num_of_selected_bones,
+    active_bone_is_selected=True,
+):
+    """
+    This function creates an armature scene object with num_of_bones bones in
+    chains of ten, makes it active, and selects its first num_of_selected_bones
+    bones. The active bone is the first bone if active_bone_is_selected is
+    true, or else the last bone (which is then unselected, unless every bone
+    is selected). It returns the scene object in armature Edit Mode.
+    """
+    armature = bpy.data.armatures.new('Measured Armature')
+    armature_object = bpy.data.objects.new('Measured Armature', armature)
+    bpy.context.scene.collection.objects.link(armature_object)
+    bpy.context.view_layer.objects.active = armature_object
+    bpy.ops.object.mode_set(mode='EDIT')
+
+    parent_edit_bone = None
+    for bone_index in range(num_of_bones):
+        edit_bone = armature.edit_bones.new(f'bone.{bone_index:05}')
+        edit_bone.head = (bone_index // 10, 0, bone_index % 10)
+        edit_bone.tail = (bone_index // 10, 0, bone_index % 10 + 1)
+        edit_bone.parent = parent_edit_bone if bone_index % 10 else None
+        edit_bone.select = bone_index < num_of_selected_bones
+        parent_edit_bone = edit_bone
+
+    armature.edit_bones.active = (
+        armature.edit_bones[0]
+        if active_bone_is_selected
+        else armature.edit_bones[-1]
+    )
+
+    return armature_object
+
+
+def time_poll(poll, repeat):
+    """
+    This function calls the given poll function with Blender’s context repeat
+    times, and it returns the mean duration of one call in milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        poll(bpy.context)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--bones', type=int, default=10000)
+    parser.add_argument('--selected-bones', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--unselected-active-bone', action='store_true')
+    args = parser.parse_args(argv)
+
+    create_armature_object(
+        args.bones,
+        args.selected_bones,
+        active_bone_is_selected=not args.unselected_active_bone,
+    )
+    operator_class = (
+        blender_graphviz_rig.ARMATURE_OT_rig_graphviz_selected_bones_only
+    )
+
+    print(
+        f'{args.bones} bones, {args.selected_bones} selected, '
+        'active bone '
+        f'{"unselected" if args.unselected_active_bone else "selected"}, '
+        f'mean of {args.repeat} polls'
+    )
+    print(f'{"mode":<6} {"previous ms":>12} {"current ms":>12}')
+
+    for mode_name, mode in (('edit', 'EDIT'), ('pose', 'POSE')):
+        bpy.ops.object.mode_set(mode=mode)
+        previous_duration = time_poll(previous_poll, args.repeat)
+        current_duration = time_poll(operator_class.poll, args.repeat)
+        print(
+            f'{mode_name:<6} {previous_duration:>12.3f} '
+            f'{current_duration:>12.3f}'
+        )
+
+
+if __name__ == '__main__':
+    main()